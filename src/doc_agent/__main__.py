@@ -1,13 +1,23 @@
 import argparse
+import functools
+import json
 import logging
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
-from doc_agent.agent import run_doc_agent
+from doc_agent.agent import run_doc_agent, run_doc_agent_styles
+from doc_agent.checkpoint import CheckpointStore, DEFAULT_CHECKPOINT_DIR
+from doc_agent.digest import DEFAULT_DIGEST_TOKENS
 from doc_agent.draft import draft_copy_tool
-from doc_agent.evaluators import all_evaluators, EVALUATOR_REGISTRY, FORBIDDEN_FILE
+from doc_agent.evaluators import EVALUATOR_REGISTRY, FORBIDDEN_FILE
+from doc_agent.evaluators.stats import DEFAULT_STATS_DIR, EvaluatorStats
+from doc_agent.events import AgentEvent, Final
 from doc_agent.pipeline import process_document
 from doc_agent.release_notes import generate_release_notes
+from doc_agent.results import DEFAULT_RESULTS_DIR, ResultStore
+from doc_agent.routing import ModelRouter, set_router
+from doc_agent.section_cache import DEFAULT_SECTION_CACHE_DIR, SectionCache
+from doc_agent import tracing
 
 def setup_logging(verbosity: int) -> None:
     """Configure logging based on verbosity level."""
@@ -32,11 +42,109 @@ def setup_logging(verbosity: int) -> None:
     # Ensure our app's logger still respects the verbosity
     logging.getLogger("doc_agent").setLevel(level)
 
+def add_checkpoint_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the --checkpoint-dir and --resume flags shared by generate and process."""
+    parser.add_argument(
+        "--checkpoint-dir",
+        help=f"Save progress after every iteration/stage (default with --resume: {DEFAULT_CHECKPOINT_DIR})"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip completed items and continue unfinished ones from their last checkpoint"
+    )
+
+def checkpoint_store_from_args(args: argparse.Namespace) -> Optional[CheckpointStore]:
+    """Return the checkpoint store selected on the command line, if any."""
+    if args.checkpoint_dir:
+        return CheckpointStore(args.checkpoint_dir)
+    if args.resume:
+        return CheckpointStore(DEFAULT_CHECKPOINT_DIR)
+    return None
+
+def add_result_store_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the flags that control the whole-run result store."""
+    parser.add_argument(
+        "--reuse-results",
+        action="store_true",
+        help=f"Return a stored successful result for the same inputs and evaluators, and store new ones (in {DEFAULT_RESULTS_DIR})"
+    )
+    parser.add_argument(
+        "--results-dir",
+        help="Result store directory (implies --reuse-results)"
+    )
+    parser.add_argument(
+        "--refresh-results",
+        action="store_true",
+        help="Ignore the stored result, run the agent and replace it (implies --reuse-results)"
+    )
+
+def result_store_from_args(args: argparse.Namespace) -> Optional[ResultStore]:
+    """Return the result store selected on the command line, if any."""
+    if args.results_dir:
+        return ResultStore(args.results_dir)
+    if args.reuse_results or args.refresh_results:
+        return ResultStore(DEFAULT_RESULTS_DIR)
+    return None
+
+def add_trace_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the --trace and --trace-format flags shared by generate and process."""
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Record spans for the run, iterations, LLM calls and evaluators and write them to FILE"
+    )
+    parser.add_argument(
+        "--trace-format",
+        choices=["jsonl", "chrome"],
+        default="jsonl",
+        help="Trace file format: JSON lines, or Chrome trace events for chrome://tracing/Perfetto (default: jsonl)"
+    )
+
+def add_routing_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the --route-stats flag shared by the commands that call the LLM."""
+    parser.add_argument(
+        "--route-stats",
+        action="store_true",
+        help=f"Record per-route model latency and success statistics in {DEFAULT_STATS_DIR}"
+    )
+
+def write_trace(args: argparse.Namespace) -> None:
+    """Stop tracing and export the collected spans, if --trace was given."""
+    tracer = tracing.disable()
+    if tracer is None or not getattr(args, "trace", None):
+        return
+    if args.trace_format == "chrome":
+        tracer.to_chrome_trace(args.trace)
+    else:
+        tracer.to_jsonl(args.trace)
+    logging.info(f"Wrote {len(tracer.spans)} span(s) to {args.trace}")
+
+def print_event(event: AgentEvent) -> None:
+    """Print one agent event as a line of NDJSON and flush it immediately."""
+    print(json.dumps(event.to_dict()), flush=True)
+
+def print_progress_event(event: AgentEvent) -> None:
+    """Stream every event except Final, which is printed once the run returns.
+
+    Printing Final separately covers runs answered from the checkpoint store,
+    which emit no events.
+    """
+    if not isinstance(event, Final):
+        print_event(event)
+
 def print_report(result: dict, show_details: bool = False) -> None:
     """Print the agent result in a structured format."""
     # Print iteration summary
     print(f"\n📊 Completed in {result['iterations']} iteration(s)")
-    print(f"Status: {'✅ Success' if result['final_status'] == 'success' else '❌ Failed'}")
+    if result["final_status"] == "deadline":
+        print(f"Status: ⏱️ Stopped early ({result['reason']})")
+    else:
+        print(f"Status: {'✅ Success' if result['final_status'] == 'success' else '❌ Failed'}")
+    if result.get("llm_calls_saved"):
+        print(f"🛠️ Local fixes saved {result['llm_calls_saved']} LLM call(s)")
+    if result.get("cached"):
+        print("♻️ Reused a stored result")
     
     # Print evaluation reports if requested
     if show_details:
@@ -49,6 +157,42 @@ def print_report(result: dict, show_details: bool = False) -> None:
     print("\n✨ Final Text ✨")
     print(result["text"])
 
+def run_styles(args: argparse.Namespace, evaluator_names: Optional[List[str]]) -> None:
+    """Run generate --styles and print one report per style."""
+    styles = [style.strip() for style in args.styles.split(",") if style.strip()]
+    results = run_doc_agent_styles(
+        args.scenario,
+        styles,
+        shared_base=args.shared_base,
+        evaluator_names=evaluator_names,
+        forbidden_file=args.forbidden_file,
+        no_eval=args.no_eval,
+        fast=args.fast,
+        llm=functools.partial(
+            draft_copy_tool, stream=True, forbidden_file=args.forbidden_file
+        ) if args.stream_drafts else draft_copy_tool,
+        checkpoint_store=checkpoint_store_from_args(args),
+        resume=args.resume,
+        stats=EvaluatorStats(DEFAULT_STATS_DIR) if args.adaptive_order else None,
+        max_iters=args.max_iters,
+        fail_fast=args.fail_fast,
+        candidates=args.candidates,
+        deadline_s=args.deadline,
+        token_budget=args.token_budget,
+        autofix=not args.no_autofix,
+        fix_mode=args.fix_mode,
+        targeted=args.targeted_fixes
+    )
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for style, item in results.items():
+        print(f"\n=== {style} ===")
+        if item["error"]:
+            print(f"❌ Error: {item['error']}")
+        else:
+            print_report(item["result"], show_details=args.show_details)
+
 def main(args: List[str] = None) -> None:
     """CLI wrapper for running the doc agent."""
     parser = argparse.ArgumentParser(
@@ -94,6 +238,15 @@ Examples:
         default="Clear and professional",
         help="The style to use for generation (default: Clear and professional)"
     )
+    gen_parser.add_argument(
+        "--styles",
+        help="Comma-separated styles to write the scenario in concurrently (overrides --style)"
+    )
+    gen_parser.add_argument(
+        "--shared-base",
+        action="store_true",
+        help="With --styles, draft once and adapt that draft to each style"
+    )
     gen_parser.add_argument(
         "--max-iters",
         type=int,
@@ -110,6 +263,11 @@ Examples:
         action="store_true",
         help="Output results in JSON format"
     )
+    gen_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream progress as NDJSON events (draft, evaluator results, fixes, final)"
+    )
     gen_parser.add_argument(
         "--eval",
         help=f"Comma-separated list of evaluators to run (available: {','.join(EVALUATOR_REGISTRY.keys())})"
@@ -131,6 +289,61 @@ Examples:
         action="store_true",
         help="Use only fast evaluators (no AI calls)"
     )
+    gen_parser.add_argument(
+        "--fail-fast",
+        type=int,
+        metavar="N",
+        help="Stop evaluating an iteration once N evaluators have failed"
+    )
+    gen_parser.add_argument(
+        "--candidates",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Request N drafts per call and keep the best after static checks (default: 1)"
+    )
+    gen_parser.add_argument(
+        "--no-autofix",
+        action="store_true",
+        help="Send every failure to the LLM instead of fixing mechanical ones locally"
+    )
+    gen_parser.add_argument(
+        "--fix-mode",
+        choices=["rewrite", "edits"],
+        default="rewrite",
+        help="Request fixes as full rewrites or as edit operations applied locally (default: rewrite)"
+    )
+    gen_parser.add_argument(
+        "--stream-drafts",
+        action="store_true",
+        help="Stream drafts and re-prompt as soon as a forbidden word appears"
+    )
+    gen_parser.add_argument(
+        "--targeted-fixes",
+        action="store_true",
+        help="Send only the failing sentences plus some context when the evaluators located them"
+    )
+    gen_parser.add_argument(
+        "--adaptive-order",
+        action="store_true",
+        help=f"Run evaluators likeliest to fail and cheapest first, learned from past runs in {DEFAULT_STATS_DIR}"
+    )
+    gen_parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Stop with the best text so far once this many seconds have passed"
+    )
+    gen_parser.add_argument(
+        "--token-budget",
+        type=int,
+        metavar="N",
+        help="Stop with the best text so far once N provider tokens have been spent"
+    )
+    add_checkpoint_arguments(gen_parser)
+    add_result_store_arguments(gen_parser)
+    add_trace_arguments(gen_parser)
+    add_routing_arguments(gen_parser)
     
     # Process command
     proc_parser = subparsers.add_parser("process", help="Process a document through the pipeline")
@@ -159,6 +372,30 @@ Examples:
         default=FORBIDDEN_FILE,
         help="Path to custom forbidden words file"
     )
+    proc_parser.add_argument(
+        "--single-request",
+        action="store_true",
+        help="Draft all sections in one LLM call (JSON response); sections breaking their rules are re-drafted"
+    )
+    proc_parser.add_argument(
+        "--stream-drafts",
+        action="store_true",
+        help="Stream section drafts and re-prompt as soon as one breaks its rules (summary length or lines, forbidden words)"
+    )
+    proc_parser.add_argument(
+        "--digest-tokens",
+        type=int,
+        default=DEFAULT_DIGEST_TOKENS,
+        help="Send a digest (signature, JSDoc, identifiers, key lines) instead of sources over this many tokens; 0 always sends the whole source"
+    )
+    proc_parser.add_argument(
+        "--no-section-cache",
+        action="store_true",
+        help=f"Draft every section again instead of reusing drafts of unchanged code from {DEFAULT_SECTION_CACHE_DIR}"
+    )
+    add_checkpoint_arguments(proc_parser)
+    add_trace_arguments(proc_parser)
+    add_routing_arguments(proc_parser)
     
     # Release notes command
     notes_parser = subparsers.add_parser("release-notes", help="Generate release notes from git commits")
@@ -166,18 +403,36 @@ Examples:
     notes_parser.add_argument("--from", dest="rev_from", required=True, help="Starting revision (e.g. v1.0.0)")
     notes_parser.add_argument("--to", dest="rev_to", default="HEAD", help="Ending revision")
     notes_parser.add_argument("--output", help="Output file path")
-    notes_parser.add_argument("--model", default="gpt-4", help="OpenAI model to use")
+    notes_parser.add_argument("--model", help="OpenAI model to use (default: chosen by the model routing policy)")
+    add_routing_arguments(notes_parser)
     
     args = parser.parse_args(args)
     
     if not args.command:
         parser.print_help()
         exit(1)
+    if args.command == "generate" and args.styles:
+        unsupported = [
+            flag for flag, used in (
+                ("--stream", args.stream),
+                ("--reuse-results", args.reuse_results),
+                ("--results-dir", args.results_dir),
+                ("--refresh-results", args.refresh_results),
+            ) if used
+        ]
+        if unsupported:
+            gen_parser.error(f"{', '.join(unsupported)} cannot be combined with --styles")
     
     # Set up logging (quiet overrides verbose)
     verbosity = 0 if args.quiet else args.verbose
     setup_logging(verbosity)
     
+    if getattr(args, "trace", None):
+        tracing.enable()
+    router = ModelRouter(root=DEFAULT_STATS_DIR) if args.route_stats else None
+    if router is not None:
+        set_router(router)
+    
     try:
         if args.command == "generate":
             # Parse evaluator list if provided
@@ -185,21 +440,39 @@ Examples:
             if args.eval:
                 evaluator_names = [name.strip() for name in args.eval.split(",")]
             
-            result = run_doc_agent(
-                scenario=args.scenario,
-                style=args.style,
-                max_iters=args.max_iters,
-                evaluator_names=evaluator_names,
-                forbidden_file=args.forbidden_file,
-                no_eval=args.no_eval,
-                fast=args.fast
-            )
-            
-            if args.json:
-                import json
-                print(json.dumps(result, indent=2))
+            if args.styles:
+                run_styles(args, evaluator_names)
             else:
-                print_report(result, show_details=args.show_details)
+                result = run_doc_agent(
+                    scenario=args.scenario,
+                    style=args.style,
+                    max_iters=args.max_iters,
+                    evaluator_names=evaluator_names,
+                    forbidden_file=args.forbidden_file,
+                    no_eval=args.no_eval,
+                    fast=args.fast,
+                    fail_fast=args.fail_fast,
+                    candidates=args.candidates,
+                    checkpoint_store=checkpoint_store_from_args(args),
+                    resume=args.resume,
+                    deadline_s=args.deadline,
+                    token_budget=args.token_budget,
+                    stats=EvaluatorStats(DEFAULT_STATS_DIR) if args.adaptive_order else None,
+                    on_event=print_progress_event if args.stream else None,
+                    autofix=not args.no_autofix,
+                    fix_mode=args.fix_mode,
+                    targeted=args.targeted_fixes,
+                    result_store=result_store_from_args(args),
+                    refresh=args.refresh_results,
+                    stream_drafts=args.stream_drafts
+                )
+            
+                if args.stream:
+                    print_event(Final(result))
+                elif args.json:
+                    print(json.dumps(result, indent=2))
+                else:
+                    print_report(result, show_details=args.show_details)
                 
         elif args.command == "process":
             if not Path(args.source_path).exists():
@@ -208,11 +481,16 @@ Examples:
                 
             result = process_document(
                 args.source_path,
-                forbidden_file=args.forbidden_file
+                forbidden_file=args.forbidden_file,
+                checkpoint_store=checkpoint_store_from_args(args),
+                resume=args.resume,
+                single_request=args.single_request,
+                stream_drafts=args.stream_drafts,
+                section_cache=None if args.no_section_cache else SectionCache(DEFAULT_SECTION_CACHE_DIR),
+                digest_tokens=args.digest_tokens or None
             )
             
             if args.json:
-                import json
                 print(json.dumps(result, indent=2))
             else:
                 status_icon = "✅" if result["status"] == "success" else "❌"
@@ -245,6 +523,10 @@ Examples:
             import traceback
             traceback.print_exc()
         exit(1)
+    finally:
+        write_trace(args)
+        if router is not None:
+            router.save()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,20 +1,69 @@
-from typing import List, Callable, Dict, Any, Union, Set
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Generator, Iterable, Iterator, List,
+    NamedTuple, Optional, Sequence, Tuple, Union
+)
+import contextvars
+import functools
 import logging
+import time
+import types
 from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
+from doc_agent.autofix import fix_failures
+from doc_agent.budget import Budget, metering
+from doc_agent.checkpoint import CheckpointStore, item_key
+from doc_agent.convergence import ConvergenceTracker, failure_signature
 from doc_agent.draft import draft_copy_tool
-from doc_agent.evaluators import all_evaluators, get_evaluators
+from doc_agent.evaluators import forbidden_list_version, get_evaluators, FORBIDDEN_FILE
+from doc_agent.evaluators.runner import (
+    ResultCache, evaluator_id, is_deterministic, passed, run_evaluators, run_evaluators_async
+)
+from doc_agent.evaluators.stats import EvaluatorStats
 from doc_agent.evaluators.types import EvalResult
+from doc_agent.events import (
+    AgentEvent, DraftFinished, DraftStarted, EvaluatorReport, Final, FixRequested, LocalFix
+)
+from doc_agent.results import ResultStore, result_key
+from doc_agent.retry import RetryError
+from doc_agent.routing import run_scope
+from doc_agent.targeting import remap_spans
+from doc_agent.tracing import span
 
 # Maximum times to retry the same error message before giving up
 MAX_SAME_ERROR_ATTEMPTS = 3
 
+# Default number of scenarios run_doc_agent_many works on at the same time
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Style of the base draft that run_doc_agent_styles adapts to each style
+BASE_STYLE = "Clear and professional"
+
+# Fix instructions that turn the shared base draft into one style
+ADAPT_STYLE_FIX = "Rewrite this text in the {style} style, keeping its meaning."
+
+# How fixes are requested: the full improved text, or edit operations
+# applied locally (see doc_agent.edits)
+FIX_MODES = ("rewrite", "edits")
+
 def run_agent(
     scenario: str,
     style: str,
     evaluators: List[Callable[[str], Union[Dict[str, Any], EvalResult]]],
     llm: Callable,
-    max_iters: int = 5
+    max_iters: int = 5,
+    max_workers: Optional[int] = None,
+    fail_fast: Optional[int] = None,
+    candidates: int = 1,
+    resume_state: Optional[Dict[str, Any]] = None,
+    on_checkpoint: Optional[Callable[[Dict[str, Any]], None]] = None,
+    deadline_s: Optional[float] = None,
+    token_budget: Optional[int] = None,
+    stats: Optional[EvaluatorStats] = None,
+    on_event: Optional[Callable[[AgentEvent], None]] = None,
+    autofix: bool = True,
+    fix_mode: str = "rewrite",
+    targeted: bool = False
 ) -> Dict[str, Any]:
     """Internal implementation of the agent loop with dependency injection.
     
@@ -24,168 +73,541 @@ def run_agent(
         evaluators: List of evaluator functions that return either Dict or EvalResult
         llm: The language model to use for generation and fixes
         max_iters: Maximum number of iterations to try
+        max_workers: Evaluators run concurrently on up to this many threads
+            (default: runner.DEFAULT_MAX_WORKERS; 1 runs them in order)
+        fail_fast: If set, cancel the remaining evaluators of an iteration once
+            this many have failed, since a rewrite is needed anyway
+        candidates: Drafts to request per LLM call (best-of-N). Each is screened
+            with the deterministic (static) evaluators and only the best one goes
+            through the full evaluator set. The llm is called with ``n=candidates``
+            and must then return a list of texts.
+        resume_state: A state previously passed to on_checkpoint; the run
+            continues from it instead of drafting from scratch
+        on_checkpoint: Called with the loop state ({"text", "iterations",
+            "failures"}) after the initial draft and after every iteration
+        deadline_s: Wall-clock seconds the run may take. Checked before every
+            LLM call; with less than budget.LOW_TIME_FRACTION of it left, only
+            the deterministic evaluators run
+        token_budget: Provider tokens (prompt plus completion, drafting and AI
+            evaluators together) the run may spend. Checked before every LLM call
+        stats: Learned evaluator statistics; evaluators are then started
+            cheapest-and-likeliest-to-fail first. The evaluation behind a
+            final report never uses fail-fast, so it covers the same
+            evaluators whatever the order.
+        on_event: Called with every AgentEvent as it happens (see
+            iter_agent_events for the streaming form)
+        autofix: Fix mechanical failures (trailing period, weasel words,
+            known acronyms, quotes, forbidden-word synonyms) locally first and
+            send only the rest to the LLM; when nothing is left no LLM call is made
+        fix_mode: "rewrite" asks the llm for the full improved text. "edits"
+            calls it with ``edits=True`` so it returns the text with edit
+            operations applied, falling back to a rewrite on its own
+            (draft.draft_copy_tool supports this)
+        targeted: When every failure left to fix was located by its evaluator
+            (``EvalResult.spans``, or a "spans" key in dict results), call the
+            llm with ``spans=`` so only the failing sentences plus some context
+            are rewritten (draft.draft_copy_tool supports this)
         
     Returns:
         Dict containing:
             - text: The final generated text
             - reports: List of evaluation reports or "ALL_PASS"
             - iterations: Number of iterations taken
-            - final_status: "success" or "failure"
+            - final_status: "success", "failure", or "deadline" when the
+              deadline or token budget ran out first
             - final_reports: List of evaluation results
+            - reason: Why the run stopped early, if it did
+            - last_text: On failure or deadline, the last draft; "text" is
+              then the best-scoring draft seen
+            - tokens_used: Provider tokens spent, when a budget was given
+            - llm_calls_saved: Fix calls skipped because every failure was
+              fixed locally
     """
+    for event in iter_agent_events(
+        scenario, style, evaluators, llm,
+        max_iters=max_iters,
+        max_workers=max_workers,
+        fail_fast=fail_fast,
+        candidates=candidates,
+        resume_state=resume_state,
+        on_checkpoint=on_checkpoint,
+        deadline_s=deadline_s,
+        token_budget=token_budget,
+        stats=stats,
+        autofix=autofix,
+        fix_mode=fix_mode,
+        targeted=targeted
+    ):
+        if on_event:
+            on_event(event)
+    return event.result
+
+def iter_agent_events(
+    scenario: str,
+    style: str,
+    evaluators: List[Callable[[str], Union[Dict[str, Any], EvalResult]]],
+    llm: Callable,
+    max_iters: int = 5,
+    max_workers: Optional[int] = None,
+    fail_fast: Optional[int] = None,
+    candidates: int = 1,
+    resume_state: Optional[Dict[str, Any]] = None,
+    on_checkpoint: Optional[Callable[[Dict[str, Any]], None]] = None,
+    deadline_s: Optional[float] = None,
+    token_budget: Optional[int] = None,
+    stats: Optional[EvaluatorStats] = None,
+    autofix: bool = True,
+    fix_mode: str = "rewrite",
+    targeted: bool = False
+) -> Iterator[AgentEvent]:
+    """Run the agent loop, yielding events as they happen.
+    
+    Takes the same arguments as run_agent. Yields DraftStarted,
+    DraftFinished, EvaluatorReport and FixRequested events, and finally a
+    Final event carrying the run_agent result dict. Closing the generator
+    early abandons the run; no further LLM or evaluator calls are made.
+    
+    The run's span and budget live in a context of its own, so streams
+    consumed in turn don't charge each other's tokens or nest each
+    other's spans.
+    """
+    memo = ResultCache()
+    budget = Budget(deadline_s, token_budget)
+    static = [evaluator for evaluator in evaluators if is_deterministic(evaluator)]
+    
+    def _evaluate(request: _Evaluate) -> List[Any]:
+        results = run_evaluators(
+            static if request.required_only else evaluators,
+            request.text,
+            max_workers=max_workers,
+            fail_fast=None if request.full else fail_fast,
+            memo=memo,
+            stats=stats
+        )
+        logging.debug(f"Evaluator cache: {memo.hits} hit(s), {memo.misses} miss(es)")
+        return results
+    
+    def _screen(texts: List[str]) -> List[List[Any]]:
+        return [run_evaluators(static, text, max_workers=1, memo=memo, stats=stats) for text in texts]
+    
+    def _events() -> Iterator[AgentEvent]:
+        with span("agent.run", scenario=scenario, style=style) as current, metering(budget), run_scope():
+            for event in _drive(_agent_steps(scenario, style, max_iters, candidates, resume_state, budget, autofix, fix_mode, targeted), {
+                _Draft: lambda request: llm(**request.kwargs),
+                _Evaluate: _evaluate,
+                _Screen: lambda request: _screen(request.texts),
+                _Checkpoint: lambda request: on_checkpoint and on_checkpoint(request.state),
+            }):
+                if isinstance(event, Final):
+                    current.set(final_status=event.result["final_status"], iterations=event.result["iterations"])
+                yield event
+    
+    logging.debug(f"Using {len(evaluators)} evaluators")
+    yield from _isolated(_events())
+
+async def run_agent_async(
+    scenario: str,
+    style: str,
+    evaluators: List[Callable[[str], Union[Dict[str, Any], EvalResult]]],
+    llm: Callable[..., Awaitable[str]],
+    max_iters: int = 5,
+    fail_fast: Optional[int] = None,
+    candidates: int = 1,
+    resume_state: Optional[Dict[str, Any]] = None,
+    on_checkpoint: Optional[Callable[[Dict[str, Any]], None]] = None,
+    deadline_s: Optional[float] = None,
+    token_budget: Optional[int] = None,
+    stats: Optional[EvaluatorStats] = None,
+    on_event: Optional[Callable[[AgentEvent], None]] = None,
+    autofix: bool = True,
+    fix_mode: str = "rewrite",
+    targeted: bool = False
+) -> Dict[str, Any]:
+    """Asyncio version of run_agent.
+    
+    Runs the same loop as run_agent, so the result dict, the
+    MAX_SAME_ERROR_ATTEMPTS handling and the interrupt handling are
+    identical. The LLM is awaited. Evaluators run as concurrent tasks: those
+    with a ``run_async`` coroutine (the AI evaluators) are awaited directly,
+    and plain functions run in the default thread pool. Cancelling the task
+    cancels the in-flight provider requests. Many runs can share one event loop.
+    
+    Args:
+        scenario: The scenario to generate text for
+        style: The style to use for generation
+        evaluators: List of evaluator functions that return either Dict or EvalResult
+        llm: Coroutine function used for generation and fixes
+            (e.g. draft.draft_copy_tool_async)
+        max_iters: Maximum number of iterations to try
+        fail_fast: If set, cancel the remaining evaluators of an iteration once
+            this many have failed
+        candidates: Drafts to request per LLM call (best-of-N), as in run_agent
+        resume_state: State to continue from, as in run_agent
+        on_checkpoint: Called with the loop state after every iteration, as in run_agent
+        deadline_s: Wall-clock seconds the run may take, as in run_agent
+        token_budget: Provider tokens the run may spend, as in run_agent
+        stats: Learned evaluator statistics, as in run_agent
+        on_event: Called with every AgentEvent, as in run_agent
+        autofix: Fix mechanical failures locally first, as in run_agent
+        fix_mode: "rewrite" or "edits", as in run_agent
+        targeted: Send only the located failing sentences, as in run_agent
+        
+    Returns:
+        The same dict as run_agent
+    """
+    async for event in aiter_agent_events(
+        scenario, style, evaluators, llm,
+        max_iters=max_iters,
+        fail_fast=fail_fast,
+        candidates=candidates,
+        resume_state=resume_state,
+        on_checkpoint=on_checkpoint,
+        deadline_s=deadline_s,
+        token_budget=token_budget,
+        stats=stats,
+        autofix=autofix,
+        fix_mode=fix_mode,
+        targeted=targeted
+    ):
+        if on_event:
+            on_event(event)
+    return event.result
+
+async def aiter_agent_events(
+    scenario: str,
+    style: str,
+    evaluators: List[Callable[[str], Union[Dict[str, Any], EvalResult]]],
+    llm: Callable[..., Awaitable[str]],
+    max_iters: int = 5,
+    fail_fast: Optional[int] = None,
+    candidates: int = 1,
+    resume_state: Optional[Dict[str, Any]] = None,
+    on_checkpoint: Optional[Callable[[Dict[str, Any]], None]] = None,
+    deadline_s: Optional[float] = None,
+    token_budget: Optional[int] = None,
+    stats: Optional[EvaluatorStats] = None,
+    autofix: bool = True,
+    fix_mode: str = "rewrite",
+    targeted: bool = False
+) -> AsyncIterator[AgentEvent]:
+    """Async-iterator version of iter_agent_events, driven like run_agent_async.
+    
+    Like iter_agent_events, each stream runs in a context of its own.
+    """
+    memo = ResultCache()
+    budget = Budget(deadline_s, token_budget)
+    static = [evaluator for evaluator in evaluators if is_deterministic(evaluator)]
+    
+    async def _evaluate(request: _Evaluate) -> List[Any]:
+        return await run_evaluators_async(
+            static if request.required_only else evaluators,
+            request.text,
+            fail_fast=None if request.full else fail_fast,
+            memo=memo,
+            stats=stats
+        )
+    
+    async def _screen(texts: List[str]) -> List[List[Any]]:
+        return [await run_evaluators_async(static, text, memo=memo, stats=stats) for text in texts]
+    
+    async def _checkpoint(state: Dict[str, Any]) -> None:
+        if on_checkpoint:
+            on_checkpoint(state)
+    
+    async def _events() -> AsyncIterator[AgentEvent]:
+        with span("agent.run", scenario=scenario, style=style) as current, metering(budget), run_scope():
+            async for event in _drive_async(_agent_steps(scenario, style, max_iters, candidates, resume_state, budget, autofix, fix_mode, targeted), {
+                _Draft: lambda request: llm(**request.kwargs),
+                _Evaluate: _evaluate,
+                _Screen: lambda request: _screen(request.texts),
+                _Checkpoint: lambda request: _checkpoint(request.state),
+            }):
+                if isinstance(event, Final):
+                    current.set(final_status=event.result["final_status"], iterations=event.result["iterations"])
+                yield event
+    
+    logging.debug(f"Using {len(evaluators)} evaluators")
+    async for event in _isolated_async(_events()):
+        yield event
+
+class _Draft(NamedTuple):
+    """Request from the agent loop for a draft or fix: the LLM keyword arguments."""
+    kwargs: Dict[str, Any]
+
+class _Evaluate(NamedTuple):
+    """Request from the agent loop to evaluate a text.
+
+    ``required_only`` limits it to the deterministic evaluators; ``full``
+    disables fail-fast, for evaluations that back a final report.
+    """
+    text: str
+    required_only: bool = False
+    full: bool = False
+
+class _Screen(NamedTuple):
+    """Request from the agent loop to run the static evaluators on candidate drafts."""
+    texts: List[str]
+
+class _Checkpoint(NamedTuple):
+    """Notification from the agent loop that its state can be saved."""
+    state: Dict[str, Any]
+
+class _Emit(NamedTuple):
+    """Notification from the agent loop carrying an event for the caller."""
+    event: AgentEvent
+
+_Step = Union[_Draft, _Evaluate, _Screen, _Checkpoint, _Emit]
+
+def _best_draft(
+    kwargs: Dict[str, Any],
+    candidates: int
+) -> Generator[_Step, Any, str]:
+    """Request a draft; with several candidates, keep the one with fewest static failures."""
+    if candidates <= 1:
+        return (yield _Draft(kwargs))
+    drafts = yield _Draft(dict(kwargs, n=candidates))
+    if isinstance(drafts, str):
+        return drafts
+    if len(drafts) == 1:
+        return drafts[0]
+    screened = yield _Screen(list(drafts))
+    fail_counts = [sum(1 for _, result in results if not passed(result)) for results in screened]
+    best = fail_counts.index(min(fail_counts))
+    logging.debug(f"Best of {len(drafts)} candidates: #{best + 1} ({fail_counts[best]} static failure(s))")
+    return drafts[best]
+
+def _agent_steps(
+    scenario: str,
+    style: str,
+    max_iters: int,
+    candidates: int = 1,
+    resume_state: Optional[Dict[str, Any]] = None,
+    budget: Optional[Budget] = None,
+    autofix: bool = True,
+    fix_mode: str = "rewrite",
+    targeted: bool = False
+) -> Generator[_Step, Any, Dict[str, Any]]:
+    """The agent loop, written once for both the sync and async drivers.
+    
+    The generator yields the I/O it needs (``_Draft``, ``_Evaluate``,
+    ``_Screen``, ``_Checkpoint`` or ``_Emit``) and is sent the response: the
+    drafted text (or candidate list), the ordered (name, result) pairs from
+    the evaluators, one such list per screened candidate, or None. Its return
+    value is the run_agent result dict. A KeyboardInterrupt thrown in by the
+    driver yields the "interrupted" result. ``budget`` is checked before every
+    draft; once it is spent the loop returns the "deadline" result, as it does
+    when a provider call thrown in as a RetryError ran out of time. With
+    ``autofix``, mechanical failures are fixed locally before the LLM is asked.
+    In the "edits" ``fix_mode`` fix drafts are requested with ``edits=True``,
+    and with ``targeted`` located failures are passed on as ``spans``.
+    """
+    if fix_mode not in FIX_MODES:
+        raise ValueError(f"Unknown fix mode {fix_mode!r}; expected one of {', '.join(FIX_MODES)}")
     logging.info(f"Starting agent with scenario: {scenario}")
     logging.info(f"Style: {style}")
-    logging.debug(f"Using {len(evaluators)} evaluators")
+    if budget is None:
+        budget = Budget()
     
     try:
-        text = llm(scenario=scenario, style=style)
-        logging.debug("Generated initial text")
-        iterations = 0
-        
-        # Track which evaluators have passed
-        passing = set()  # type: Set[str]
+        if resume_state:
+            text = resume_state["text"]
+            iterations = resume_state["iterations"]
+            logging.info(f"Resuming from checkpoint after iteration {iterations}")
+        else:
+            spent = budget.exhausted()
+            if spent:
+                logging.warning(f"Stopping before the first draft, {spent}")
+                return _deadline_result("", "", [], 0, [], spent, budget)
+            yield _Emit(DraftStarted(iteration=0))
+            text = yield from _best_draft({"scenario": scenario, "style": style}, candidates)
+            logging.debug("Generated initial text")
+            iterations = 0
+            yield _Emit(DraftFinished(iteration=0, text=text))
+            yield _Checkpoint({"text": text, "iterations": 0, "failures": []})
+        start = iterations
+        failures = []
+        all_reports = []
         
         # Track error message frequency to detect loops
         error_counts = Counter()  # type: Counter[str]
         
-        for i in range(max_iters):
+        # Detect stalled or oscillating loops, and remember the best text seen
+        tracker = ConvergenceTracker(patience=MAX_SAME_ERROR_ATTEMPTS)
+        
+        for i in range(start, max_iters):
             iterations = i + 1
-            logging.info(f"\nIteration {iterations}/{max_iters}")
-            
-            # Run evaluators and collect results
-            failures = []
-            all_reports = []
-            found_failure = False  # Track if we found any failures this iteration
+            with span("agent.iteration", iteration=iterations):
+                logging.info(f"\nIteration {iterations}/{max_iters}")
             
-            logging.debug(f"\nIteration {iterations}: Starting evaluator loop")
-            logging.debug(f"Current passing evaluators: {passing}")
+                # Run evaluators and collect results
+                failures = []
+                all_reports = []
+                repeated = None  # type: Optional[str]
             
-            # Reset passing set at the start of each iteration after the first failure
-            if failures_from_last_iter := (i > 0):
-                logging.debug("Resetting passing set for new iteration")
-                passing.clear()
+                logging.debug(f"\nIteration {iterations}: Starting evaluator loop")
             
-            for evaluator in evaluators:
-                # Get evaluator name before running
-                eval_name = (evaluator.__name__ if hasattr(evaluator, '__name__') 
-                           else 'evaluator')
+                # Short on time: run only the cheap deterministic evaluators
+                required_only = budget.short_on_time() or budget.exhausted() is not None
+                if required_only:
+                    logging.info("Short on time, skipping optional evaluators")
+                # The last iteration's report is final, so it runs every evaluator
+                results = yield _Evaluate(text, required_only, full=iterations == max_iters)
+                for eval_name, result in results:
+                    all_reports.append(_report(eval_name, result))
+                    yield _Emit(EvaluatorReport(iteration=iterations, **all_reports[-1]))
                 
-                # Skip if already passing and not first iteration and no failures found yet
-                if i > 0 and eval_name in passing and not found_failure:
-                    logging.debug(f"Skipping {eval_name} (already passing)")
-                    continue
-                
-                logging.debug(f"Running {eval_name} (found_failure={found_failure})")
+                    if isinstance(result, dict):
+                        if result["status"] == "PASS":
+                            logging.debug(f"{eval_name} passed")
+                        else:
+                            failures.append({"name": eval_name, "error": result.get("error", "Unknown error")})
+                            logging.debug(f"{eval_name} failed")
+                    else:
+                        if result:  # Uses __bool__ to check if PASS
+                            logging.debug(f"{eval_name} passed")
+                        else:
+                            failures.append(result)
+                            logging.debug(f"{eval_name} failed")
                 
-                # Run evaluator and handle both dict and EvalResult formats
-                result = evaluator(text)
+                    # Track error message if failure
+                    if isinstance(result, dict) and result["status"] == "FAIL":
+                        error_msg = result.get("error", "Unknown error")
+                        error_counts[error_msg] += 1
+                        if error_counts[error_msg] >= MAX_SAME_ERROR_ATTEMPTS and repeated is None:
+                            logging.warning(f"Error message repeated {MAX_SAME_ERROR_ATTEMPTS} times, giving up: {error_msg}")
+                            repeated = f"Max retries ({MAX_SAME_ERROR_ATTEMPTS}) exceeded for error: {error_msg}"
+                    elif not isinstance(result, dict):
+                        error_counts[result.error] += 1
+                        if error_counts[result.error] >= MAX_SAME_ERROR_ATTEMPTS and repeated is None:
+                            logging.warning(f"Error message repeated {MAX_SAME_ERROR_ATTEMPTS} times, giving up: {result.error}")
+                            repeated = f"Max retries ({MAX_SAME_ERROR_ATTEMPTS}) exceeded for error: {result.error}"
+            
+                logging.debug(f"End of iteration {iterations}")
+                logging.debug(f"Failures: {failures}")
+            
+                # A text that passed only the required evaluators is as far as time allows
+                if not failures and required_only:
+                    logging.info("Required evaluators passed, optional ones skipped")
+                    return _deadline_result(
+                        text, text, failures, iterations, all_reports,
+                        budget.exhausted() or "deadline: optional evaluators skipped", budget
+                    )
                 
-                # Convert dict result to standard format
-                if isinstance(result, dict):
-                    report = {
-                        "evaluator": eval_name,
-                        "status": result["status"],
-                        "details": result.get("error", "Pass")
+                # If no failures, we're done
+                if not failures:
+                    logging.info("All evaluators passed!")
+                    return {
+                        "text": text,
+                        "reports": "ALL_PASS",
+                        "iterations": iterations,
+                        "final_status": "success",
+                        "final_reports": all_reports
                     }
-                else:
-                    report = {
-                        "evaluator": result.name,
-                        "status": result.status,
-                        "details": result.error if result.status == "FAIL" else "Pass"
+            
+                # Stop early if further iterations would be wasted, or an
+                # error keeps coming back
+                reason = tracker.observe(
+                    text,
+                    failure_signature(_failure_pairs(failures)),
+                    score=1 - len(failures) / max(len(all_reports), 1)
+                )
+                if reason:
+                    logging.warning(f"Stopping early, loop is {reason}")
+                if reason or repeated:
+                    # The report describes the text returned: the best one
+                    return {
+                        "text": tracker.best_text,
+                        "last_text": text,
+                        "reports": _failure_pairs(failures),
+                        "iterations": iterations,
+                        "final_status": "failure",
+                        "final_reports": (yield from _final_reports(tracker.best_text, budget)),
+                        "reason": reason or repeated
                     }
                 
-                all_reports.append(report)
-                
-                if isinstance(result, dict):
-                    if result["status"] == "PASS":
-                        passing.add(eval_name)
-                        logging.debug(f"{eval_name} passed, added to passing set")
-                    else:
-                        failures.append({"name": eval_name, "error": result.get("error", "Unknown error")})
-                        found_failure = True
-                        logging.debug(f"{eval_name} failed")
-                else:
-                    if result:  # Uses __bool__ to check if PASS
-                        passing.add(result.name)
-                        logging.debug(f"{eval_name} passed, added to passing set")
+                logging.info(f"🔧 Found {len(failures)} issues to fix")
+                for f in failures:
+                    if isinstance(f, dict):
+                        logging.debug(f"  - {f['name']}: {f['error']}")
                     else:
-                        failures.append(result)
-                        found_failure = True
-                        logging.debug(f"{eval_name} failed")
+                        logging.debug(f"  - {f.name}: {f.error}")
                 
-                # Track error message if failure
-                if isinstance(result, dict) and result["status"] == "FAIL":
-                    error_msg = result.get("error", "Unknown error")
-                    error_counts[error_msg] += 1
-                    if error_counts[error_msg] >= MAX_SAME_ERROR_ATTEMPTS:
-                        logging.warning(f"Error message repeated {MAX_SAME_ERROR_ATTEMPTS} times, giving up: {error_msg}")
-                        return {
-                            "text": text,
-                            "reports": [(f["name"], f["error"]) for f in failures],
-                            "iterations": iterations,
-                            "final_status": "failure",
-                            "final_reports": all_reports,
-                            "reason": f"Max retries ({MAX_SAME_ERROR_ATTEMPTS}) exceeded for error: {error_msg}"
-                        }
-                elif not isinstance(result, dict):
-                    error_counts[result.error] += 1
-                    if error_counts[result.error] >= MAX_SAME_ERROR_ATTEMPTS:
-                        logging.warning(f"Error message repeated {MAX_SAME_ERROR_ATTEMPTS} times, giving up: {result.error}")
-                        return {
-                            "text": text,
-                            "reports": [(f.name, f.error) for f in failures],
-                            "iterations": iterations,
-                            "final_status": "failure",
-                            "final_reports": all_reports,
-                            "reason": f"Max retries ({MAX_SAME_ERROR_ATTEMPTS}) exceeded for error: {result.error}"
-                        }
-            
-            logging.debug(f"End of iteration {iterations}")
-            logging.debug(f"Failures: {failures}")
-            logging.debug(f"Passing set: {passing}")
-            
-            # If no failures, we're done
-            if not failures:
-                logging.info("All evaluators passed!")
-                return {
+                # Fix mechanical failures locally; only what is left goes to the LLM
+                to_fix = _failure_pairs(failures)
+                evaluated = text
+                if autofix:
+                    fixed, to_fix = fix_failures(text, to_fix)
+                    if fixed != text:
+                        logging.info(f"🛠️ Fixed {len(failures) - len(to_fix)} issue(s) locally")
+                        yield _Emit(LocalFix(iteration=iterations, text=fixed, llm_call_saved=not to_fix))
+                        text = fixed
+                
+                if to_fix:
+                    # Check the budget before paying for another draft
+                    spent = budget.exhausted()
+                    if spent:
+                        logging.warning(f"Stopping early, {spent}")
+                        return _deadline_result(
+                            tracker.best_text, text, failures, iterations, all_reports, spent, budget
+                        )
+                    
+                    # Combine all failure messages for a comprehensive fix
+                    all_errors = "\n".join(f"{name}: {error}" for name, error in to_fix)
+                    
+                    # Use previous and combined fixes for the LLM
+                    yield _Emit(FixRequested(iteration=iterations, failures=to_fix))
+                    yield _Emit(DraftStarted(iteration=iterations, fix=all_errors))
+                    fix_request = {
+                        "scenario": scenario,
+                        "style": style,
+                        "previous": text,
+                        "fix": all_errors
+                    }
+                    if fix_mode == "edits":
+                        fix_request["edits"] = True
+                    spans = _fix_spans(failures, to_fix) if targeted else None
+                    if spans:
+                        fix_request["spans"] = remap_spans(evaluated, text, spans)
+                    text = yield from _best_draft(fix_request, candidates)
+                    logging.debug("Generated improved text")
+                    yield _Emit(DraftFinished(iteration=iterations, text=text))
+                yield _Checkpoint({
                     "text": text,
-                    "reports": "ALL_PASS",
                     "iterations": iterations,
-                    "final_status": "success",
-                    "final_reports": all_reports
-                }
-                
-            # Combine all failure messages for a comprehensive fix
-            all_errors = "\n".join(
-                f"{f['name']}: {f['error']}" if isinstance(f, dict) else f"{f.name}: {f.error}"
-                for f in failures
-            )
-            logging.info(f"🔧 Found {len(failures)} issues to fix")
-            for f in failures:
-                if isinstance(f, dict):
-                    logging.debug(f"  - {f['name']}: {f['error']}")
-                else:
-                    logging.debug(f"  - {f.name}: {f.error}")
-            
-            # Use previous and combined fixes for the LLM
-            text = llm(
-                scenario=scenario,
-                style=style,
-                previous=text,
-                fix=all_errors
-            )
-            logging.debug("Generated improved text")
+                    "failures": _failure_pairs(failures)
+                })
         
         # If we get here, we've hit max iterations
         logging.warning(f"Hit maximum iterations ({max_iters})")
         return {
-            "text": text,
-            "reports": [(f["name"], f["error"]) if isinstance(f, dict) else (f.name, f.error) for f in failures],
+            "text": tracker.best_text if tracker.best_text is not None else text,
+            "last_text": text,
+            "reports": _failure_pairs(failures),
             "iterations": iterations,
             "final_status": "failure",
             "final_reports": all_reports
         }
 
+    except RetryError as error:
+        # Provider calls give up at the run's deadline (see doc_agent.budget)
+        spent = budget.exhausted()
+        if not spent and budget.deadline_s is not None and error.out_of_time:
+            spent = f"deadline: {budget.deadline_s:g}s would pass before the provider call finished"
+        if not spent:
+            raise
+        logging.warning(f"Stopping during a provider call, {spent}")
+        last = text if 'text' in locals() else ""
+        best = tracker.best_text if 'tracker' in locals() else None
+        return _deadline_result(
+            best if best is not None else last,
+            last,
+            failures if 'failures' in locals() else [],
+            iterations if 'iterations' in locals() else 0,
+            all_reports if 'all_reports' in locals() else [],
+            spent,
+            budget
+        )
+
     except KeyboardInterrupt:
         logging.warning("\nOperation interrupted by user")
         return {
@@ -196,6 +618,182 @@ def run_agent(
             "final_reports": all_reports if 'all_reports' in locals() else []
         }
 
+def _report(eval_name: str, result: Union[Dict[str, Any], EvalResult]) -> Dict[str, Any]:
+    """Convert a dict or EvalResult evaluator result to the standard report format."""
+    if isinstance(result, dict):
+        return {
+            "evaluator": eval_name,
+            "status": result["status"],
+            "details": result.get("error", "Pass")
+        }
+    return {
+        "evaluator": result.name,
+        "status": result.status,
+        "details": result.error if result.status == "FAIL" else "Pass"
+    }
+
+def _final_reports(text: str, budget: Budget) -> Generator[_Step, Any, List[Dict[str, Any]]]:
+    """Evaluate text without fail-fast for a final report.
+
+    Results already computed this run come from the memo, so only the
+    evaluators that fail-fast skipped are actually run. With the budget
+    spent or time short, only the deterministic evaluators run.
+    """
+    required_only = budget.short_on_time() or budget.exhausted() is not None
+    results = yield _Evaluate(text, required_only, full=True)
+    return [_report(eval_name, result) for eval_name, result in results]
+
+def _deadline_result(
+    text: str,
+    last_text: str,
+    failures: List[Any],
+    iterations: int,
+    all_reports: List[Dict[str, Any]],
+    reason: str,
+    budget: Budget
+) -> Dict[str, Any]:
+    """Build the result of a run stopped by its deadline or token budget."""
+    return {
+        "text": text,
+        "last_text": last_text,
+        "reports": _failure_pairs(failures),
+        "iterations": iterations,
+        "final_status": "deadline",
+        "final_reports": all_reports,
+        "reason": reason,
+        "tokens_used": budget.tokens_used
+    }
+
+def _failure_pairs(failures: List[Any]) -> List[Tuple[str, str]]:
+    """Return (evaluator name, error) pairs for dict and EvalResult failures."""
+    return [(f["name"], f["error"]) if isinstance(f, dict) else (f.name, f.error) for f in failures]
+
+def _fix_spans(failures: List[Any], to_fix: List[Tuple[str, str]]) -> Optional[List[Tuple[int, int]]]:
+    """Return the spans of the failures left in ``to_fix``, or None if one was not located.
+
+    Lines fixed locally are no longer in ``to_fix``; their spans are left out
+    when the evaluator reported spans per line, and otherwise the failure
+    counts as not located.
+    """
+    left = dict(to_fix)
+    spans = []
+    for f in failures:
+        name, error = _failure_pairs([f])[0]
+        if name not in left:
+            continue
+        lines = [line for line in error.splitlines() if line.strip()] or [error]
+        unfixed = set(left[name].splitlines()) if left[name] != error else set(lines)
+        by_line = f.get("line_spans") if isinstance(f, dict) else f.line_spans
+        located = f.get("spans") if isinstance(f, dict) else f.spans
+        if by_line and len(by_line) == len(lines):
+            located = [span for line, line_spans in zip(lines, by_line) if line in unfixed for span in line_spans]
+        elif len(unfixed) < len(lines):
+            return None
+        if not located:
+            return None
+        spans.extend(located)
+    return spans or None
+
+def _drive(
+    steps: Generator[_Step, Any, Dict[str, Any]],
+    handlers: Dict[type, Callable[[Any], Any]]
+) -> Iterator[AgentEvent]:
+    """Run the agent loop, answering each request with the blocking handler for its type.
+    
+    Events emitted by the loop are passed through, followed by Final.
+    """
+    saved = 0
+    try:
+        request = next(steps)
+        while True:
+            if isinstance(request, _Emit):
+                if isinstance(request.event, LocalFix) and request.event.llm_call_saved:
+                    saved += 1
+                yield request.event
+                request = steps.send(None)
+                continue
+            try:
+                response = handlers[type(request)](request)
+            except (KeyboardInterrupt, RetryError) as interrupt:
+                request = steps.throw(interrupt)
+            else:
+                request = steps.send(response)
+    except StopIteration as stop:
+        yield Final(dict(stop.value, llm_calls_saved=saved))
+    finally:
+        steps.close()
+
+async def _drive_async(
+    steps: Generator[_Step, Any, Dict[str, Any]],
+    handlers: Dict[type, Callable[[Any], Awaitable[Any]]]
+) -> AsyncIterator[AgentEvent]:
+    """Run the agent loop, awaiting the handler for each request. Cancellation propagates."""
+    saved = 0
+    try:
+        request = next(steps)
+        while True:
+            if isinstance(request, _Emit):
+                if isinstance(request.event, LocalFix) and request.event.llm_call_saved:
+                    saved += 1
+                yield request.event
+                request = steps.send(None)
+                continue
+            try:
+                response = await handlers[type(request)](request)
+            except (KeyboardInterrupt, RetryError) as interrupt:
+                request = steps.throw(interrupt)
+            else:
+                request = steps.send(response)
+    except StopIteration as stop:
+        yield Final(dict(stop.value, llm_calls_saved=saved))
+    finally:
+        steps.close()
+
+def _isolated(events: Iterator[AgentEvent]) -> Iterator[AgentEvent]:
+    """Pass ``events`` through, running each of its steps in a copy of the current context.
+    
+    Context variables it sets (the run's span and budget) stay in that copy
+    between events instead of leaking into the consumer's context.
+    """
+    context = contextvars.copy_context()
+    try:
+        while True:
+            try:
+                event = context.run(next, events)
+            except StopIteration:
+                return
+            yield event
+    finally:
+        context.run(events.close)  # type: ignore[attr-defined]
+
+async def _isolated_async(events: AsyncIterator[AgentEvent]) -> AsyncIterator[AgentEvent]:
+    """Async version of _isolated."""
+    context = contextvars.copy_context()
+    try:
+        while True:
+            try:
+                event = await _in_context(context, events.__anext__())
+            except StopAsyncIteration:
+                return
+            yield event
+    finally:
+        await _in_context(context, events.aclose())  # type: ignore[attr-defined]
+
+@types.coroutine
+def _in_context(context: contextvars.Context, coroutine: Awaitable[Any]) -> Generator[Any, Any, Any]:
+    """Await ``coroutine`` with every step of it run in ``context``."""
+    send, throw = coroutine.send, coroutine.throw  # type: ignore[attr-defined]
+    value, error = None, None  # type: Any, Optional[BaseException]
+    while True:
+        try:
+            waiting = context.run(throw, error) if error is not None else context.run(send, value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            value, error = (yield waiting), None
+        except BaseException as thrown:
+            value, error = None, thrown
+
 def run_doc_agent(
     scenario: str,
     style: str = "Clear and professional",
@@ -203,7 +801,21 @@ def run_doc_agent(
     evaluator_names: List[str] = None,
     forbidden_file: str = None,
     no_eval: bool = False,
-    fast: bool = False
+    fast: bool = False,
+    fail_fast: Optional[int] = None,
+    candidates: int = 1,
+    checkpoint_store: Optional[CheckpointStore] = None,
+    resume: bool = False,
+    deadline_s: Optional[float] = None,
+    token_budget: Optional[int] = None,
+    stats: Optional[EvaluatorStats] = None,
+    on_event: Optional[Callable[[AgentEvent], None]] = None,
+    autofix: bool = True,
+    fix_mode: str = "rewrite",
+    targeted: bool = False,
+    result_store: Optional[ResultStore] = None,
+    refresh: bool = False,
+    stream_drafts: bool = False
 ) -> Dict[str, Any]:
     """Generate and evaluate text using the doc agent.
     
@@ -219,14 +831,35 @@ def run_doc_agent(
         forbidden_file: Path to forbidden words file (default: built-in file)
         no_eval: If True, skips all evaluation (fastest, for development)
         fast: If True, uses only fast evaluators (no AI calls)
+        fail_fast: If set, stop evaluating an iteration after this many failures
+        candidates: Drafts to request per LLM call; the best is kept (best-of-N)
+        checkpoint_store: If given, the loop state is saved there after every iteration
+        resume: If True, return a completed run's stored result, or continue an
+            unfinished run from its last checkpoint
+        deadline_s: Wall-clock seconds the run may take
+        token_budget: Provider tokens the run may spend
+        stats: If given, evaluators are ordered by these learned statistics,
+            which are updated and saved after the run
+        on_event: Called with every AgentEvent as the loop runs. A run
+            answered from the checkpoint store emits no events.
+        autofix: Fix mechanical failures locally before asking the LLM
+        fix_mode: "rewrite" for full-text fixes, "edits" for edit operations
+        targeted: Rewrite only the failing sentences when the evaluators located them
+        result_store: If given, a stored successful result for the same inputs,
+            evaluators and forbidden list is returned without running the
+            agent, and successful results are stored (see doc_agent.results)
+        refresh: With result_store, ignore the stored result and replace it
+        stream_drafts: Stream drafts and stop one as soon as a forbidden word
+            appears, re-prompting right away (see draft.draft_guard)
         
     Returns:
         Dict containing:
             - text: The final generated text
             - reports: List of evaluation reports or "ALL_PASS"
             - iterations: Number of iterations taken
-            - final_status: "success" or "failure"
+            - final_status: "success", "failure" or "deadline"
             - final_reports: List of evaluation results
+            - cached: True if the result came from result_store
     """
     evaluators = get_evaluators(
         evaluator_names,
@@ -234,10 +867,274 @@ def run_doc_agent(
         no_eval=no_eval,
         fast=fast
     )
-    return run_agent(
+    # Every option that changes the loop's output, for both the result and checkpoint keys
+    options = {
+        "max_iters": max_iters,
+        "fail_fast": fail_fast,
+        "candidates": candidates,
+        "autofix": autofix,
+        "fix_mode": fix_mode,
+        "targeted": targeted
+    }
+    stored_key = None
+    if result_store is not None:
+        stored_key = result_key(
+            scenario,
+            style,
+            [str(evaluator_id(evaluator)) for evaluator in evaluators],
+            forbidden_list_version(forbidden_file or FORBIDDEN_FILE),
+            options
+        )
+        stored = None if refresh else result_store.get(stored_key)
+        if stored is not None:
+            logging.info("Returning stored result (found in result store)")
+            return dict(stored, cached=True)
+    
+    key = _agent_item_key(scenario, style, evaluators, options)
+    result = _run_checkpointed(checkpoint_store, key, resume, lambda state, save: run_agent(
         scenario=scenario,
         style=style,
         evaluators=evaluators,
-        llm=draft_copy_tool,
-        max_iters=max_iters
-    ) 
\ No newline at end of file
+        llm=functools.partial(
+            draft_copy_tool, stream=True, forbidden_file=forbidden_file or FORBIDDEN_FILE
+        ) if stream_drafts else draft_copy_tool,
+        max_iters=max_iters,
+        fail_fast=fail_fast,
+        candidates=candidates,
+        resume_state=state,
+        on_checkpoint=save,
+        deadline_s=deadline_s,
+        token_budget=token_budget,
+        stats=stats,
+        on_event=on_event,
+        autofix=autofix,
+        fix_mode=fix_mode,
+        targeted=targeted
+    ))
+    if stats is not None:
+        stats.save()
+    if result_store is not None:
+        result_store.put(stored_key, result)
+    return result
+
+def _agent_item_key(
+    scenario: str,
+    style: str,
+    evaluators: List[Callable],
+    options: Dict[str, Any]
+) -> str:
+    """Checkpoint key for one agent run."""
+    return item_key(
+        "agent",
+        scenario=scenario,
+        style=style,
+        evaluators=[str(evaluator_id(evaluator)) for evaluator in evaluators],
+        options=options
+    )
+
+def _run_checkpointed(
+    store: Optional[CheckpointStore],
+    key: str,
+    resume: bool,
+    run: Callable[[Optional[Dict[str, Any]], Optional[Callable[[Dict[str, Any]], None]]], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Run one agent item, saving its progress to ``store`` and resuming from it if asked."""
+    if store is None:
+        return run(None, None)
+    state = None
+    if resume:
+        done = store.completed(key)
+        if done is not None:
+            logging.info("Skipping completed item (found in checkpoint store)")
+            return done
+        state = store.state(key)
+    result = run(state, lambda new_state: store.save_state(key, new_state))
+    # Interrupted and out-of-budget runs keep their last state so they can be resumed
+    if result["final_status"] not in ("interrupted", "deadline"):
+        store.save_result(key, result)
+    return result
+
+
+def run_doc_agent_many(
+    items: Iterable[Sequence[Any]],
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    evaluator_names: List[str] = None,
+    forbidden_file: str = None,
+    no_eval: bool = False,
+    fast: bool = False,
+    llm: Callable = draft_copy_tool,
+    checkpoint_store: Optional[CheckpointStore] = None,
+    resume: bool = False,
+    stats: Optional[EvaluatorStats] = None
+) -> Iterator[Dict[str, Any]]:
+    """Run the doc agent over many scenarios with one concurrency bound.
+    
+    Evaluators are built once and shared by every item, together with the
+    OpenAI client and the evaluator caches. Items are read lazily, so at most
+    ``max_concurrency`` of them are in flight at any time. A failing item is
+    reported and the batch carries on.
+    
+    Args:
+        items: Iterable of (scenario, style) or (scenario, style, options) tuples,
+            where options is a dict of run_agent keyword arguments such as
+            max_iters or fail_fast
+        max_concurrency: Maximum number of items running at the same time
+        evaluator_names: List of evaluator names to use (default: default evaluators)
+        forbidden_file: Path to forbidden words file (default: built-in file)
+        no_eval: If True, skips all evaluation
+        fast: If True, uses only fast evaluators (no AI calls)
+        llm: The language model to use for generation and fixes
+        checkpoint_store: If given, every item's loop state is saved there after
+            each iteration
+        resume: If True, completed items come straight from the store and
+            unfinished ones continue from their last checkpoint
+        stats: Learned evaluator statistics shared by every item; saved
+            when the batch finishes
+        
+    Yields:
+        Dict per item, in completion order, containing:
+            - index: Position of the item in ``items``
+            - scenario: The item's scenario
+            - style: The item's style
+            - result: The run_agent result dict, or None if the item failed
+            - error: Error message if the item raised, otherwise None
+            - elapsed_s: Wall-clock seconds spent on the item
+    """
+    evaluators = get_evaluators(
+        evaluator_names,
+        forbidden_file=forbidden_file or FORBIDDEN_FILE,
+        no_eval=no_eval,
+        fast=fast
+    )
+    
+    def _run_item(index: int, item: Sequence[Any]) -> Dict[str, Any]:
+        scenario, style = item[0], item[1]
+        options = dict(item[2]) if len(item) > 2 and item[2] else {}
+        start = time.perf_counter()
+        try:
+            key = _agent_item_key(scenario, style, evaluators, options)
+            result = _run_checkpointed(checkpoint_store, key, resume, lambda state, save: run_agent(
+                scenario=scenario,
+                style=style,
+                evaluators=evaluators,
+                llm=llm,
+                resume_state=state,
+                on_checkpoint=save,
+                stats=stats,
+                **options
+            ))
+            error = None
+        except Exception as e:
+            logging.error(f"Batch item {index} failed: {e}")
+            result, error = None, str(e)
+        return {
+            "index": index,
+            "scenario": scenario,
+            "style": style,
+            "result": result,
+            "error": error,
+            "elapsed_s": time.perf_counter() - start
+        }
+    
+    source = enumerate(items)
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="doc-agent-batch") as pool:
+        pending = set()
+        for index, item in source:
+            pending.add(pool.submit(_run_item, index, item))
+            if len(pending) >= max_concurrency:
+                break
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+                    # Refill the window as items finish
+                    for index, item in source:
+                        pending.add(pool.submit(_run_item, index, item))
+                        break
+        finally:
+            # A consumer that stops early (break, close, error) must not leave
+            # queued items to run while the executor shuts down
+            for fut in pending:
+                fut.cancel()
+    if stats is not None:
+        stats.save()
+
+def run_doc_agent_styles(
+    scenario: str,
+    styles: Sequence[str],
+    max_concurrency: Optional[int] = None,
+    shared_base: bool = False,
+    evaluator_names: List[str] = None,
+    forbidden_file: str = None,
+    no_eval: bool = False,
+    fast: bool = False,
+    llm: Callable = draft_copy_tool,
+    checkpoint_store: Optional[CheckpointStore] = None,
+    resume: bool = False,
+    stats: Optional[EvaluatorStats] = None,
+    **options: Any
+) -> Dict[str, Dict[str, Any]]:
+    """Write one scenario in several styles at the same time.
+    
+    The styles run as one run_doc_agent_many batch, so they share the
+    evaluators, the OpenAI client, the evaluator result caches (static
+    checks of identical text run once) and the single-flight request table.
+    
+    Args:
+        scenario: The scenario to generate text for
+        styles: The styles to write it in, e.g. inline error, toast and email
+        max_concurrency: Styles running at the same time (default: all)
+        shared_base: Draft the scenario once in BASE_STYLE and adapt that
+            draft to each style, instead of drafting every style from scratch.
+            If the base draft fails, every style is drafted from scratch.
+        evaluator_names: List of evaluator names to use (default: default evaluators)
+        forbidden_file: Path to forbidden words file (default: built-in file)
+        no_eval: If True, skips all evaluation
+        fast: If True, uses only fast evaluators (no AI calls)
+        llm: The language model to use for generation and fixes
+        checkpoint_store: If given, every style's loop state is saved there
+        resume: If True, continue from checkpoint_store
+        stats: Learned evaluator statistics shared by every style
+        **options: run_agent keyword arguments applied to every style, such
+            as max_iters, candidates or fix_mode
+        
+    Returns:
+        Dict mapping each style, in the given order, to its run_doc_agent_many
+        item (result, error and elapsed_s)
+    """
+    styles = list(dict.fromkeys(styles))
+    if not styles:
+        return {}
+    if shared_base:
+        logging.info(f"Drafting shared base text in {BASE_STYLE} style")
+        try:
+            llm = _adapting(llm, llm(scenario=scenario, style=BASE_STYLE))
+        except Exception as e:
+            logging.warning(f"Shared base draft failed, drafting each style from scratch: {e}")
+    items = run_doc_agent_many(
+        [(scenario, style, options) for style in styles],
+        max_concurrency=max_concurrency or len(styles),
+        evaluator_names=evaluator_names,
+        forbidden_file=forbidden_file,
+        no_eval=no_eval,
+        fast=fast,
+        llm=llm,
+        checkpoint_store=checkpoint_store,
+        resume=resume,
+        stats=stats
+    )
+    by_style = {item["style"]: item for item in items}
+    return {style: by_style[style] for style in styles}
+
+def _adapting(llm: Callable, base: str) -> Callable:
+    """Wrap llm so first drafts adapt ``base`` to the requested style instead of starting cold.
+
+    Adaptations are passed ``adapt=True`` (see draft_copy_tool).
+    """
+    def _llm(scenario: str, style: str, previous: str = None, fix: str = None, **kwargs: Any) -> Any:
+        if previous is None and fix is None:
+            previous, fix = base, ADAPT_STYLE_FIX.format(style=style)
+            kwargs["adapt"] = True
+        return llm(scenario=scenario, style=style, previous=previous, fix=fix, **kwargs)
+    return _llm
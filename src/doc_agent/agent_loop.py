@@ -6,6 +6,7 @@ and a suite of AI‐driven evaluations (clarity, tone, empathy).
 
 import os
 from typing import Dict
+from doc_agent.autofix import apply_fixes
 from doc_agent.evaluators.heuristics import run_heuristics
 from doc_agent.draft import draft_copy_tool
 from doc_agent.tools import lint_copy, build_fix
@@ -24,19 +25,32 @@ def run_agent_loop(
     style: str,
     forbidden_file: str,
     max_iters: int = 10,
+    autofix: bool = True,
+    fix_mode: str = "rewrite",
 ) -> str:
     text = draft_copy_tool(scenario=scenario, style=style)
+    saved = 0
+    # "edits" asks for edit operations applied locally instead of a full rewrite
+    fix_options = {"edits": True} if fix_mode == "edits" else {}
 
     for i in range(1, max_iters + 1):
         heur = run_heuristics(text, forbidden_file=forbidden_file)
         if heur["errors"]:
-            fix_prompt = build_fix(heur["errors"])
+            errors = heur["errors"]
+            if autofix:
+                text, errors = _fix_locally(text, errors)
+                if not errors:
+                    print(f"🛠️ Iter {i}: heuristic issues fixed locally")
+                    saved += 1
+                    continue
+            fix_prompt = build_fix(errors)
             print(f"🔧 Iter {i}: heuristic fixes → {fix_prompt}")
             text = draft_copy_tool(
                 scenario=scenario,
                 style=style,
                 previous=text,
                 fix=fix_prompt,
+                **fix_options,
             )
             continue
 
@@ -45,20 +59,37 @@ def run_agent_loop(
             print(f"✅ Iter {i}: lint passed")
             break
 
-        fix_prompt = build_fix(lint_result["errors"])
+        errors = lint_result["errors"]
+        if autofix:
+            text, errors = _fix_locally(text, errors)
+            if not errors:
+                print(f"🛠️ Iter {i}: lint issues fixed locally")
+                saved += 1
+                continue
+        fix_prompt = build_fix(errors)
         print(f"🔧 Iter {i}: lint fixes → {fix_prompt}")
         text = draft_copy_tool(
             scenario=scenario,
             style=style,
             previous=text,
             fix=fix_prompt,
+            **fix_options,
         )
     else:
         raise RuntimeError(f"No PASS after {max_iters} iterations")
 
+    if saved:
+        print(f"💡 Local fixes saved {saved} LLM call(s)")
     return text
 
 
+def _fix_locally(text: str, errors: list) -> tuple:
+    """Apply the autofix rules; return the text and the errors still needing the LLM."""
+    messages = [err.get("msg") if isinstance(err, dict) else str(err) for err in errors]
+    fixed, remaining = apply_fixes(text, messages)
+    return fixed, [err for err, msg in zip(errors, messages) if msg in remaining]
+
+
 def main():
     here = os.path.dirname(__file__)
     forbidden_file = os.path.join(here, "evaluators", "forbidden_words.txt")
@@ -0,0 +1,223 @@
+"""
+Deterministic local fixes for mechanical lint and heuristic failures.
+
+Messages such as "missing trailing period" or "weasel word: very" do not
+need a GPT-4 rewrite. ``apply_fixes`` edits the text for every message it
+has a rule for and hands back the messages it could not fix, so the agent
+loops only ask the LLM about what is left. A message only counts as fixed
+when its rule actually changed the text (or an earlier fix already took
+care of it, like unquoting '"Save it."'); the next evaluation re-checks it.
+
+Rules, applied in this order whatever order the messages come in:
+
+- wrapped in quotation marks: strip the surrounding quotes
+- missing trailing period: add the period, unless the text already ends a
+  sentence ("!", "?", or a period inside a closing quote or bracket)
+- weasel word: remove it ("in order to" becomes "to")
+- acronym detected: expand known acronyms. The heuristic flags every
+  all-caps token, so every occurrence is expanded, not just the first.
+- forbidden word: swap in a synonym from FORBIDDEN_SYNONYMS. Words are
+  only replaced standing alone, not inside hyphenated compounds.
+
+Rewording a sentence to start with an imperative verb is left to the LLM.
+"""
+
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Replacements for forbidden words (and the variants the heuristic matches);
+# an empty string removes the word
+FORBIDDEN_SYNONYMS = {
+    "please": "",
+    "seamless": "smooth",
+    "seamlessly": "smoothly",
+    "streamline": "simplify",
+    "streamlines": "simplifies",
+    "streamlining": "simplifying",
+}
+
+# Weasel words that read better replaced than removed
+WEASEL_REPLACEMENTS = {
+    "in order to": "to",
+}
+
+ACRONYM_EXPANSIONS = {
+    "API": "Application Programming Interface",
+    "CLI": "command-line interface",
+    "CSS": "Cascading Style Sheets",
+    "HTML": "HyperText Markup Language",
+    "HTTP": "Hypertext Transfer Protocol",
+    "JSON": "JavaScript Object Notation",
+    "SDK": "software development kit",
+    "UI": "user interface",
+    "URL": "web address",
+}
+
+QUOTE_PAIRS = {'"': '"', "'": "'", "“": "”", "‘": "’"}
+
+_SENTENCE_START = re.compile(r"(?:^|[.!?]\s+)$")
+
+# Text ending a sentence, possibly inside closing quotes or brackets
+_SENTENCE_END = re.compile(r"[.!?…][\"'”’)\]]*$")
+
+
+def _match_case(replacement: str, original: str) -> str:
+    """Capitalize the replacement if the replaced word was capitalized."""
+    if replacement and original[:1].isupper():
+        return replacement[0].upper() + replacement[1:]
+    return replacement
+
+
+def _replace_words(text: str, pattern: str, replace: Callable[[str], Optional[str]]) -> str:
+    """Replace every match of ``pattern``; ``replace`` returns None to leave the text untouched.
+
+    Removing a word at the start of a sentence capitalizes the word after it.
+    """
+    # Words inside hyphenated compounds ("Please-Wait") are left alone
+    regex = re.compile(rf"(?<![\w-]){pattern}(?![\w-])(?:,?[ \t]+|,(?=\s|$))?", re.IGNORECASE)
+    matches = list(regex.finditer(text))
+    replacements = [replace(m.group(0).rstrip(", \t")) for m in matches]
+    if not matches or any(r is None for r in replacements):
+        return text
+
+    out, last, capitalize = [], 0, False
+    for match, replacement in zip(matches, replacements):
+        before = text[last:match.start()]
+        if capitalize:
+            before = before[:1].upper() + before[1:]
+        trailing = match.group(0)[len(match.group(0).rstrip(", \t")):]
+        if replacement:
+            out.append(before + _match_case(replacement, match.group(0)) + trailing)
+            capitalize = False
+        else:
+            # A word removed before punctuation takes its leading separator with it
+            if not trailing and re.match(r"[.!?;:]|$", text[match.end():]):
+                before = before.rstrip(", \t")
+            out.append(before)
+            capitalize = bool(_SENTENCE_START.search(text[:match.start()]))
+        last = match.end()
+    rest = text[last:]
+    if capitalize:
+        rest = rest[:1].upper() + rest[1:]
+    out.append(rest)
+    return "".join(out)
+
+
+def strip_quotes(text: str) -> str:
+    """Remove one pair of quotation marks wrapping the whole text."""
+    stripped = text.strip()
+    if len(stripped) >= 2 and QUOTE_PAIRS.get(stripped[0]) == stripped[-1]:
+        return stripped[1:-1].strip()
+    return text
+
+
+def _ends_sentence(text: str) -> bool:
+    return bool(_SENTENCE_END.search(text.rstrip()))
+
+
+def _add_period(text: str, _: str) -> str:
+    stripped = text.rstrip()
+    if _ends_sentence(stripped):
+        return text
+    return stripped.rstrip(",;:") + "."
+
+
+def _remove_weasel(text: str, word: str) -> str:
+    replacement = WEASEL_REPLACEMENTS.get(word.lower(), "")
+    return _replace_words(text, re.escape(word), lambda found: replacement)
+
+
+def _expand_acronym(text: str, acronym: str) -> str:
+    expansion = ACRONYM_EXPANSIONS.get(acronym)
+    if expansion is None:
+        return text
+    return re.sub(rf"\b{re.escape(acronym)}(s?)\b", lambda m: expansion + m.group(1), text)
+
+
+def _swap_forbidden(text: str, word: str) -> str:
+    return _replace_words(
+        text,
+        rf"{re.escape(word)}(?:ly|ing|ed|s|es)?",
+        lambda found: FORBIDDEN_SYNONYMS.get(found.lower())
+    )
+
+
+def _unquote(text: str, _: str) -> str:
+    return strip_quotes(text)
+
+
+# (message pattern, fix) pairs; the fix gets the text and the pattern's first group
+# (message pattern, fix) pairs; the fix gets the text and the pattern's first group.
+# Unquoting comes first so the period rule sees the unwrapped text.
+RULES = [
+    (re.compile(r"^wrapped in quotation marks$"), _unquote),
+    (re.compile(r"^missing trailing period$"), _add_period),
+    (re.compile(r"^weasel word: (.+)$"), _remove_weasel),
+    (re.compile(r"^acronym detected: (\w+)$"), _expand_acronym),
+    (re.compile(r"^forbidden word: (.+)$"), _swap_forbidden),
+]  # type: List[Tuple[re.Pattern, Callable[[str, str], str]]]
+
+# Messages an earlier fix may already have resolved, with the check that tells
+RECHECKS = {
+    "missing trailing period": _ends_sentence,
+}  # type: Dict[str, Callable[[str], bool]]
+
+
+def _rule_index(message: str) -> int:
+    """Position of the rule for ``message`` in RULES (len(RULES) if there is none)."""
+    for index, (pattern, _) in enumerate(RULES):
+        if pattern.match(message.strip()):
+            return index
+    return len(RULES)
+
+
+def _apply_rule(text: str, message: str) -> str:
+    """Return text with the rule for ``message`` applied (unchanged if there is none)."""
+    for pattern, fix in RULES:
+        match = pattern.match(message.strip())
+        if match:
+            return fix(text, match.group(1) if match.groups() else "")
+    return text
+
+
+def apply_fixes(text: str, messages: Iterable[str]) -> Tuple[str, List[str]]:
+    """Fix what can be fixed locally.
+
+    Args:
+        text: The text that failed
+        messages: One error message per failure, as produced by
+            ``run_heuristics`` and ``short_description.check``
+
+    Returns:
+        (fixed text, messages that still need the LLM, in the order given)
+    """
+    messages = list(messages)
+    fixed = text
+    fixed_messages = set()
+    for message in sorted(dict.fromkeys(messages), key=_rule_index):
+        edited = _apply_rule(fixed, message)
+        recheck = RECHECKS.get(message.strip())
+        if edited != fixed or (fixed != text and recheck is not None and recheck(fixed)):
+            fixed_messages.add(message)
+            fixed = edited
+    return fixed, [message for message in messages if message not in fixed_messages]
+
+
+def fix_failures(text: str, failures: List[Tuple[str, str]]) -> Tuple[str, List[Tuple[str, str]]]:
+    """Apply local fixes to (evaluator name, error) failures.
+
+    Multi-line errors (the heuristics evaluator reports one message per line)
+    are fixed line by line.
+
+    Returns:
+        (fixed text, the failures, reduced to their unfixed lines, that still
+        need the LLM)
+    """
+    lines = [line for _, error in failures for line in error.splitlines() if line.strip()]
+    fixed, remaining = apply_fixes(text, lines)
+    left = []
+    for name, error in failures:
+        unfixed = [line for line in error.splitlines() if line in remaining]
+        if unfixed or not error.strip():
+            left.append((name, "\n".join(unfixed) or error))
+    return fixed, left
@@ -0,0 +1,116 @@
+"""
+Wall-clock and token budgets for one agent run.
+
+A ``Budget`` is started when the run starts. The agent loop checks it before
+every LLM call and stops with ``final_status="deadline"`` once it is spent.
+Token usage is metered in ``llm``: every provider response reports its
+usage to the budget installed with ``metering()`` for the current context.
+The context is copied into evaluator threads and tasks, so tokens spent by
+the AI evaluators count too. Provider calls also cut their request timeout
+and retry deadline to the time left (``request_timeout``, ``time_left``), so
+a run does not overshoot its deadline by a slow or retried call.
+"""
+
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+# With less than this fraction of the deadline left, optional evaluators are skipped
+LOW_TIME_FRACTION = 0.25
+
+# Shortest request timeout handed to the provider near the deadline
+MIN_REQUEST_TIMEOUT = 0.1
+
+_active = contextvars.ContextVar("doc_agent_budget", default=None)  # type: contextvars.ContextVar[Optional[Budget]]
+
+
+class Budget:
+    """Deadline and token allowance for one run. Both limits are optional.
+
+    Args:
+        deadline_s: Wall-clock seconds the run may take
+        token_budget: Prompt plus completion tokens the run may spend
+        clock: Monotonic clock, replaceable in tests
+    """
+
+    def __init__(
+        self,
+        deadline_s: Optional[float] = None,
+        token_budget: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.deadline_s = deadline_s
+        self.token_budget = token_budget
+        self.tokens_used = 0
+        self._clock = clock
+        self._started = clock()
+        self._lock = threading.Lock()
+
+    def add_tokens(self, tokens: int) -> None:
+        """Record tokens spent by one provider call."""
+        with self._lock:
+            self.tokens_used += tokens
+
+    def elapsed(self) -> float:
+        """Seconds since the budget was started."""
+        return self._clock() - self._started
+
+    def remaining_s(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without a deadline."""
+        if self.deadline_s is None:
+            return None
+        return self.deadline_s - self.elapsed()
+
+    def exhausted(self) -> Optional[str]:
+        """Return why no further LLM call may be made, or None if one may."""
+        remaining = self.remaining_s()
+        if remaining is not None and remaining <= 0:
+            return f"deadline: {self.deadline_s:g}s elapsed"
+        if self.token_budget is not None and self.tokens_used >= self.token_budget:
+            return f"token budget: {self.tokens_used} of {self.token_budget} tokens used"
+        return None
+
+    def short_on_time(self) -> bool:
+        """True when too little time is left to run the optional evaluators."""
+        remaining = self.remaining_s()
+        return remaining is not None and remaining < self.deadline_s * LOW_TIME_FRACTION
+
+
+@contextlib.contextmanager
+def metering(budget: Budget) -> Iterator[Budget]:
+    """Charge tokens reported by ``record_tokens`` in this context to ``budget``."""
+    token = _active.set(budget)
+    try:
+        yield budget
+    finally:
+        _active.reset(token)
+
+
+def current_budget() -> Optional[Budget]:
+    """Return the budget metered in this context, if there is one."""
+    return _active.get()
+
+
+def time_left() -> Optional[float]:
+    """Seconds left on the current context's deadline, or None without one."""
+    budget = _active.get()
+    return budget.remaining_s() if budget is not None else None
+
+
+def request_timeout(default: Optional[float]) -> Optional[float]:
+    """Cut a provider request timeout (None: the provider's own) down to the time left on the deadline."""
+    remaining = time_left()
+    if remaining is None:
+        return default
+    if default is not None:
+        remaining = min(default, remaining)
+    return max(remaining, MIN_REQUEST_TIMEOUT)
+
+
+def record_tokens(tokens: Optional[int]) -> None:
+    """Charge tokens to the budget of the current context, if there is one."""
+    budget = _active.get()
+    if budget is not None and tokens:
+        budget.add_tokens(tokens)
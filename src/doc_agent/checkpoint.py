@@ -0,0 +1,66 @@
+"""
+Local checkpoints for long-running agent and pipeline batches.
+
+Each item (one agent run or one processed document) gets a record keyed by
+a hash of its inputs. The agent loop saves its state after every iteration
+and the pipeline after every stage, so a batch that dies partway through can
+be resumed: completed items are skipped and partly done items continue from
+their last checkpoint instead of paying for every LLM call again.
+"""
+
+from typing import Any, Dict, Optional
+
+from doc_agent.store import JsonStore, hash_key
+
+# Default location used by the CLI's --resume flag
+DEFAULT_CHECKPOINT_DIR = ".doc_agent/checkpoints"
+
+
+def item_key(kind: str, **inputs: Any) -> str:
+    """Build the checkpoint key for one item from everything that affects its result."""
+    return hash_key(kind, inputs)
+
+
+class CheckpointStore:
+    """Per-item checkpoint records on the local filesystem.
+
+    A record looks like::
+
+        {"status": "running" | "done", "state": {...}, "result": {...}}
+
+    Args:
+        root: Directory holding the records
+    """
+
+    def __init__(self, root: str = DEFAULT_CHECKPOINT_DIR):
+        self.store = JsonStore(root)
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the record for ``key``, or None if there is none."""
+        return self.store.get(key)
+
+    def save_state(self, key: str, state: Dict[str, Any]) -> None:
+        """Record the progress of an unfinished item."""
+        self.store.put(key, {"status": "running", "state": state})
+
+    def save_result(self, key: str, result: Dict[str, Any]) -> None:
+        """Mark an item as completed with its final result."""
+        self.store.put(key, {"status": "done", "result": result})
+
+    def completed(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored result if the item has completed, else None."""
+        record = self.load(key)
+        if record and record.get("status") == "done":
+            return record["result"]
+        return None
+
+    def state(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the last saved state of an unfinished item, else None."""
+        record = self.load(key)
+        if record and record.get("status") == "running":
+            return record.get("state")
+        return None
+
+    def clear(self, key: str) -> None:
+        """Forget an item."""
+        self.store.delete(key)
@@ -0,0 +1,113 @@
+"""
+Stuck-loop detection for the agent loop.
+
+AI evaluators word their explanations differently on every call, so a loop
+that is not making progress rarely repeats the exact same error string.
+Instead, each iteration's failures are reduced to a signature of
+(evaluator, rule) pairs, and the drafted texts are compared with each other:
+
+- stalled: the same failure signature for ``patience`` iterations in a row
+- oscillating: the text returns to a version from two or more iterations
+  back (A -> B -> A'), where A' is at least ``SIMILARITY_THRESHOLD``
+  similar to A and closer to it than to B. A long text that changes by a
+  word per iteration stays very similar to every earlier version, but it
+  is always closest to the version just before it, so it still counts as
+  making progress.
+
+The tracker also remembers the best-scoring text seen, so a run that gives
+up can return that instead of its last draft.
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+# Texts at least this similar count as near-identical versions
+SIMILARITY_THRESHOLD = 0.95
+
+# Consecutive iterations with the same failure signature before giving up
+DEFAULT_PATIENCE = 3
+
+Signature = FrozenSet[Tuple[str, str]]
+
+
+def failure_rule(message: str) -> str:
+    """Reduce one error line to a stable rule name.
+
+    "weasel word: very" -> "weasel word", "sentence exceeds 20 words" ->
+    "sentence exceeds # words". Free-text explanations that do not look like
+    a rule collapse to "*" (the evaluator itself is the signature).
+    """
+    line = message.strip().lower()
+    prefix, sep, _ = line.partition(":")
+    if sep and len(prefix) <= 40:
+        line = prefix
+    elif len(line) > 60:
+        return "*"
+    return re.sub(r"\d+", "#", line).strip()
+
+
+def failure_signature(failures: Iterable[Tuple[str, str]]) -> Signature:
+    """Build the signature of an iteration from (evaluator name, error) pairs."""
+    return frozenset(
+        (name, failure_rule(line))
+        for name, error in failures
+        for line in (error or "").splitlines() or [""]
+    )
+
+
+def similarity(a: str, b: str) -> float:
+    """Return a 0..1 similarity ratio between two texts, ignoring whitespace differences."""
+    return SequenceMatcher(None, " ".join(a.split()), " ".join(b.split())).ratio()
+
+
+class ConvergenceTracker:
+    """Watch agent iterations and decide when further ones are wasted.
+
+    Args:
+        patience: Iterations in a row with an unchanged failure signature
+            before the loop counts as stalled
+        threshold: Similarity at which an earlier text counts as the version
+            the loop returned to
+    """
+
+    def __init__(self, patience: int = DEFAULT_PATIENCE, threshold: float = SIMILARITY_THRESHOLD):
+        self.patience = patience
+        self.threshold = threshold
+        self.best_text = None  # type: Optional[str]
+        self.best_score = -1.0
+        self._texts = []  # type: List[str]
+        self._signatures = []  # type: List[Signature]
+
+    def observe(self, text: str, signature: Signature, score: float) -> Optional[str]:
+        """Record one evaluated iteration.
+
+        Args:
+            text: The text that was evaluated
+            signature: Its failure signature (empty when everything passed)
+            score: Fraction of evaluators that passed
+
+        Returns:
+            A reason string if the loop should stop, otherwise None
+        """
+        if score > self.best_score:
+            self.best_text, self.best_score = text, score
+
+        reason = None
+        recent = self._signatures[-(self.patience - 1):] if self.patience > 1 else []
+        if signature and len(recent) == self.patience - 1 and all(s == signature for s in recent):
+            reason = f"stalled: same failures for {self.patience} iterations"
+        elif signature and self._returned(text):
+            reason = "oscillating: text returned to an earlier version"
+
+        self._texts.append(text)
+        self._signatures.append(signature)
+        return reason
+
+    def _returned(self, text: str) -> bool:
+        """Whether text is back at a version older than the last one."""
+        if len(self._texts) < 2:
+            return False
+        previous = similarity(text, self._texts[-1])
+        closest = max(similarity(text, earlier) for earlier in self._texts[:-1])
+        return closest >= self.threshold and closest > previous
@@ -0,0 +1,191 @@
+"""
+Token-budgeted digest of a function's source for the drafting prompts.
+
+Sources that fit the budget are sent as they are. A larger source is
+replaced by a digest of:
+
+- the signature
+- the JSDoc metadata from ingestion (parameters and return value), which
+  the cleaned source no longer contains
+- the identifiers the source refers to
+- the body lines that matter most for documenting it (returns and throws,
+  lines using the parameters, calls, control flow), kept in source order
+  with "..." where lines were left out
+
+The whole digest, header included, fits the budget: when the header alone
+would not, the signature and return value are kept and parameters are
+listed only as far as they fit.
+
+Tokens are estimated at CHARS_PER_TOKEN characters each, which is close
+enough to keep prompts inside a budget without a tokenizer dependency.
+Digests are cached per source, so every section of a document shares one.
+Bump DIGEST_VERSION whenever the digest format or heuristics change; it is
+part of the section cache key (see doc_agent.section_cache).
+"""
+
+import functools
+import json
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+CHARS_PER_TOKEN = 4
+
+# Bump whenever _digest or DEFAULT_DIGEST_TOKENS changes
+DIGEST_VERSION = 1
+
+# Default token budget for the source part of a drafting prompt
+DEFAULT_DIGEST_TOKENS = 1500
+
+# Identifiers listed at most, in order of first use
+MAX_IDENTIFIERS = 40
+
+JS_KEYWORDS = frozenset("""
+    async await break case catch class const continue debugger default delete do else export
+    extends false finally for function if import in instanceof let new null of return static
+    super switch this throw true try typeof undefined var void while with yield
+""".split())
+
+IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*")
+CALL = re.compile(r"[A-Za-z_$][\w$]*\s*\(")
+CONTROL_FLOW = re.compile(r"\b(?:if|else|for|while|switch|case|catch|finally)\b")
+EXIT = re.compile(r"\b(?:return|throw|yield)\b")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the tokens ``text`` takes up in a prompt."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def source_digest(
+    source: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    max_tokens: int = DEFAULT_DIGEST_TOKENS
+) -> str:
+    """Return ``source`` if it fits ``max_tokens``, else a digest that does.
+
+    Args:
+        source: Cleaned source code
+        metadata: Ingested data; its "params" and "returns" go into the digest
+        max_tokens: Token budget for the returned text
+
+    Returns:
+        The source itself or its digest
+    """
+    if estimate_tokens(source) <= max_tokens:
+        return source
+    metadata = metadata or {}
+    return _digest(
+        source,
+        json.dumps(metadata.get("params") or [], sort_keys=True),
+        json.dumps(metadata.get("returns") or {}, sort_keys=True),
+        max_tokens
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _digest(source: str, params_json: str, returns_json: str, max_tokens: int) -> str:
+    params = json.loads(params_json)  # type: List[Dict[str, str]]
+    returns = json.loads(returns_json)  # type: Dict[str, str]
+    brace = source.find("{")
+    signature = " ".join((source[:brace] if brace > 0 else source.splitlines()[0]).split())
+
+    limit = max_tokens * CHARS_PER_TOKEN
+    header = _header(signature, params, returns, limit)
+    budget = limit - len("\n".join(header))
+
+    identifiers = _identifiers(source)
+    while identifiers and len("Identifiers: " + ", ".join(identifiers)) > budget // 4:
+        identifiers.pop()
+    if identifiers:
+        header.append("Identifiers: " + ", ".join(identifiers))
+        budget -= len(header[-1]) + 1
+
+    # The body starts after the line holding the signature's opening brace
+    lines = source.splitlines()
+    first = source[:brace].count("\n") + 1 if brace > 0 else 0
+    names = {p["name"] for p in params} | set(_signature_names(signature))
+    intro = "Most relevant lines (... marks omitted lines):"
+    budget -= len(intro) + 1
+    chosen = []  # type: List[int]
+    for score, i in sorted(_scored_lines(lines, first, names), key=lambda scored: (-scored[0], scored[1])):
+        cost = len(lines[i]) + len("\n...\n")
+        if cost <= budget:
+            chosen.append(i)
+            budget -= cost
+
+    body = []  # type: List[str]
+    previous = first - 1
+    for i in sorted(chosen):
+        if i > previous + 1:
+            body.append("...")
+        body.append(lines[i])
+        previous = i
+    if body and previous < len(lines) - 1:
+        body.append("...")
+    return "\n".join(header + ([intro] + body if body else []))
+
+
+def _header(signature: str, params: List[Dict[str, str]], returns: Dict[str, str], limit: int) -> List[str]:
+    """Signature, parameter and return lines, cut down to ``limit`` characters in all.
+
+    The signature and return value come first; parameters that do not fit
+    are summarized as "- ... (N more)".
+    """
+    ends = [f"Signature: {signature}"]
+    if returns:
+        ends.append(f"Returns: {returns.get('type', '')} – {returns.get('description', '')}")
+    ends = [_clip(line, (limit - len(ends) + 1) // len(ends)) for line in ends]
+    room = limit - len("\n".join(ends))
+
+    lines = [f"- {p['name']} ({p['type']}): {p['description']}" for p in params]
+    listed = []  # type: List[str]
+    used = len("\nParameters:")
+    for i, line in enumerate(lines):
+        rest = len(lines) - i - 1
+        marker = len(f"\n- ... ({rest} more)") if rest else 0
+        if used + len(line) + 1 + marker > room:
+            break
+        listed.append(line)
+        used += len(line) + 1
+    if len(listed) < len(lines):
+        marker = f"- ... ({len(lines) - len(listed)} more)"
+        if used + len(marker) + 1 <= room:
+            listed.append(marker)
+    return ends[:1] + (["Parameters:"] + listed if listed else []) + ends[1:]
+
+
+def _clip(line: str, limit: int) -> str:
+    """Shorten ``line`` to ``limit`` characters, marking the cut with "..."."""
+    return line if len(line) <= limit else line[:max(limit - 3, 0)] + "..."
+
+
+def _identifiers(source: str) -> List[str]:
+    """Non-keyword identifiers in order of first use, at most MAX_IDENTIFIERS."""
+    seen = {}  # type: Dict[str, None]
+    for name in IDENTIFIER.findall(source):
+        if name not in JS_KEYWORDS:
+            seen.setdefault(name, None)
+    return list(seen)[:MAX_IDENTIFIERS]
+
+
+def _signature_names(signature: str) -> List[str]:
+    """Parameter names declared in the signature's parentheses."""
+    match = re.search(r"\(([^)]*)\)", signature)
+    return [name for name in IDENTIFIER.findall(match.group(1)) if name not in JS_KEYWORDS] if match else []
+
+
+def _scored_lines(lines: List[str], first: int, names: Set[str]) -> List[Tuple[int, int]]:
+    """Score the body lines from ``first`` on by how much they tell about the function.
+
+    Returns:
+        (score, line index) pairs; lines with nothing but punctuation are left out
+    """
+    scored = []
+    for i in range(first, len(lines)):
+        line = lines[i]
+        if not line.strip().strip("{}();,"):
+            continue
+        score = 3 * bool(EXIT.search(line)) + 2 * len(names & set(IDENTIFIER.findall(line)))
+        score += bool(CALL.search(line)) + bool(CONTROL_FLOW.search(line))
+        scored.append((score, i))
+    return scored
@@ -1,32 +1,117 @@
 # src/agent/draft.py
 
-import os
-import time
-import openai
+import re
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
 import json
-from typing import Dict
-from httpx import HTTPError
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple, Union
 
-# Load environment variables from .env file
-load_dotenv()
+from doc_agent.llm import (
+    StreamAborted, complete, complete_async, complete_choices, complete_choices_async,
+    complete_streaming, get_async_client, get_client
+)
+from doc_agent.budget import request_timeout, time_left
+from doc_agent.digest import DEFAULT_DIGEST_TOKENS, source_digest
+from doc_agent.evaluators import FORBIDDEN_FILE
+from doc_agent.evaluators.heuristics import load_forbidden_words
+from doc_agent.edits import EditError, apply_edits, edit_prompt, parse_edits
+from doc_agent.linters import short_description
+from doc_agent.retry import DEFAULT_RETRY
+from doc_agent.routing import Route, current_run, get_router
+from doc_agent.section_cache import SectionCache, section_key
+from doc_agent.singleflight import flight
+from doc_agent.targeting import Window, fix_windows, splice, targeted_prompt
 
-# Fallback if openai.error.Timeout isn't available
-try:
-    from openai.error import Timeout as OpenAITimeout
-except ImportError:
-    OpenAITimeout = Exception
+# Provider request timeout, cut to the time left when a run has a deadline
+REQUEST_TIMEOUT_S = 15
 
-# Configure OpenAI API key and default timeout
-openai.api_key = os.getenv("OPENAI_API_KEY")
-openai.request_timeout = 15
+# Section drafts in flight at once, shared by every fill_sections call in the
+# process, so documents processed in parallel do not multiply the load
+MAX_SECTION_CONCURRENCY = 8
 
-def fill_sections(sections: Dict[str, str], source: str) -> Dict[str, str]:
+DRAFTED_SECTIONS = ("summary", "purpose", "returns", "examples")
+
+_section_slots = threading.BoundedSemaphore(MAX_SECTION_CONCURRENCY)
+
+# Field-level instructions for drafting every section in one request; each
+# carries the rules of that section's own prompt
+SECTION_FIELDS = {
+    "summary": "exactly one sentence (≤72 characters) in imperative mood summarizing what the function does",
+    "purpose": "a short paragraph explaining why a developer would use this function",
+    "returns": (
+        "only the return value type and what it represents, in the exact format `<type> – <description>`; "
+        "do not start with 'Returns' or form a full sentence, and never describe retail return policies"
+    ),
+    "examples": (
+        "up to two JavaScript code examples; for each, a very brief sentence (1–2 lines) explaining "
+        "what it shows, then the code block itself"
+    ),
+}
+
+# A streamed draft stopped by its guard this many times is left to run to completion
+MAX_STREAM_ABORTS = 2
+
+_RETURNS_FORMAT = re.compile(r"^\S.*?\s[–-]\s+\S")
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+_TRAILING_WORD = re.compile(r"\w+$")
+
+
+class SectionDraftError(RuntimeError):
+    """Raised by fill_sections when one or more sections could not be drafted.
+
+    Attributes:
+        failures: Section name to error message, for every failed section
+    """
+
+    def __init__(self, failures: Dict[str, str]):
+        self.failures = failures
+        super().__init__("Failed to draft " + "; ".join(
+            f"'{name}': {error}" for name, error in failures.items()
+        ))
+
+
+def fill_sections(
+    sections: Dict[str, str],
+    source: str,
+    single_request: bool = False,
+    stream: bool = False,
+    cache: Optional[SectionCache] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    digest_tokens: Optional[int] = DEFAULT_DIGEST_TOKENS,
+    forbidden_file: str = FORBIDDEN_FILE
+) -> Dict[str, str]:
     """
     Generate content for each documentation section.
 
     - Pass through 'title', 'usage', and 'arguments' unchanged.
-    - Draft 'summary', 'purpose', 'returns', and 'examples' with section-specific prompts.
+    - Draft 'summary', 'purpose', 'returns', and 'examples' with section-specific
+      prompts. The sections are drafted concurrently, within the process-wide
+      MAX_SECTION_CONCURRENCY limit.
+    - Keep any of those that already has content following its rule (see
+      section_violations), e.g. 'returns' built from a JSDoc @returns tag;
+      only missing or failing sections are drafted.
+    - With ``single_request``, ask for all of them in one call returning a
+      JSON object, so the source is sent once instead of once per section.
+      Sections missing from the response or breaking their rule (see
+      section_violations) are re-drafted individually.
+    - With ``stream``, section drafts are streamed and stopped as soon as
+      draft_guard finds a problem (a summary past 72 characters or onto a
+      second line, a word from ``forbidden_file``), then re-prompted with
+      the reason.
+    - A source over ``digest_tokens`` is replaced in every prompt by one
+      digest of it (see doc_agent.digest), which includes the JSDoc
+      ``metadata`` from ingestion. With None the source is always sent whole.
+    - With a ``cache``, sections already drafted for the same source (or
+      digest), prompt version and model are reused, and concurrent drafts of
+      the same section of identical sources are made once.
+
+    Raises:
+        SectionDraftError: If any section failed, naming each failed section;
+            no partially filled sections are returned
     """
     filled: Dict[str, str] = {}
 
@@ -35,73 +120,273 @@ def fill_sections(sections: Dict[str, str], source: str) -> Dict[str, str]:
         if key in sections:
             filled[key] = sections[key]
 
-    # 2) Draftable sections
-    for name in ("summary", "purpose", "returns", "examples"):
+    # 2) Draftable sections, all at once, from one digest of a large source
+    if digest_tokens is not None:
+        source = source_digest(source, metadata, digest_tokens)
+    names = []
+    for name in DRAFTED_SECTIONS:
         if name not in sections:
             continue
-
-        if name == "summary":
-            prompt = (
-                "You are a concise technical writer using Shopify Polaris style.\n"
-                "Write exactly one sentence (≤72 characters), in imperative mood,\n"
-                "summarizing what this function does. No markdown headings.\n\n"
-                f"{source}\n\n"
-                "Summary:"
+        existing = sections[name]
+        if existing.strip() and not section_violations(name, existing):
+            logging.debug(f"Keeping the existing '{name}' section")
+            filled[name] = existing
+        else:
+            names.append(name)
+    keys = {}  # type: Dict[str, str]
+    if cache is not None:
+        model = get_router().route("section").model
+        keys = {name: section_key(source, name, model) for name in names}
+        for name in names:
+            cached = cache.get(keys[name])
+            if cached is not None:
+                filled[name] = cached
+        names = [name for name in names if name not in filled]
+    if single_request and len(names) > 1:
+        together = _draft_sections_together(names, source)
+        for name, text in together.items():
+            filled[name] = text
+            if cache is not None:
+                cache.put(keys[name], text)
+        names = [name for name in names if name not in filled]
+    if not names:
+        return filled
+    failures: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="doc-agent-section") as pool:
+        futures = {
+            name: pool.submit(
+                contextvars.copy_context().run,
+                _draft_cached_section if cache is not None else _draft_section,
+                name, _section_prompt(name, source), draft_guard(name, forbidden_file) if stream else None,
+                *((cache, keys[name]) if cache is not None else ())
             )
+            for name in names
+        }
+        for name, future in futures.items():
+            try:
+                filled[name] = future.result()
+            except Exception as e:
+                logging.warning(f"Drafting section '{name}' failed: {e}")
+                failures[name] = str(e)
+    if failures:
+        raise SectionDraftError(failures)
+    return filled
 
-        elif name == "returns":
-            prompt = (
-                "You are a technical writer using Shopify Polaris style.\n"
-                "Generate *only* the return value type and what it represents,\n"
-                "in the exact format `<type> – <description>`.\n"
-                "Do NOT start with the word 'Returns' or form a full sentence.\n\n"
-                "(type and meaning). **Do not** write any retail return policies or shipping/returns instructions—just the function's return value."
-                f"{source}\n\n"
-                "Return value (type and description):"
-            )
+def _draft_cached_section(
+    name: str,
+    prompt: str,
+    guard: Optional[Callable[[str], Optional[str]]],
+    cache: SectionCache,
+    key: str
+) -> str:
+    """Draft one section into the cache; identical concurrent drafts share one call."""
+    def _draft() -> str:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        text = _draft_section(name, prompt, guard)
+        cache.put(key, text)
+        return text
+    return flight.do(f"section:{key}", _draft)
 
-        elif name == "purpose":
-            prompt = (
-                "You are a technical writer using Shopify Polaris style.\n"
-                "Write a short paragraph explaining why a developer would use this function.\n\n"
-                f"{source}\n\n"
-                "Purpose:"
-            )
-        else:  # examples
-            prompt = (
-                "You are a technical writer using Shopify Polaris style.\n"
-                "Provide up to two JavaScript code examples demonstrating how to use this function.\n"
-                "For each example, first write a very brief sentence (1–2 lines) explaining what it shows,\n"
-                "then include the code block itself.\n\n"
-                f"{source}\n\n"
-                "Examples:"
+def section_violations(name: str, text: str) -> List[str]:
+    """Return how a drafted section breaks its rule (empty if it follows it)."""
+    if not text.strip():
+        return ["empty"]
+    if name == "summary":
+        return short_description.check(text.strip())
+    if name == "returns":
+        if text.lstrip().lower().startswith("returns"):
+            return ["starts with 'Returns'"]
+        if not _RETURNS_FORMAT.match(text.strip()):
+            return ["not in the format `<type> – <description>`"]
+    if name == "examples" and "```" not in text:
+        return ["no code block"]
+    return []
+
+def _draft_sections_together(names: List[str], source: str) -> Dict[str, str]:
+    """Draft several sections with one JSON request, keeping only those that follow their rules."""
+    fields = "\n".join(f'- "{name}": {SECTION_FIELDS[name]}' for name in names)
+    prompt = (
+        "You are a technical writer using Shopify Polaris style.\n"
+        "Document the function below. Respond with a JSON object only, with these string fields:\n"
+        f"{fields}\n"
+        "No markdown headings in any field.\n\n"
+        f"{source}"
+    )
+    try:
+        raw = _draft_section("sections", prompt, response_format={"type": "json_object"})
+        data = json.loads(_JSON_FENCE.sub("", raw))
+    except Exception as e:
+        logging.warning(f"Single-request section draft failed, drafting sections individually: {e}")
+        return {}
+    drafted = {}
+    for name in names:
+        value = data.get(name) if isinstance(data, dict) else None
+        problems = section_violations(name, value) if isinstance(value, str) else ["missing"]
+        if problems:
+            logging.info(f"Section '{name}' from the single request breaks its rule ({'; '.join(problems)}), re-drafting it")
+            continue
+        drafted[name] = _strip_headings(value)
+    return drafted
+
+def _strip_headings(raw: str) -> str:
+    """Strip any accidental markdown headings."""
+    lines = [line for line in raw.splitlines() if not line.lstrip().startswith("#")]
+    return "\n".join(lines).strip()
+
+def _section_prompt(name: str, source: str) -> str:
+    """Build the drafting prompt for one section."""
+    if name == "summary":
+        return (
+            "You are a concise technical writer using Shopify Polaris style.\n"
+            "Write exactly one sentence (≤72 characters), in imperative mood,\n"
+            "summarizing what this function does. No markdown headings.\n\n"
+            f"{source}\n\n"
+            "Summary:"
+        )
+
+    elif name == "returns":
+        return (
+            "You are a technical writer using Shopify Polaris style.\n"
+            "Generate *only* the return value type and what it represents,\n"
+            "in the exact format `<type> – <description>`.\n"
+            "Do NOT start with the word 'Returns' or form a full sentence.\n\n"
+            "(type and meaning). **Do not** write any retail return policies or shipping/returns instructions—just the function's return value."
+            f"{source}\n\n"
+            "Return value (type and description):"
+        )
+
+    elif name == "purpose":
+        return (
+            "You are a technical writer using Shopify Polaris style.\n"
+            "Write a short paragraph explaining why a developer would use this function.\n\n"
+            f"{source}\n\n"
+            "Purpose:"
+        )
+    else:  # examples
+        return (
+            "You are a technical writer using Shopify Polaris style.\n"
+            "Provide up to two JavaScript code examples demonstrating how to use this function.\n"
+            "For each example, first write a very brief sentence (1–2 lines) explaining what it shows,\n"
+            "then include the code block itself.\n\n"
+            f"{source}\n\n"
+            "Examples:"
+        )
+
+def _draft_section(
+    name: str,
+    prompt: str,
+    guard: Optional[Callable[[str], Optional[str]]] = None,
+    **options: Any
+) -> str:
+    """Draft one section, retrying transient errors (see doc_agent.retry).
+
+    A concurrency slot is held only while a request is in flight, not while
+    waiting to retry. With a guard the draft is streamed (see _complete_guarded);
+    otherwise ``options`` are passed to the provider, e.g. a response_format.
+    """
+    def _attempt() -> str:
+        with _section_slots, get_router().call("section") as route:
+            if guard is not None:
+                return _complete_guarded(prompt, route.model, 0, guard)
+            return complete(
+                get_client(),
+                messages=[{"role": "system", "content": prompt}],
+                model=route.model,
+                temperature=0,
+                timeout=request_timeout(REQUEST_TIMEOUT_S),
+                **options
             )
 
-        # 3) Retry logic for API calls
-        attempts = 0
-        while True:
-            try:
-                resp = openai.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[{"role": "system", "content": prompt}],
-                    temperature=0,
-                    timeout=15
-                )
-                raw = resp.choices[0].message.content.strip()
-                # Strip any accidental markdown headings
-                lines = [line for line in raw.splitlines() if not line.lstrip().startswith("#")]
-                filled[name] = "\n".join(lines).strip()
-                break
-
-            except (HTTPError, OpenAITimeout) as e:
-                attempts += 1
-                if attempts >= 3:
-                    raise RuntimeError(f"Failed to draft '{name}' after {attempts} attempts: {e}")
-                time.sleep(2 ** attempts)
+    return _strip_headings(DEFAULT_RETRY.call(_attempt, "section", deadline=time_left(), section=name))
 
-    return filled
+def draft_guard(section: Optional[str] = None, forbidden_file: str = FORBIDDEN_FILE) -> Callable[[str], Optional[str]]:
+    """Build the check run on a streamed draft as it arrives.
+
+    Args:
+        section: "summary" also limits the text to one line of
+            short_description.MAX_CHARS characters
+        forbidden_file: Forbidden words that stop any draft
 
-def draft_copy_tool(scenario: str, style: str, previous: str = None, fix: str = None) -> str:
+    Returns:
+        A function from the text so far to the reason to stop, or None
+    """
+    words = _forbidden_words(forbidden_file)
+    forbidden = re.compile(
+        rf"\b({'|'.join(re.escape(w) for w in words)})(?:ly|ing|ed|s|es)?\b", re.IGNORECASE
+    ) if words else None
+
+    def _guard(text: str) -> Optional[str]:
+        if section == "summary":
+            stripped = text.strip()
+            if "\n" in stripped:
+                return "the summary must be one line"
+            if len(stripped) > short_description.MAX_CHARS:
+                return f"the summary exceeds {short_description.MAX_CHARS} characters"
+        if forbidden is not None:
+            # Skip a word still being streamed: "stream" may become "streamline"
+            match = forbidden.search(_TRAILING_WORD.sub("", text))
+            if match:
+                return f"forbidden word: {match.group(1).lower()}"
+        return None
+
+    return _guard
+
+@functools.lru_cache(maxsize=None)
+def _forbidden_words(forbidden_file: str) -> Tuple[str, ...]:
+    try:
+        return tuple(load_forbidden_words(forbidden_file))
+    except OSError:
+        return ()
+
+def _complete_guarded(prompt: str, model: str, temperature: float, guard: Callable[[str], Optional[str]]) -> str:
+    """Stream a completion, re-prompting with the reason whenever guard stops it.
+
+    After MAX_STREAM_ABORTS stops the last attempt runs unguarded, leaving
+    whatever is wrong with it to the linters and evaluators.
+    """
+    for attempt in range(MAX_STREAM_ABORTS + 1):
+        try:
+            return complete_streaming(
+                get_client(),
+                messages=[{"role": "system", "content": prompt}],
+                model=model,
+                temperature=temperature,
+                should_abort=guard if attempt < MAX_STREAM_ABORTS else None,
+                timeout=request_timeout(REQUEST_TIMEOUT_S)
+            )
+        except StreamAborted as e:
+            logging.info(f"Stopped a streamed draft early ({e.reason}), re-prompting")
+            prompt = f"An earlier answer was stopped for this problem, avoid it: {e.reason}\n" + prompt
+
+def _copy_prompt(scenario: str, style: str, previous: str = None, fix: str = None) -> str:
+    """Build the draft or fix prompt used by draft_copy_tool and draft_copy_tool_async."""
+    if previous and fix:
+        return (
+            f"You are a technical writer using {style} style.\n"
+            f"Improve the following text by applying these fixes: {fix}\n\n"
+            f"Previous text:\n{previous}\n\n"
+            "Improved text:"
+        )
+    return (
+        f"You are a technical writer using {style} style.\n"
+        f"Write text for this scenario: {scenario}\n\n"
+        "Text:"
+    )
+
+def draft_copy_tool(
+    scenario: str,
+    style: str,
+    previous: str = None,
+    fix: str = None,
+    n: int = 1,
+    edits: bool = False,
+    spans: Optional[List[Tuple[int, int]]] = None,
+    stream: bool = False,
+    adapt: bool = False,
+    forbidden_file: str = FORBIDDEN_FILE
+) -> Union[str, List[str]]:
     """
     Generate or improve text based on a scenario and style.
     
@@ -110,38 +395,143 @@ def draft_copy_tool(scenario: str, style: str, previous: str = None, fix: str =
         style: Writing style to use (e.g., "Shopify inline error")
         previous: Optional previous version of the text to improve
         fix: Optional fix instructions to apply
+        n: Number of candidates to request in a single call
+        edits: For fixes, ask for edit operations (see doc_agent.edits) that
+            are applied locally instead of the full text. Falls back to a full
+            rewrite if no response applies cleanly.
+        spans: For fixes, (start, end) offsets of the failing text in previous.
+            Only the failing sentences and some context are sent, and the
+            rewrites are spliced back (see doc_agent.targeting). Takes
+            precedence over edits.
+        stream: Stream single-candidate drafts and stop one as soon as a
+            forbidden word appears, re-prompting with the reason (see draft_guard)
+        adapt: previous is a draft in another style and fix asks to adapt it.
+            This first draft of the run is routed as "adapt" and kept out of
+            the run's escalation.
+        forbidden_file: Forbidden words that stop a streamed draft
         
     Returns:
-        Generated or improved text
+        Generated or improved text, or a list of n candidates when n > 1
+
+    The model comes from the routing policy (see doc_agent.routing): first
+    drafts and fixes are routed separately, fixes by failure class.
     """
+    guard = draft_guard(forbidden_file=forbidden_file) if stream else None
+    with _route(previous, fix, adapt) as route:
+        windows = fix_windows(previous, spans) if previous and fix and spans else None
+        if windows:
+            rewrites = [
+                _as_list(_request_copy(targeted_prompt(style, fix, previous, w), n, route.model, guard))
+                for w in windows
+            ]
+            return _spliced(previous, windows, rewrites, n)
+        if edits and previous and fix:
+            responses = _request_copy(edit_prompt(style, previous, fix), n, route.model)
+            applied = _apply_edit_responses(responses, previous)
+            if applied:
+                return applied if n > 1 else applied[0]
+            logging.info("Edit response did not apply cleanly, falling back to a full rewrite")
+        return _request_copy(_copy_prompt(scenario, style, previous, fix), n, route.model, guard)
+
+def _route(previous: Optional[str], fix: Optional[str], adapt: bool = False) -> ContextManager[Route]:
+    """Route a draft_copy_tool call; the current run (see routing.run_scope) is the escalation key."""
+    if adapt:
+        # Without a key, the run's first real fix neither blames nor escalates past it
+        return get_router().call("adapt")
     if previous and fix:
-        prompt = (
-            f"You are a technical writer using {style} style.\n"
-            f"Improve the following text by applying these fixes: {fix}\n\n"
-            f"Previous text:\n{previous}\n\n"
-            "Improved text:"
-        )
-    else:
-        prompt = (
-            f"You are a technical writer using {style} style.\n"
-            f"Write text for this scenario: {scenario}\n\n"
-            "Text:"
+        return get_router().call("fix", key=current_run(), fix=fix)
+    return get_router().call("draft", key=current_run())
+
+def _as_list(responses: Union[str, List[str]]) -> List[str]:
+    return [responses] if isinstance(responses, str) else responses
+
+def _spliced(previous: str, windows: List[Window], rewrites: List[List[str]], n: int) -> Union[str, List[str]]:
+    """Splice the i-th rewrite of every window into previous to build candidate i."""
+    candidates = [splice(previous, windows, choice) for choice in zip(*rewrites)]
+    return candidates if n > 1 else candidates[0]
+
+def _apply_edit_responses(responses: Union[str, List[str]], previous: str) -> List[str]:
+    """Apply each edit response to previous, dropping those that do not apply cleanly."""
+    applied = []
+    for raw in _as_list(responses):
+        try:
+            applied.append(apply_edits(previous, parse_edits(raw)))
+        except EditError as e:
+            logging.debug(f"Discarding edit response: {e}")
+    return applied
+
+def _request_copy(
+    prompt: str,
+    n: int,
+    model: str,
+    guard: Optional[Callable[[str], Optional[str]]] = None
+) -> Union[str, List[str]]:
+    """Send a drafting prompt, retrying transient errors; streamed with a guard when n is 1."""
+    messages = [{"role": "system", "content": prompt}]
+
+    def _attempt() -> Union[str, List[str]]:
+        if guard is not None and n == 1:
+            return _complete_guarded(prompt, model, 0.7, guard)
+        if n > 1:
+            return complete_choices(
+                get_client(), messages=messages, model=model, temperature=0.7, n=n, timeout=request_timeout(REQUEST_TIMEOUT_S)
+            )
+        return complete(
+            get_client(),
+            messages=messages,
+            model=model,
+            temperature=0.7,
+            timeout=request_timeout(REQUEST_TIMEOUT_S)
         )
+
+    return DEFAULT_RETRY.call(_attempt, "draft", deadline=time_left())
+
+async def draft_copy_tool_async(
+    scenario: str,
+    style: str,
+    previous: str = None,
+    fix: str = None,
+    n: int = 1,
+    edits: bool = False,
+    spans: Optional[List[Tuple[int, int]]] = None,
+    adapt: bool = False
+) -> Union[str, List[str]]:
+    """
+    Asyncio version of draft_copy_tool, using the shared async OpenAI client.
     
-    # Retry logic for API calls
-    attempts = 0
-    while True:
-        try:
-            resp = openai.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "system", "content": prompt}],
-                temperature=0.7,
-                timeout=15
+    Cancelling the awaiting task cancels the in-flight request. Targeted
+    windows are rewritten concurrently.
+    """
+    with _route(previous, fix, adapt) as route:
+        windows = fix_windows(previous, spans) if previous and fix and spans else None
+        if windows:
+            rewrites = await asyncio.gather(*(
+                _request_copy_async(targeted_prompt(style, fix, previous, w), n, route.model) for w in windows
+            ))
+            return _spliced(previous, windows, [_as_list(r) for r in rewrites], n)
+        if edits and previous and fix:
+            responses = await _request_copy_async(edit_prompt(style, previous, fix), n, route.model)
+            applied = _apply_edit_responses(responses, previous)
+            if applied:
+                return applied if n > 1 else applied[0]
+            logging.info("Edit response did not apply cleanly, falling back to a full rewrite")
+        return await _request_copy_async(_copy_prompt(scenario, style, previous, fix), n, route.model)
+
+async def _request_copy_async(prompt: str, n: int, model: str) -> Union[str, List[str]]:
+    """Asyncio version of _request_copy."""
+    messages = [{"role": "system", "content": prompt}]
+
+    async def _attempt() -> Union[str, List[str]]:
+        if n > 1:
+            return await complete_choices_async(
+                get_async_client(), messages=messages, model=model, temperature=0.7, n=n, timeout=request_timeout(REQUEST_TIMEOUT_S)
             )
-            return resp.choices[0].message.content.strip()
-            
-        except (HTTPError, OpenAITimeout) as e:
-            attempts += 1
-            if attempts >= 3:
-                raise RuntimeError(f"Failed to generate text after {attempts} attempts: {e}")
-            time.sleep(2 ** attempts)
+        return await complete_async(
+            get_async_client(),
+            messages=messages,
+            model=model,
+            temperature=0.7,
+            timeout=request_timeout(REQUEST_TIMEOUT_S)
+        )
+
+    return await DEFAULT_RETRY.call_async(_attempt, "draft", deadline=time_left())
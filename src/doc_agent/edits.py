@@ -0,0 +1,82 @@
+"""
+Edit-operation fix responses.
+
+Instead of repeating the whole improved text, the model can answer a fix
+request with a list of edits that are validated and applied locally::
+
+    {"edits": [
+        {"op": "replace", "target": "<exact text to change>", "text": "<new text>"},
+        {"op": "insert_after", "target": "<exact anchor text>", "text": "<text to insert>"}
+    ]}
+
+Every target must occur exactly once in the text at the time its edit is
+applied. Anything malformed or ambiguous raises ``EditError`` and the
+caller falls back to a full rewrite.
+"""
+
+import json
+from typing import Any, Dict, List
+
+EDIT_OPS = ("replace", "insert_after")
+
+
+class EditError(ValueError):
+    """Raised when an edit response cannot be parsed or applied cleanly."""
+
+
+def edit_prompt(style: str, previous: str, fix: str) -> str:
+    """Build the prompt asking for edit operations instead of a rewrite."""
+    return (
+        f"You are a technical writer using {style} style.\n"
+        f"Fix the following text by applying these fixes: {fix}\n\n"
+        "Do not repeat the whole text. Respond with JSON only, in this form:\n"
+        '{"edits": [{"op": "replace", "target": "<exact text to change>", "text": "<new text>"}, '
+        '{"op": "insert_after", "target": "<exact text>", "text": "<text to insert>"}]}\n'
+        "Copy every target exactly from the text; it must appear there only once.\n\n"
+        f"Text:\n{previous}"
+    )
+
+
+def parse_edits(raw: str) -> List[Dict[str, Any]]:
+    """Parse and validate an edit response.
+
+    Raises:
+        EditError: If the response is not valid JSON or an edit is malformed
+    """
+    try:
+        data = json.loads(raw)
+    except ValueError as e:
+        raise EditError(f"edit response is not JSON: {e}")
+    edits = data.get("edits") if isinstance(data, dict) else None
+    if not isinstance(edits, list) or not edits:
+        raise EditError("edit response has no edits")
+    for edit in edits:
+        if not isinstance(edit, dict) or edit.get("op") not in EDIT_OPS:
+            raise EditError(f"unknown edit: {edit!r}")
+        if not isinstance(edit.get("target"), str) or not edit["target"]:
+            raise EditError(f"edit has no target: {edit!r}")
+        if not isinstance(edit.get("text"), str):
+            raise EditError(f"edit has no text: {edit!r}")
+    return edits
+
+
+def apply_edits(text: str, edits: List[Dict[str, Any]]) -> str:
+    """Apply validated edits in order.
+
+    Raises:
+        EditError: If a target is missing or ambiguous, or the result is empty
+            or unchanged
+    """
+    result = text
+    for edit in edits:
+        target = edit["target"]
+        count = result.count(target)
+        if count != 1:
+            raise EditError(f"target {'not found' if count == 0 else 'is ambiguous'}: {target!r}")
+        if edit["op"] == "replace":
+            result = result.replace(target, edit["text"], 1)
+        else:
+            result = result.replace(target, target + edit["text"], 1)
+    if not result.strip() or result == text:
+        raise EditError("edits left the text empty or unchanged")
+    return result
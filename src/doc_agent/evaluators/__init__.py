@@ -1,7 +1,8 @@
 import os
+import hashlib
 import logging
 from functools import partial
-from typing import Dict, Any, List, Callable, Optional
+from typing import Dict, Any, Awaitable, List, Callable, Optional
 
 from .heuristics import run_heuristics
 from .rubric import run_rubric
@@ -15,6 +16,38 @@ from .ai_eval import (
 # Get the default path to the forbidden words file
 FORBIDDEN_FILE = os.path.join(os.path.dirname(__file__), "forbidden_words.txt")
 
+def forbidden_list_version(forbidden_file: str) -> str:
+    """Return a short content hash of a forbidden words file ("missing" if unreadable)."""
+    try:
+        with open(forbidden_file, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except (OSError, TypeError):
+        return "missing"
+
+def _declare(
+    evaluator: Callable[[str], EvalResult],
+    name: str,
+    evaluator_id: str,
+    deterministic: bool,
+    run_async: Optional[Callable[[str], Awaitable[EvalResult]]] = None
+) -> Callable[[str], EvalResult]:
+    """Attach the stable identity the runner uses to memoize results.
+
+    Args:
+        evaluator: The evaluator closure
+        name: Display name (replaces the closure's generic ``_run``)
+        evaluator_id: Identity that changes whenever the evaluator's configuration does
+        deterministic: Whether equal text always gives an equal result, which
+            lets results be reused across runs
+        run_async: Optional coroutine version used by the async agent loop
+    """
+    evaluator.__name__ = name
+    evaluator.evaluator_id = evaluator_id
+    evaluator.deterministic = deterministic
+    if run_async is not None:
+        evaluator.run_async = run_async
+    return evaluator
+
 def make_heuristics_evaluator(forbidden_file: str = FORBIDDEN_FILE) -> Callable[[str], EvalResult]:
     """Create a heuristics evaluator with the given forbidden words file."""
     def _run(text: str) -> EvalResult:
@@ -24,15 +57,22 @@ def make_heuristics_evaluator(forbidden_file: str = FORBIDDEN_FILE) -> Callable[
             logging.debug(f"Heuristics found {len(result['errors'])} issues")
             for error in result["errors"]:
                 logging.debug(f"  - {error['msg']}")
+            located = all(error.get("spans") for error in result["errors"])
             return EvalResult(
                 name="heuristics",
                 status="FAIL",
-                error="\n".join(error["msg"] for error in result["errors"])
+                error="\n".join(error["msg"] for error in result["errors"]),
+                spans=[span for error in result["errors"] for span in error["spans"]] if located else None,
+                line_spans=[list(error["spans"]) for error in result["errors"]] if located else None
             )
         logging.debug("Heuristics passed")
         return EvalResult(name="heuristics", status="PASS")
     
-    return _run
+    return _declare(
+        _run, "heuristics",
+        evaluator_id=f"heuristics:{forbidden_list_version(forbidden_file)}",
+        deterministic=True
+    )
 
 def make_rubric_evaluator() -> Callable[[str], EvalResult]:
     """Create a rubric evaluator."""
@@ -45,12 +85,11 @@ def make_rubric_evaluator() -> Callable[[str], EvalResult]:
             error=result.get("error", "")
         )
     
-    return _run
+    return _declare(_run, "rubric", evaluator_id="rubric", deterministic=True)
 
 def make_ai_clarity_evaluator() -> Callable[[str], EvalResult]:
     """Create an AI clarity evaluator."""
-    def _run(text: str) -> EvalResult:
-        result = evaluate_clarity_and_actionability(text)
+    def _check(result: Dict[str, Any]) -> EvalResult:
         if result["clarity_score"] < 3 or not result["actionable"]:
             return EvalResult(
                 name="clarity",
@@ -59,12 +98,19 @@ def make_ai_clarity_evaluator() -> Callable[[str], EvalResult]:
             )
         return EvalResult(name="clarity", status="PASS")
     
-    return _run
+    def _run(text: str) -> EvalResult:
+        return _check(evaluate_clarity_and_actionability(text))
+    
+    async def _run_async(text: str) -> EvalResult:
+        return _check(await evaluate_clarity_and_actionability.aio(text))
+    
+    return _declare(
+        _run, "clarity", evaluator_id="clarity", deterministic=False, run_async=_run_async
+    )
 
 def make_ai_empathy_evaluator() -> Callable[[str], EvalResult]:
     """Create an AI empathy evaluator."""
-    def _run(text: str) -> EvalResult:
-        result = evaluate_empathy(text)
+    def _check(result: Dict[str, Any]) -> EvalResult:
         if not result["empathetic"]:
             return EvalResult(
                 name="empathy",
@@ -73,12 +119,19 @@ def make_ai_empathy_evaluator() -> Callable[[str], EvalResult]:
             )
         return EvalResult(name="empathy", status="PASS")
     
-    return _run
+    def _run(text: str) -> EvalResult:
+        return _check(evaluate_empathy(text))
+    
+    async def _run_async(text: str) -> EvalResult:
+        return _check(await evaluate_empathy.aio(text))
+    
+    return _declare(
+        _run, "empathy", evaluator_id="empathy", deterministic=False, run_async=_run_async
+    )
 
 def make_ai_tone_evaluator() -> Callable[[str], EvalResult]:
     """Create an AI tone evaluator."""
-    def _run(text: str) -> EvalResult:
-        result = evaluate_tone(text, brand_voice="clear and professional")
+    def _check(result: Dict[str, Any]) -> EvalResult:
         if result["tone_score"] < 3 or not result["tone_alignment"]:
             return EvalResult(
                 name="tone",
@@ -87,7 +140,15 @@ def make_ai_tone_evaluator() -> Callable[[str], EvalResult]:
             )
         return EvalResult(name="tone", status="PASS")
     
-    return _run
+    def _run(text: str) -> EvalResult:
+        return _check(evaluate_tone(text, brand_voice="clear and professional"))
+    
+    async def _run_async(text: str) -> EvalResult:
+        return _check(await evaluate_tone.aio(text, brand_voice="clear and professional"))
+    
+    return _declare(
+        _run, "tone", evaluator_id="tone", deterministic=False, run_async=_run_async
+    )
 
 # Registry of available evaluator factories
 FAST_EVALUATORS = {
@@ -149,5 +210,13 @@ def get_evaluators(
     
     return evaluators
 
-# Default list of all evaluators with default settings
-all_evaluators = get_evaluators()
+def __getattr__(name: str) -> Any:
+    """Build ``all_evaluators``, the default evaluators, on first access.
+
+    Creating evaluators reads the forbidden words file, so it is left until
+    something uses them rather than done on import.
+    """
+    if name == "all_evaluators":
+        globals()["all_evaluators"] = get_evaluators()
+        return globals()["all_evaluators"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,47 +1,79 @@
-import openai
 import json
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 from functools import wraps
 
-# ─── CLARITY & ACTIONABILITY ───────────────────────────────
+from doc_agent.budget import request_timeout, time_left
+from doc_agent.llm import complete, complete_async, get_async_client, get_client
+from doc_agent.retry import DEFAULT_RETRY
+
+if TYPE_CHECKING:
+    import openai
 
-def get_openai_client() -> openai.OpenAI:
-    """Get or create an OpenAI client instance."""
-    return openai.OpenAI()
+# ─── CLARITY & ACTIONABILITY ───────────────────────────────
 
-def handle_openai_call(func):
-    """Decorator to handle OpenAI API calls and error handling."""
+def get_openai_client() -> "openai.OpenAI":
+    """Get the shared OpenAI client instance (see doc_agent.llm.get_client)."""
+    return get_client()
+
+# Returned when an evaluation call or its JSON parsing fails
+ERROR_RESULT = {
+    # Clarity fields
+    "clarity_score": 0,
+    "clarity_explanation": "Error during evaluation",
+    "actionable": False,
+    "actionability_comment": "Error during evaluation",
+    # Tone fields
+    "tone_score": 0,
+    "tone_alignment": False,
+    "tone_explanation": "Error during evaluation",
+    # Empathy fields
+    "empathetic": False,
+    "suggestion": "Error during evaluation",
+    "empathy_score": 0,
+    "empathy_explanation": "Error during evaluation",
+    "empathy_suggestions": "Error during evaluation"
+}
+
+def handle_openai_call(func: Callable[..., str]) -> Callable[..., Dict[str, Any]]:
+    """Decorator to handle OpenAI API calls and error handling.
+
+    The decorated function also gets an ``aio`` coroutine function that makes
+    the same call with the shared async client.
+    """
     @wraps(func)
-    def wrapper(*args, **kwargs):
+    def wrapper(*args: Any, **kwargs: Any) -> Dict[str, Any]:
         try:
             client = kwargs.pop('client', None) or get_openai_client()
             prompt = func(*args, **kwargs)
-            resp = client.chat.completions.create(
+            raw = DEFAULT_RETRY.call(lambda: complete(
+                client,
+                messages=[{"role": "user", "content": prompt}],
                 model=kwargs.get('model', "gpt-4o-mini"),
+                temperature=kwargs.get('temperature', 0.0),
+                timeout=request_timeout(None),
+            ), "evaluate", deadline=time_left(), evaluator=func.__name__)
+            return json.loads(raw)
+        except Exception as e:
+            print(f"Error evaluating text: {str(e)}")
+            return dict(ERROR_RESULT)
+
+    async def aio(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        try:
+            client = kwargs.pop('client', None) or get_async_client()
+            prompt = func(*args, **kwargs)
+            raw = await DEFAULT_RETRY.call_async(lambda: complete_async(
+                client,
                 messages=[{"role": "user", "content": prompt}],
+                model=kwargs.get('model', "gpt-4o-mini"),
                 temperature=kwargs.get('temperature', 0.0),
-            )
-            raw = resp.choices[0].message.content.strip()
+                timeout=request_timeout(None),
+            ), "evaluate", deadline=time_left(), evaluator=func.__name__)
             return json.loads(raw)
         except Exception as e:
             print(f"Error evaluating text: {str(e)}")
-            return {
-                # Clarity fields
-                "clarity_score": 0,
-                "clarity_explanation": "Error during evaluation",
-                "actionable": False,
-                "actionability_comment": "Error during evaluation",
-                # Tone fields
-                "tone_score": 0,
-                "tone_alignment": False,
-                "tone_explanation": "Error during evaluation",
-                # Empathy fields
-                "empathetic": False,
-                "suggestion": "Error during evaluation",
-                "empathy_score": 0,
-                "empathy_explanation": "Error during evaluation",
-                "empathy_suggestions": "Error during evaluation"
-            }
+            return dict(ERROR_RESULT)
+
+    wrapper.aio = aio  # type: ignore[attr-defined]
     return wrapper
 
 @handle_openai_call
@@ -49,7 +81,7 @@ def evaluate_clarity_and_actionability(
     text: str,
     model: str = "gpt-4o-mini",
     temperature: float = 0.0,
-    client: Optional[openai.OpenAI] = None
+    client: Optional["openai.OpenAI"] = None
 ) -> Dict[str, Any]:
     """
     1) Rates clarity on a scale 1–5
@@ -89,7 +121,7 @@ def evaluate_tone(
     brand_voice: str,
     model: str = "gpt-4o-mini",
     temperature: float = 0.0,
-    client: Optional[openai.OpenAI] = None
+    client: Optional["openai.OpenAI"] = None
 ) -> Dict[str, Any]:
     """
     Checks how well `text` matches the specified `brand_voice` (e.g. "friendly and empathetic").
@@ -127,7 +159,7 @@ def evaluate_empathy(
     text: str,
     model: str = "gpt-4o-mini",
     temperature: float = 0.0,
-    client: Optional[openai.OpenAI] = None
+    client: Optional["openai.OpenAI"] = None
 ) -> Dict[str, Any]:
     """
     Checks whether the message expresses empathy and avoids blaming language.
@@ -161,7 +193,7 @@ def evaluate_inclusivity(
     text: str,
     model: str = "gpt-4o-mini",
     temperature: float = 0.0,
-    client: Optional[openai.OpenAI] = None
+    client: Optional["openai.OpenAI"] = None
 ) -> Dict[str, Any]:
     """
     Flags any potentially biased or exclusionary language.
@@ -196,7 +228,7 @@ def evaluate_readability_for_non_native(
     text: str,
     model: str = "gpt-4o-mini",
     temperature: float = 0.0,
-    client: Optional[openai.OpenAI] = None
+    client: Optional["openai.OpenAI"] = None
 ) -> Dict[str, Any]:
     """
     Rates how easy the text is for non-native English speakers.
@@ -231,7 +263,7 @@ def evaluate_conciseness(
     text: str,
     model: str = "gpt-4o-mini",
     temperature: float = 0.0,
-    client: Optional[openai.OpenAI] = None
+    client: Optional["openai.OpenAI"] = None
 ) -> Dict[str, Any]:
     """
     Identifies phrases that can be shortened without losing meaning.
@@ -266,7 +298,7 @@ def evaluate_accessibility(
     text: str,
     model: str = "gpt-4o-mini",
     temperature: float = 0.0,
-    client: Optional[openai.OpenAI] = None
+    client: Optional["openai.OpenAI"] = None
 ) -> Dict[str, Any]:
     """
     Flags screen-reader pitfalls (ambiguous pronouns, all-caps acronyms, etc.).
@@ -301,7 +333,7 @@ def evaluate_consistency(
     others: List[str],
     model: str = "gpt-4o-mini",
     temperature: float = 0.0,
-    client: Optional[openai.OpenAI] = None
+    client: Optional["openai.OpenAI"] = None
 ) -> Dict[str, Any]:
     """
     Compares `text` against a list of other messages for style/term consistency.
@@ -339,7 +371,7 @@ def evaluate_trust(
     text: str,
     model: str = "gpt-4o-mini",
     temperature: float = 0.0,
-    client: Optional[openai.OpenAI] = None
+    client: Optional["openai.OpenAI"] = None
 ) -> Dict[str, Any]:
     """
     Rates how likely this message is to maintain user trust (1–5)
@@ -372,7 +404,7 @@ def evaluate_i18n(
     text: str,
     model: str = "gpt-4o-mini",
     temperature: float = 0.0,
-    client: Optional[openai.OpenAI] = None
+    client: Optional["openai.OpenAI"] = None
 ) -> Dict[str, Any]:
     """
     Flags locale-specific formatting or idioms that could break in translation.
@@ -9,12 +9,15 @@ Simple static heuristics for doc-agent:
 - weasel_word_issues: catches words like "very", "just"
 - acronym_issues: detects all-caps tokens (ACRONYMS)
 - run_heuristics: aggregates all of the above into a single report
+
+Every issue that points at specific text carries "spans", a list of
+(start, end) character offsets into the checked text, so fixes can be
+targeted at the failing sentences.
 """
 
 import os
 import re
-from typing import List, Dict
-from textstat import flesch_reading_ease
+from typing import Dict, Iterator, List, Tuple
 
 # --- CONFIGURATION ---
 MAX_WORDS_PER_SENTENCE = 20
@@ -23,6 +26,7 @@ WEASEL_WORDS = {
     "very", "just", "basically", "in order to", "actually", "really", "fairly", "quite"
 }
 ACRONYM_PATTERN = re.compile(r'\b([A-Z]{2,})s?\b')
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
 
 
 # --- HELPERS ---
@@ -37,51 +41,71 @@ def load_forbidden_words(file_path: str) -> List[str]:
     return words
 
 
+def _match_spans(pattern: str, text: str) -> List[Tuple[int, int]]:
+    return [m.span() for m in re.finditer(pattern, text, re.IGNORECASE)]
+
+
+def _sentences(text: str) -> Iterator[Tuple[int, int, str]]:
+    """Yield (start, end, sentence) for each sentence, split as the checks below split them."""
+    stripped = text.strip()
+    offset = len(text) - len(text.lstrip())
+    start = 0
+    for m in SENTENCE_SPLIT.finditer(stripped):
+        yield offset + start, offset + m.start(), stripped[start:m.start()]
+        start = m.end()
+    yield offset + start, offset + len(stripped), stripped[start:]
+
+
 def forbidden_word_checks(text: str, forbidden_list: List[str]) -> List[Dict]:
     found = []
-    lowered_text = text.lower()
     for w in forbidden_list:
         # Use regex to find word boundaries and handle variations
-        pattern = rf'\b{re.escape(w)}(?:ly|ing|ed|s|es)?\b'
-        if re.search(pattern, lowered_text, re.IGNORECASE):
-            found.append({"msg": f"forbidden word: {w}", "word": w})
+        spans = _match_spans(rf'\b{re.escape(w)}(?:ly|ing|ed|s|es)?\b', text)
+        if spans:
+            found.append({"msg": f"forbidden word: {w}", "word": w, "spans": spans})
     return found
 
 
 def readability_grade(text: str) -> float:
+    # textstat pulls in nltk, which is slow to import; only load it when needed
+    from textstat import flesch_reading_ease
+
     return flesch_reading_ease(text)
 
 
 def sentence_length_issues(text: str, max_words: int = MAX_WORDS_PER_SENTENCE) -> List[Dict]:
     issues = []
-    for sent in re.split(r'(?<=[.!?])\s+', text.strip()):
+    for start, end, sent in _sentences(text):
         if len(sent.split()) > max_words:
             issues.append({
                 "msg": f"sentence exceeds {max_words} words",
-                "sentence": sent
+                "sentence": sent,
+                "spans": [(start, end)]
             })
     return issues
 
 
 def passive_voice_issues(text: str, threshold: float = 0.1) -> List[Dict]:
-    sentences = [s for s in re.split(r'(?<=[.!?])\s+', text.strip()) if s]  # Filter out empty strings
+    sentences = [(start, end, s) for start, end, s in _sentences(text) if s]  # Filter out empty strings
     if not sentences:
         return []
-    passive_count = sum(1 for s in sentences if PASSIVE_REGEX.search(s))
-    ratio = passive_count / len(sentences)
+    passive = [(start, end) for start, end, s in sentences if PASSIVE_REGEX.search(s)]
+    ratio = len(passive) / len(sentences)
     if ratio >= threshold:  # Changed from > to >= to match test case
-        return [{"msg": f"passive voice > {int(threshold * 100)}% of sentences", "ratio": ratio}]
+        return [{"msg": f"passive voice > {int(threshold * 100)}% of sentences", "ratio": ratio, "spans": passive}]
     return []
 
 
 def weasel_word_issues(text: str) -> List[Dict]:
-    found = [w for w in WEASEL_WORDS if re.search(rf'\b{re.escape(w)}\b', text, re.IGNORECASE)]
-    return [{"msg": f"weasel word: {w}", "word": w} for w in found]
+    found = {w: _match_spans(rf'\b{re.escape(w)}\b', text) for w in WEASEL_WORDS}
+    return [{"msg": f"weasel word: {w}", "word": w, "spans": spans} for w, spans in found.items() if spans]
 
 
 def acronym_issues(text: str) -> List[Dict]:
-    found = set(ACRONYM_PATTERN.findall(text))
-    return [{"msg": f"acronym detected: {a}", "acronym": a} for a in found]
+    found: Dict[str, List[Tuple[int, int]]] = {}
+    for m in ACRONYM_PATTERN.finditer(text):
+        found.setdefault(m.group(1), []).append(m.span())
+    return [{"msg": f"acronym detected: {a}", "acronym": a, "spans": spans} for a, spans in found.items()]
 
 
 # --- AGGREGATOR ---
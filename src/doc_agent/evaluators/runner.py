@@ -0,0 +1,368 @@
+"""
+Run a set of evaluators against one text.
+
+Evaluators are independent, so they run concurrently on a bounded thread
+pool. Iteration latency drops from the sum of the calls to roughly the
+slowest one. Results always come back in evaluator order, whatever order
+they finished in.
+
+Results are memoized by evaluator identity plus a hash of the
+whitespace-normalized text, so an unchanged draft is never re-evaluated.
+Results that locate their failures (``spans``) hold offsets into the exact
+text evaluated, so they are keyed on the raw text instead.
+Evaluators can declare themselves ``deterministic``; their results are also
+kept in ``shared_results`` and reused across runs.
+
+With ``EvaluatorStats``, evaluators are scheduled by learned failure rate
+per second of latency instead of list order; results keep list order.
+
+Each evaluator call is traced as an ``evaluator`` span; cached results are
+recorded as zero-length spans with ``cache_hit=True``.
+"""
+
+import asyncio
+import contextvars
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+from ..tracing import span
+from .stats import EvaluatorStats
+from .types import EvalResult
+
+Evaluator = Callable[[str], Union[Dict[str, Any], EvalResult]]
+
+# Default upper bound on evaluators running at the same time
+DEFAULT_MAX_WORKERS = 4
+
+
+def evaluator_name(evaluator: Evaluator) -> str:
+    """Return the display name used for an evaluator in reports."""
+    return getattr(evaluator, "__name__", "evaluator")
+
+
+def evaluator_id(evaluator: Evaluator) -> Hashable:
+    """Return a stable identity for an evaluator.
+
+    Evaluators built by the registry factories carry an ``evaluator_id``
+    attribute that reflects their configuration. Anything else is identified
+    by the object itself, which is stable for the lifetime of a run.
+    """
+    return getattr(evaluator, "evaluator_id", None) or id(evaluator)
+
+
+def is_deterministic(evaluator: Evaluator) -> bool:
+    """Return True if the evaluator declares that equal text gives equal results."""
+    return bool(getattr(evaluator, "deterministic", False)) and hasattr(evaluator, "evaluator_id")
+
+
+def text_key(text: str) -> str:
+    """Hash text with whitespace normalized, so whitespace-only edits hit the cache."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def raw_text_key(text: str) -> str:
+    """Hash text exactly, for results whose spans are offsets into it."""
+    return "raw:" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _has_spans(result: Union[Dict[str, Any], EvalResult]) -> bool:
+    if isinstance(result, dict):
+        return bool(result.get("spans") or result.get("line_spans"))
+    return bool(result.spans or result.line_spans)
+
+
+class ResultCache:
+    """Thread-safe LRU map from (evaluator identity, text hash) to a result.
+
+    Args:
+        max_entries: Oldest entries are evicted beyond this size
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # type: OrderedDict[Tuple[Hashable, str], Any]
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Hashable, str], count: bool = True) -> Optional[Any]:
+        """Return the cached result, counting a hit or miss unless ``count`` is False."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += count
+                return self._data[key]
+            self.misses += count
+            return None
+
+    def count(self, hit: bool) -> None:
+        """Count a lookup made with ``count=False``."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, key: Tuple[Hashable, str], result: Any) -> None:
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Results of deterministic evaluators, shared by every run in the process
+shared_results = ResultCache()
+
+
+def passed(result: Union[Dict[str, Any], EvalResult]) -> bool:
+    """Return True if a dict or EvalResult result is a PASS."""
+    if isinstance(result, dict):
+        return result["status"] == "PASS"
+    return bool(result)
+
+
+def run_evaluators(
+    evaluators: Sequence[Evaluator],
+    text: str,
+    max_workers: Optional[int] = None,
+    fail_fast: Optional[int] = None,
+    memo: Optional[ResultCache] = None,
+    stats: Optional[EvaluatorStats] = None
+) -> List[Tuple[str, Union[Dict[str, Any], EvalResult]]]:
+    """Run evaluators against text, concurrently when more than one worker is allowed.
+
+    Args:
+        evaluators: Evaluator functions to run
+        text: The text to evaluate
+        max_workers: Thread pool size (default: DEFAULT_MAX_WORKERS; 1 runs in order)
+        fail_fast: If set, stop once this many evaluators have failed. Evaluators
+            that have not started are cancelled and left out of the results.
+            Evaluators already running cannot be stopped: they still finish
+            in the background, and AI evaluators still spend their tokens. With
+            no more evaluators than workers, every one has started, so
+            fail_fast only saves waiting for their results.
+        memo: Optional per-run cache; results found there are reused instead
+            of calling the evaluator again
+        stats: Optional learned statistics; evaluators then start in order of
+            stats.priority and every call is recorded there
+
+    Returns:
+        List of (evaluator name, result) pairs in evaluator order
+    """
+    if max_workers is None:
+        max_workers = DEFAULT_MAX_WORKERS
+
+    keys = (text_key(text), raw_text_key(text))
+    slots = [None] * len(evaluators)  # type: List[Optional[Any]]
+    failures = 0
+    to_run = []
+    for idx, ev in enumerate(evaluators):
+        cached = _lookup(ev, keys, memo)
+        if cached is None:
+            to_run.append(idx)
+            continue
+        logging.debug(f"Reusing cached result for {evaluator_name(ev)}")
+        slots[idx] = cached
+        if not passed(cached):
+            failures += 1
+
+    to_run = _schedule(evaluators, to_run, stats)
+    if fail_fast and failures >= fail_fast:
+        to_run = []
+    elif max_workers <= 1 or len(to_run) <= 1:
+        for idx in to_run:
+            slots[idx] = _call(evaluators[idx], text, keys, memo, stats)
+            if not passed(slots[idx]):
+                failures += 1
+                if fail_fast and failures >= fail_fast:
+                    logging.debug(f"Fail-fast: stopping after {failures} failure(s)")
+                    break
+    else:
+        pool = ThreadPoolExecutor(
+            max_workers=min(max_workers, len(to_run)),
+            thread_name_prefix="doc-agent-eval"
+        )
+        futures = {}  # type: Dict[Future, int]
+        try:
+            futures = {
+                pool.submit(contextvars.copy_context().run, _call, evaluators[idx], text, keys, memo, stats): idx
+                for idx in to_run
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    result = fut.result()
+                    slots[futures[fut]] = result
+                    if not passed(result):
+                        failures += 1
+                if fail_fast and failures >= fail_fast and pending:
+                    logging.debug(f"Fail-fast: {failures} failure(s), cancelling {len(pending)} evaluator(s)")
+                    break
+        finally:
+            # Futures that have not started are cancelled one by one
+            # (shutdown's cancel_futures needs Python 3.9); running ones finish
+            for fut in futures:
+                fut.cancel()
+            pool.shutdown(wait=False)
+
+    return [
+        (evaluator_name(ev), result)
+        for ev, result in zip(evaluators, slots)
+        if result is not None
+    ]
+
+
+def _schedule(evaluators: Sequence[Evaluator], to_run: List[int], stats: Optional[EvaluatorStats]) -> List[int]:
+    """Order evaluator indexes by learned priority, keeping list order for ties."""
+    if stats is None:
+        return to_run
+    return sorted(to_run, key=lambda idx: -stats.priority(evaluator_name(evaluators[idx])))
+
+
+def _record(
+    ev: Evaluator,
+    result: Any,
+    started: float,
+    memo: Optional[ResultCache],
+    keys: Tuple[str, str],
+    stats: Optional[EvaluatorStats]
+) -> None:
+    """Store a fresh result in the caches and the statistics.
+
+    ``keys`` are the normalized and raw text keys; results with spans are
+    stored under the raw one.
+    """
+    key = (evaluator_id(ev), keys[1] if _has_spans(result) else keys[0])
+    if memo is not None:
+        memo.put(key, result)
+    if is_deterministic(ev):
+        shared_results.put(key, result)
+    if stats is not None:
+        stats.record(evaluator_name(ev), time.perf_counter() - started, passed(result))
+
+
+def _lookup(ev: Evaluator, keys: Tuple[str, str], memo: Optional[ResultCache]) -> Optional[Any]:
+    """Find a result for the exact text, or a span-free one for a whitespace variant."""
+    cached, in_memo = None, False
+    for digest in keys[::-1]:
+        key = (evaluator_id(ev), digest)
+        if memo is not None:
+            cached = memo.get(key, count=False)
+            in_memo = cached is not None
+        if cached is None and is_deterministic(ev):
+            cached = shared_results.get(key, count=False)
+            if cached is not None and memo is not None:
+                memo.put(key, cached)
+        if cached is not None:
+            break
+    # One hit or miss per lookup, however many keys were tried
+    if memo is not None:
+        memo.count(in_memo)
+    if is_deterministic(ev) and not in_memo:
+        shared_results.count(cached is not None)
+    if cached is not None:
+        with span("evaluator", evaluator=evaluator_name(ev), cache_hit=True, passed=passed(cached)):
+            pass
+    return cached
+
+
+def _call(
+    ev: Evaluator,
+    text: str,
+    keys: Tuple[str, str],
+    memo: Optional[ResultCache],
+    stats: Optional[EvaluatorStats] = None
+) -> Any:
+    started = time.perf_counter()
+    with span("evaluator", evaluator=evaluator_name(ev), cache_hit=False) as current:
+        result = ev(text)
+        current.set(passed=passed(result))
+    _record(ev, result, started, memo, keys, stats)
+    return result
+
+
+async def run_evaluators_async(
+    evaluators: Sequence[Evaluator],
+    text: str,
+    fail_fast: Optional[int] = None,
+    memo: Optional[ResultCache] = None,
+    stats: Optional[EvaluatorStats] = None
+) -> List[Tuple[str, Union[Dict[str, Any], EvalResult]]]:
+    """Asyncio version of run_evaluators.
+
+    Evaluators with a ``run_async`` coroutine function are awaited directly;
+    plain functions run in the default thread pool. All of them run as
+    concurrent tasks. Results come back in evaluator order, and fail_fast
+    cancels the tasks still running.
+    """
+    keys = (text_key(text), raw_text_key(text))
+    slots = [None] * len(evaluators)  # type: List[Optional[Any]]
+    failures = 0
+    to_run = []
+    for idx, ev in enumerate(evaluators):
+        cached = _lookup(ev, keys, memo)
+        if cached is None:
+            to_run.append(idx)
+            continue
+        slots[idx] = cached
+        if not passed(cached):
+            failures += 1
+
+    to_run = _schedule(evaluators, to_run, stats)
+    if to_run and not (fail_fast and failures >= fail_fast):
+        tasks = {
+            asyncio.ensure_future(_call_async(evaluators[idx], text, keys, memo, stats)): idx
+            for idx in to_run
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    slots[tasks[task]] = result
+                    if not passed(result):
+                        failures += 1
+                if fail_fast and failures >= fail_fast and pending:
+                    logging.debug(f"Fail-fast: {failures} failure(s), cancelling {len(pending)} evaluator(s)")
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+
+    return [
+        (evaluator_name(ev), result)
+        for ev, result in zip(evaluators, slots)
+        if result is not None
+    ]
+
+
+async def _call_async(
+    ev: Evaluator,
+    text: str,
+    keys: Tuple[str, str],
+    memo: Optional[ResultCache],
+    stats: Optional[EvaluatorStats] = None
+) -> Any:
+    run_async = getattr(ev, "run_async", None)
+    started = time.perf_counter()
+    with span("evaluator", evaluator=evaluator_name(ev), cache_hit=False) as current:
+        if run_async is not None:
+            result = await run_async(text)
+        else:
+            call = functools.partial(contextvars.copy_context().run, ev, text)
+            result = await asyncio.get_running_loop().run_in_executor(None, call)
+        current.set(passed=passed(result))
+    _record(ev, result, started, memo, keys, stats)
+    return result
@@ -0,0 +1,105 @@
+"""
+Per-evaluator latency and failure statistics, persisted across runs.
+
+The runner uses them to schedule evaluators by expected information per
+unit of cost: the probability that an evaluator fails divided by its mean
+latency. Cheap evaluators that often fail run first, so fail-fast cuts an
+iteration off sooner. Only the scheduling order changes; reports always
+list evaluators in their configured order.
+
+Several processes (parallel ``process`` runs, pre-commit hooks) may share
+one statistics directory, so saving merges this process's new counts into
+what is on disk under a lock file instead of overwriting it.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+from ..store import JsonStore
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# Default location used by the CLI's --adaptive-order flag
+DEFAULT_STATS_DIR = ".doc_agent/stats"
+
+# Latency assumed for an evaluator that has never run
+DEFAULT_LATENCY_S = 1.0
+
+_STATS_KEY = "evaluators"
+
+_COUNTS = ("runs", "failures", "seconds")
+
+
+class EvaluatorStats:
+    """Running latency and failure counts per evaluator name.
+
+    Args:
+        root: Directory to load the statistics from and save them to. Without
+            one, statistics only live as long as the object.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.store = JsonStore(root) if root else None
+        self._lock = threading.Lock()
+        self.entries = {}  # type: Dict[str, Dict[str, Any]]
+        # Counts recorded since the last save, merged into the file on save
+        self._unsaved = {}  # type: Dict[str, Dict[str, Any]]
+        if self.store is not None:
+            self.entries = self.store.get(_STATS_KEY) or {}
+
+    def record(self, name: str, seconds: float, passed: bool) -> None:
+        """Record one evaluator call."""
+        with self._lock:
+            for entries in (self.entries, self._unsaved):
+                entry = entries.setdefault(name, {"runs": 0, "failures": 0, "seconds": 0.0})
+                entry["runs"] += 1
+                entry["failures"] += 0 if passed else 1
+                entry["seconds"] += seconds
+
+    def failure_rate(self, name: str) -> float:
+        """Smoothed probability that the evaluator fails (0.5 when unseen)."""
+        entry = self.entries.get(name)
+        if not entry:
+            return 0.5
+        return (entry["failures"] + 1) / (entry["runs"] + 2)
+
+    def mean_latency(self, name: str) -> float:
+        """Mean seconds per call (DEFAULT_LATENCY_S when unseen)."""
+        entry = self.entries.get(name)
+        if not entry or not entry["runs"]:
+            return DEFAULT_LATENCY_S
+        return entry["seconds"] / entry["runs"]
+
+    def priority(self, name: str) -> float:
+        """Expected failures found per second spent; higher runs first."""
+        return self.failure_rate(name) / max(self.mean_latency(name), 1e-3)
+
+    def save(self) -> None:
+        """Add the counts recorded since the last save to the saved statistics.
+
+        The file is read, merged and replaced while holding a lock file, so
+        concurrent savers don't lose each other's counts. Afterwards
+        ``entries`` also holds what other processes saved.
+        """
+        if self.store is None:
+            return
+        with self._lock:
+            self.store.root.mkdir(parents=True, exist_ok=True)
+            with self.store.path_for(_STATS_KEY, ".lock").open("a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    merged = self.store.get(_STATS_KEY) or {}
+                    for name, counts in self._unsaved.items():
+                        entry = merged.setdefault(name, {"runs": 0, "failures": 0, "seconds": 0.0})
+                        for field in _COUNTS:
+                            entry[field] += counts[field]
+                    self.store.put(_STATS_KEY, merged)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            self.entries = merged
+            self._unsaved = {}
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Literal, Optional
+from typing import List, Literal, Optional, Tuple
 
 EvalStatus = Literal["PASS", "FAIL"]
 
@@ -11,10 +11,16 @@ class EvalResult:
         name: Name of the evaluator that produced this result
         status: Whether the evaluation passed or failed
         error: Optional error message explaining why the evaluation failed
+        spans: (start, end) offsets of the failing text, or None when the
+            failure cannot be located (or not every failure could)
+        line_spans: For multi-line errors, the spans of each line of error,
+            so the spans of lines fixed locally can be left out
     """
     name: str
     status: EvalStatus
     error: str = ""
+    spans: Optional[List[Tuple[int, int]]] = None
+    line_spans: Optional[List[List[Tuple[int, int]]]] = None
     
     def __bool__(self) -> bool:
         """Allow using EvalResult in boolean context to check if it passed."""
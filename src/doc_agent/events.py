@@ -0,0 +1,82 @@
+"""
+Events yielded by the streaming agent APIs.
+
+``agent.iter_agent_events`` and ``agent.aiter_agent_events`` yield these as
+the loop runs, so callers can show progress and partial text or abandon a
+run early. Every stream ends with a ``Final`` event carrying the run_agent
+result dict. ``to_dict()`` gives the JSON form used by ``generate --stream``.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
+
+
+@dataclass
+class AgentEvent:
+    """Base class of all agent events."""
+    event: ClassVar[str] = "event"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the event as a JSON-serializable dict with an "event" type field."""
+        return {"event": self.event, **asdict(self)}
+
+
+@dataclass
+class DraftStarted(AgentEvent):
+    """An LLM draft (iteration 0) or fix was requested.
+
+    Attributes:
+        iteration: Iteration the draft belongs to; 0 for the initial draft
+        fix: The fix instructions sent with the request, if any
+    """
+    event: ClassVar[str] = "draft_started"
+    iteration: int
+    fix: Optional[str] = None
+
+
+@dataclass
+class DraftFinished(AgentEvent):
+    """A draft came back; ``text`` is the (best) candidate kept."""
+    event: ClassVar[str] = "draft_finished"
+    iteration: int
+    text: str
+
+
+@dataclass
+class EvaluatorReport(AgentEvent):
+    """One evaluator's verdict on the current text."""
+    event: ClassVar[str] = "evaluator_result"
+    iteration: int
+    evaluator: str
+    status: str
+    details: str
+
+
+@dataclass
+class FixRequested(AgentEvent):
+    """The loop is about to ask for a fix of these (evaluator, error) failures."""
+    event: ClassVar[str] = "fix_requested"
+    iteration: int
+    failures: List[Tuple[str, str]]
+
+
+@dataclass
+class LocalFix(AgentEvent):
+    """Mechanical failures were fixed locally (see ``autofix``).
+
+    Attributes:
+        iteration: Iteration whose failures were fixed
+        text: The locally fixed text
+        llm_call_saved: True if nothing was left for the LLM, so no fix call was made
+    """
+    event: ClassVar[str] = "local_fix"
+    iteration: int
+    text: str
+    llm_call_saved: bool
+
+
+@dataclass
+class Final(AgentEvent):
+    """The run finished; ``result`` is the run_agent result dict."""
+    event: ClassVar[str] = "final"
+    result: Dict[str, Any]
@@ -4,6 +4,7 @@ from textwrap import shorten
 
 MAX_CHARS = 72
 PATTERN_VERB_FIRST = re.compile(r"^[A-Z][a-z]+\s")        # crude but cheap
+QUOTES = "\"'“‘"
 
 def check(line: str) -> list[str]:
     """Return a list of rule-violations for *line* (empty → PASS)."""
@@ -14,9 +15,12 @@ def check(line: str) -> list[str]:
         errs.append(f"exceeds {MAX_CHARS} characters")
     if not line.endswith("."):
         errs.append("missing trailing period")
+    if line and line[0] in QUOTES:
+        errs.append("wrapped in quotation marks")
     if not PATTERN_VERB_FIRST.match(line):
         errs.append("should start with an imperative-mood verb")
-    if line.split()[0].lower() in {"this", "a", "an"}:
+    words = line.split()
+    if words and words[0].lower() in {"this", "a", "an"}:
         errs.append("don't start with fillers like 'This ...'")
     return errs
 
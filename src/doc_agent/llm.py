@@ -0,0 +1,283 @@
+"""
+Thin layer in front of the chat-completion provider calls.
+
+Every drafting and evaluation call goes through ``complete`` so cross-cutting
+behaviour lives in one place. Deterministic requests (temperature 0) are
+coalesced with ``singleflight.flight``: identical concurrent requests share
+one provider call. Token usage is charged to the run's ``budget``, and
+each call is traced as an ``llm.call`` span with its token usage and
+whether it was served by another caller's request. ``complete_streaming``
+checks the text as it arrives and stops a completion that is already known
+to fail.
+
+openai and python-dotenv are imported on first use, not with this module,
+so commands that never call a model start quickly. The shared clients are
+created with the SDK's own retries off; callers retry through
+``retry.RetryPolicy``.
+"""
+
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from doc_agent.budget import record_tokens
+from doc_agent.singleflight import flight, request_key
+from doc_agent.tracing import span
+
+
+def _record_usage(current: Any, resp: Any) -> None:
+    """Copy token counts from a provider response onto a span and the run's budget."""
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+        completion_tokens = getattr(usage, "completion_tokens", None) or 0
+        current.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        record_tokens(prompt_tokens + completion_tokens)
+
+if TYPE_CHECKING:
+    import openai
+
+_client = None  # type: Any
+_async_client = None  # type: Any
+_client_lock = threading.Lock()
+
+
+def _openai() -> Any:
+    """Import openai, loading a ``.env`` file into the environment first."""
+    from dotenv import load_dotenv
+    import openai
+
+    load_dotenv()
+    return openai
+
+
+def get_client() -> "openai.OpenAI":
+    """Get or create the shared ``openai.OpenAI`` client used by the sync paths.
+
+    The client is thread-safe and keeps a connection pool, so every call
+    (including concurrent batch runs) reuses the same one.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = _openai().OpenAI(max_retries=0)
+    return _client
+
+
+class StreamAborted(Exception):
+    """Raised by ``complete_streaming`` when the text check stopped the completion.
+
+    Attributes:
+        reason: What the check found
+        partial: The text received before the stream was closed
+    """
+
+    def __init__(self, reason: str, partial: str):
+        super().__init__(reason)
+        self.reason = reason
+        self.partial = partial
+
+
+def complete(
+    client: Any,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    timeout: float = None,
+    **options: Any
+) -> str:
+    """Run a chat completion and return the stripped message content.
+
+    Args:
+        client: Object exposing ``chat.completions.create`` (usually
+            ``get_client()``)
+        messages: Chat messages to send
+        model: Model name
+        temperature: Sampling temperature; 0 makes the request coalescable
+        timeout: Optional request timeout in seconds
+        **options: Extra arguments passed to the provider
+
+    Returns:
+        The content of the first choice, stripped of surrounding whitespace
+    """
+    with span("llm.call", model=model, temperature=temperature) as current:
+        called = []
+
+        def _call() -> str:
+            called.append(True)
+            kwargs = dict(options)
+            if timeout is not None:
+                kwargs["timeout"] = timeout
+            resp = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                **kwargs
+            )
+            _record_usage(current, resp)
+            return resp.choices[0].message.content.strip()
+
+        if temperature != 0:
+            return _call()
+
+        key = request_key(model=model, messages=messages, temperature=temperature, **options)
+        result = flight.do(key, _call)
+        current.set(cache_hit=not called)
+        return result
+
+
+def complete_streaming(
+    client: Any,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    should_abort: Optional[Callable[[str], Optional[str]]] = None,
+    timeout: float = None,
+    **options: Any
+) -> str:
+    """Stream a chat completion, checking the text received so far after every chunk.
+
+    Arguments are as for ``complete``, plus:
+
+    Args:
+        should_abort: Called with the text so far; returns a reason to stop
+            the completion, or None to go on
+
+    Returns:
+        The full content, stripped of surrounding whitespace
+
+    Raises:
+        StreamAborted: If ``should_abort`` returned a reason; the stream is
+            closed so no further tokens are generated
+    """
+    if timeout is not None:
+        options["timeout"] = timeout
+    with span("llm.call", model=model, temperature=temperature, stream=True) as current:
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+            **options
+        )
+        parts = []  # type: List[str]
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    _record_usage(current, chunk)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                parts.append(delta)
+                reason = should_abort("".join(parts)) if should_abort else None
+                if reason:
+                    current.set(aborted=reason)
+                    raise StreamAborted(reason, "".join(parts))
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+    return "".join(parts).strip()
+
+
+def complete_choices(
+    client: Any,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    n: int,
+    timeout: float = None,
+    **options: Any
+) -> List[str]:
+    """Ask for ``n`` completions in one request and return every choice's content.
+
+    Sampling several candidates only makes sense with a non-zero temperature,
+    so these requests are never coalesced.
+    """
+    if timeout is not None:
+        options["timeout"] = timeout
+    with span("llm.call", model=model, temperature=temperature, n=n) as current:
+        resp = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            n=n,
+            **options
+        )
+        _record_usage(current, resp)
+    return [choice.message.content.strip() for choice in resp.choices]
+
+
+async def complete_choices_async(
+    client: Any,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    n: int,
+    timeout: float = None,
+    **options: Any
+) -> List[str]:
+    """Asyncio version of ``complete_choices``."""
+    if timeout is not None:
+        options["timeout"] = timeout
+    with span("llm.call", model=model, temperature=temperature, n=n) as current:
+        resp = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            n=n,
+            **options
+        )
+        _record_usage(current, resp)
+    return [choice.message.content.strip() for choice in resp.choices]
+
+
+def get_async_client() -> "openai.AsyncOpenAI":
+    """Get or create the shared ``openai.AsyncOpenAI`` client used by the async paths."""
+    global _async_client
+    with _client_lock:
+        if _async_client is None:
+            _async_client = _openai().AsyncOpenAI(max_retries=0)
+    return _async_client
+
+
+async def complete_async(
+    client: Any,
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    timeout: float = None,
+    **options: Any
+) -> str:
+    """Asyncio version of ``complete``.
+
+    ``client`` must expose an awaitable ``chat.completions.create`` (for
+    example ``get_async_client()``). Cancelling the awaiting task cancels
+    the provider request.
+    """
+    with span("llm.call", model=model, temperature=temperature) as current:
+        called = []
+
+        async def _call() -> str:
+            called.append(True)
+            kwargs = dict(options)
+            if timeout is not None:
+                kwargs["timeout"] = timeout
+            resp = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                **kwargs
+            )
+            _record_usage(current, resp)
+            return resp.choices[0].message.content.strip()
+
+        if temperature != 0:
+            return await _call()
+
+        key = request_key(model=model, messages=messages, temperature=temperature, **options)
+        result = await flight.do_async(key, _call)
+        current.set(cache_hit=not called)
+        return result
@@ -11,18 +11,40 @@ from typing import Dict, Any, Optional
 
 from doc_agent.ingestion import ingest
 from doc_agent.outline import make_outline
-from doc_agent.draft import fill_sections
+from doc_agent.digest import DEFAULT_DIGEST_TOKENS
+from doc_agent.draft import SectionDraftError, fill_sections
 from doc_agent.lint import self_lint
 from doc_agent.publish import write_doc
-from doc_agent.evaluators import FORBIDDEN_FILE
+from doc_agent.evaluators import FORBIDDEN_FILE, forbidden_list_version
+from doc_agent.checkpoint import CheckpointStore, item_key
+from doc_agent.section_cache import SectionCache
 
-def process_document(path: str, forbidden_file: Optional[str] = FORBIDDEN_FILE) -> Dict[str, Any]:
+def process_document(
+    path: str,
+    forbidden_file: Optional[str] = FORBIDDEN_FILE,
+    checkpoint_store: Optional[CheckpointStore] = None,
+    resume: bool = False,
+    single_request: bool = False,
+    stream_drafts: bool = False,
+    section_cache: Optional[SectionCache] = None,
+    digest_tokens: Optional[int] = DEFAULT_DIGEST_TOKENS
+) -> Dict[str, Any]:
     """
     End-to-end pipeline: ingest source, outline, draft, lint, and publish.
     
     Args:
         path: Path to the source file to process
         forbidden_file: Path to custom forbidden words file (optional)
+        checkpoint_store: If given, the output of every stage is saved there
+        resume: If True, a completed document is skipped and an unfinished one
+            continues after its last saved stage. Checkpoints are keyed on the
+            file's path and content, so an edited file starts over.
+        single_request: Draft all sections with one LLM call (see fill_sections)
+        stream_drafts: Stream section drafts and stop those that break their
+            rules early (see fill_sections)
+        section_cache: Reuse section drafts of unchanged code from this cache
+        digest_tokens: Send a digest instead of sources over this many tokens
+            (None always sends the whole source; see fill_sections)
         
     Returns:
         Dict containing:
@@ -31,32 +53,77 @@ def process_document(path: str, forbidden_file: Optional[str] = FORBIDDEN_FILE)
             - error: Error message if status is "error"
     """
     try:
+        key = None
+        state = {}  # type: Dict[str, Any]
+        if checkpoint_store is not None:
+            key = item_key(
+                "pipeline",
+                path=str(Path(path).resolve()),
+                source=Path(path).read_text(),
+                forbidden=forbidden_list_version(forbidden_file)
+            )
+            if resume:
+                done = checkpoint_store.completed(key)
+                if done is not None:
+                    print(f"Skipping {path} (already processed)")
+                    return done
+                state = checkpoint_store.state(key) or {}
+
+        def _stage(name: str, value: Any) -> Any:
+            state[name] = value
+            if key is not None:
+                checkpoint_store.save_state(key, state)
+            return value
+
         # 1. Ingest & parse metadata
-        data = ingest(path)
+        data = state.get("data") or _stage("data", ingest(path))
 
         # 2. Create outline skeleton
-        outline = make_outline(data)
+        outline = state.get("outline") or _stage("outline", make_outline(data))
 
         # 3. Draft + lint, with fallback on errors
-        try:
-            drafted = fill_sections(outline, data.get("source", ""))
-            finalized = self_lint(drafted, forbidden_file=forbidden_file)
-        except Exception as err:
-            print(f"⚠️  Warning: drafting/linting failed: {err}")
-            # fallback to publishing the raw outline
-            finalized = outline
+        finalized = state.get("finalized")
+        fallback = False
+        if finalized is None:
+            try:
+                drafted = state.get("drafted") or _stage(
+                    "drafted",
+                    fill_sections(
+                        outline,
+                        data.get("source", ""),
+                        single_request=single_request,
+                        stream=stream_drafts,
+                        cache=section_cache,
+                        metadata=data,
+                        digest_tokens=digest_tokens,
+                        forbidden_file=forbidden_file or FORBIDDEN_FILE
+                    )
+                )
+                finalized = _stage("finalized", self_lint(drafted))
+            except SectionDraftError as err:
+                for section, error in err.failures.items():
+                    print(f"⚠️  Warning: drafting section '{section}' failed: {error}")
+                finalized, fallback = outline, True
+            except Exception as err:
+                print(f"⚠️  Warning: drafting/linting failed: {err}")
+                # fallback to publishing the raw outline
+                finalized, fallback = outline, True
 
         # 4. Publish the document
         name = data.get("name") or Path(path).stem
         doc_path = write_doc(finalized, name)
         
-        return {
+        result = {
             "status": "success",
             "text": finalized
         }
+        # A fallback is not checkpointed as done, so resume drafts it again
+        if key is not None and not fallback:
+            checkpoint_store.save_result(key, result)
+        return result
         
     except Exception as e:
         return {
             "status": "error",
             "error": str(e)
-        } 
\ No newline at end of file
+        } 
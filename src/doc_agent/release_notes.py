@@ -4,13 +4,15 @@ Release notes generator that extracts commits and uses LLM to generate structure
 
 from pathlib import Path
 import json
-from typing import Dict, List, Iterator
-from git import Repo
-import openai
+from typing import Dict, List, Iterator, Optional
 from datetime import datetime
 import textwrap
 import os
 
+from doc_agent.llm import complete, get_client
+from doc_agent.retry import DEFAULT_RETRY
+from doc_agent.routing import get_router
+
 def collect_commits(repo_path: str, rev_from: str, rev_to: str) -> Iterator[Dict]:
     """
     Collect commits between two git refs.
@@ -23,6 +25,9 @@ def collect_commits(repo_path: str, rev_from: str, rev_to: str) -> Iterator[Dict
     Returns:
         Iterator of commit dictionaries with sha, msg, author, and date
     """
+    # GitPython is only needed here; importing it up front slows every command
+    from git import Repo
+
     repo = Repo(repo_path)
     rng = f"{rev_from}..{rev_to}"
     for c in repo.iter_commits(rng):
@@ -50,13 +55,13 @@ For each item include:
 - Tutorial/highlight suggestion if impact ≥3
 """
 
-def generate_notes(changes: List[Dict], model: str = "gpt-4") -> str:
+def generate_notes(changes: List[Dict], model: Optional[str] = None) -> str:
     """
     Generate release notes from commit changes using LLM.
     
     Args:
         changes: List of commit dictionaries
-        model: OpenAI model to use
+        model: OpenAI model to use (default: the "release_notes" route)
         
     Returns:
         Markdown formatted release notes
@@ -68,12 +73,13 @@ def generate_notes(changes: List[Dict], model: str = "gpt-4") -> str:
             json.dumps(changes, indent=2)}
     ]
     
-    response = openai.ChatCompletion.create(
-        model=model,
-        messages=messages,
-        temperature=0.2,
-    )
-    return response.choices[0].message.content
+    with get_router().call("release_notes") as route:
+        return DEFAULT_RETRY.call(lambda: complete(
+            get_client(),
+            messages=messages,
+            model=model or route.model,
+            temperature=0.2,
+        ), "release_notes")
 
 def format_notes(llm_reply: str, version_tag: str) -> str:
     """
@@ -100,7 +106,7 @@ def generate_release_notes(
     rev_from: str,
     rev_to: str = "HEAD",
     output_file: str = None,
-    model: str = "gpt-4"
+    model: Optional[str] = None
 ) -> str:
     """
     Generate release notes for a git repository.
@@ -110,7 +116,7 @@ def generate_release_notes(
         rev_from: Starting revision
         rev_to: Ending revision (default: HEAD)
         output_file: Optional path to save output
-        model: OpenAI model to use
+        model: OpenAI model to use (default: the "release_notes" route)
         
     Returns:
         Generated release notes as Markdown string
@@ -0,0 +1,94 @@
+"""
+Opt-in store of finished ``run_doc_agent`` results.
+
+The same (scenario, style, evaluator set) combinations get regenerated
+over and over. With a ``ResultStore`` a successful run is saved, and a later
+run with the same inputs returns it without drafting or evaluating again.
+
+A stored result is reused only while all of these are unchanged, since each
+one is part of its key:
+
+- the scenario and style, after whitespace normalization
+- the evaluator set and each evaluator's identity (which covers its
+  configuration, e.g. the heuristics' forbidden words)
+- the forbidden-list version (a hash of the file's contents)
+- the run options that affect the text (max_iters, candidates, fix mode, ...)
+- RESULT_STORE_VERSION, bumped whenever the agent's output changes
+
+Beyond that, entries older than ``max_age`` seconds are ignored, a single
+entry can be dropped with ``invalidate`` or refreshed by passing
+``refresh=True`` to run_doc_agent, and ``clear`` empties the store. Only
+successful runs are stored.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from doc_agent.store import JsonStore, hash_key
+
+# Default location used by the CLI's --reuse-results flag
+DEFAULT_RESULTS_DIR = ".doc_agent/results"
+
+# Bump to invalidate every stored result, e.g. when prompts or models change
+RESULT_STORE_VERSION = 1
+
+
+def normalize_input(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a result."""
+    return " ".join(text.split())
+
+
+def result_key(
+    scenario: str,
+    style: str,
+    evaluator_ids: List[str],
+    forbidden_version: str,
+    options: Dict[str, Any]
+) -> str:
+    """Build the store key from everything a stored result depends on."""
+    return hash_key(
+        "result",
+        RESULT_STORE_VERSION,
+        normalize_input(scenario),
+        normalize_input(style),
+        evaluator_ids,
+        forbidden_version,
+        options
+    )
+
+
+class ResultStore:
+    """Successful run results on the local filesystem.
+
+    Args:
+        root: Directory holding the results
+        max_age: If set, results older than this many seconds are not reused
+    """
+
+    def __init__(self, root: str = DEFAULT_RESULTS_DIR, max_age: Optional[float] = None):
+        self.store = JsonStore(root)
+        self.max_age = max_age
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored result for ``key``, or None if there is no usable one."""
+        record = self.store.get(key, max_age=self.max_age)
+        if not record or record.get("version") != RESULT_STORE_VERSION:
+            return None
+        return record["result"]
+
+    def put(self, key: str, result: Dict[str, Any]) -> bool:
+        """Store a successful result; returns False (and stores nothing) otherwise."""
+        if result.get("final_status") != "success":
+            return False
+        self.store.put(key, {"version": RESULT_STORE_VERSION, "result": result})
+        return True
+
+    def invalidate(self, key: str) -> None:
+        """Drop the result stored under ``key``."""
+        self.store.delete(key)
+
+    def clear(self) -> int:
+        """Drop every stored result and return how many there were."""
+        keys = list(self.store.keys())
+        for key in keys:
+            self.store.delete(key)
+        return len(keys)
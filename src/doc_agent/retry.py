@@ -0,0 +1,271 @@
+"""
+Retry policy shared by every provider call.
+
+Drafting, evaluation and release notes retry through one ``RetryPolicy``
+instead of each keeping its own loop:
+
+- only transient errors are retried: timeouts, connection errors, 408/409/
+  429 and 5xx responses (``is_retryable``). Bad requests, authentication
+  errors and anything raised by our own code fail at once.
+- waits use decorrelated jitter, so callers that failed together do not
+  retry together
+- a ``Retry-After`` (or ``retry-after-ms``) header on a rate-limit
+  response is waited out instead of the computed delay
+- besides the attempt limit, an overall deadline bounds the time spent on
+  one call, waits included; callers pass a shorter one when their run has
+  less time left (see ``budget.time_left``), and no attempt is started
+  once it has passed
+- every call is counted per operation in ``metrics``, and every wait is
+  traced as a ``retry.sleep`` span
+
+The shared clients are created with the provider SDK's own retries turned
+off (see ``llm.get_client``), so this is the only retry layer.
+
+Exception classes are checked without importing openai or httpx: an error
+can only be one of their types once the module has been imported.
+"""
+
+import asyncio
+import email.utils
+import logging
+import random
+import sys
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from doc_agent.tracing import span
+
+# HTTP statuses worth another attempt, besides every 5xx
+RETRYABLE_STATUS = frozenset({408, 409, 429})
+
+
+class RetryError(RuntimeError):
+    """Raised when a transient error outlasts the attempt limit or the deadline.
+
+    The last error is chained as ``__cause__``.
+
+    Attributes:
+        operation: The operation that failed (e.g. "section")
+        attempts: How many attempts were made
+        out_of_time: Whether the deadline, not the attempt limit, ended it
+    """
+
+    def __init__(self, operation: str, attempts: int, error: BaseException, out_of_time: bool = False):
+        super().__init__(f"'{operation}' call failed after {attempts} attempts: {error}")
+        self.operation = operation
+        self.attempts = attempts
+        self.out_of_time = out_of_time
+
+
+def _headers(exc: BaseException) -> Any:
+    return getattr(getattr(exc, "response", None), "headers", None) or {}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return True for errors that another attempt may get past."""
+    should_retry = _headers(exc).get("x-should-retry")
+    if should_retry in ("true", "false"):
+        return should_retry == "true"
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS or status >= 500
+    openai = sys.modules.get("openai")
+    # APITimeoutError is an APIConnectionError
+    if openai is not None and isinstance(exc, openai.APIConnectionError):
+        return True
+    httpx = sys.modules.get("httpx")
+    if httpx is not None and isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)):
+        return True
+    return isinstance(exc, (TimeoutError, ConnectionError))
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Return the seconds the server asked to wait before retrying, if it said."""
+    headers = _headers(exc)
+    try:
+        return max(float(headers.get("retry-after-ms")) / 1000, 0.0)
+    except (TypeError, ValueError):
+        pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+class RetryMetrics:
+    """Per-operation counts of calls, attempts, waits and give-ups."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.operations = {}  # type: Dict[str, Dict[str, Any]]
+
+    def _entry(self, operation: str) -> Dict[str, Any]:
+        return self.operations.setdefault(
+            operation, {"calls": 0, "attempts": 0, "retries": 0, "gave_up": 0, "failed": 0, "waited": 0.0}
+        )
+
+    def waited(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._entry(operation)
+            entry["retries"] += 1
+            entry["waited"] += seconds
+
+    def finished(self, operation: str, attempts: int, outcome: str) -> None:
+        """Count one call; ``outcome`` is "ok", "gave_up" or "failed" (not retryable)."""
+        with self._lock:
+            entry = self._entry(operation)
+            entry["calls"] += 1
+            entry["attempts"] += attempts
+            if outcome != "ok":
+                entry[outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of the counts, keyed by operation."""
+        with self._lock:
+            return {operation: dict(entry) for operation, entry in self.operations.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.operations.clear()
+
+
+metrics = RetryMetrics()
+
+
+class RetryPolicy:
+    """When and how long to wait before trying a provider call again.
+
+    Args:
+        max_attempts: Attempts per call, the first one included
+        base_delay: Shortest wait in seconds
+        max_delay: Longest computed wait in seconds (a Retry-After header may
+            ask for more; the deadline still applies)
+        deadline: Seconds after which no further attempt is started
+        retryable: Decides which errors are retried
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 20.0,
+        deadline: float = 60.0,
+        retryable: Callable[[BaseException], bool] = is_retryable
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retryable = retryable
+
+    def next_delay(self, previous: float) -> float:
+        """Decorrelated jitter: a random wait between base_delay and three times the previous one."""
+        return min(self.max_delay, random.uniform(self.base_delay, max(previous, self.base_delay) * 3))
+
+    def _plan(self, exc: Exception, attempt: int, started: float, limit: float, previous: float) -> Optional[float]:
+        """Return the wait before the next attempt, or None to give up."""
+        if attempt >= self.max_attempts:
+            return None
+        delay = retry_after(exc)
+        if delay is None:
+            delay = self.next_delay(previous)
+        if time.monotonic() - started + delay >= limit:
+            return None
+        return delay
+
+    def call(self, fn: Callable[[], Any], operation: str, deadline: Optional[float] = None, **fields: Any) -> Any:
+        """Call ``fn`` until it succeeds, fails for good or runs out of attempts or time.
+
+        Args:
+            fn: The call to make
+            operation: Name the call is counted under in ``metrics``
+            deadline: Seconds this call may take, if less than the policy's
+            **fields: Extra attributes for the ``retry.sleep`` spans
+
+        Raises:
+            RetryError: If a retryable error persists, or the deadline passed
+                before an attempt could start
+            Exception: Any error that is not retryable, unchanged
+        """
+        started, delay, attempt = time.monotonic(), self.base_delay, 0
+        limit = self._limit(deadline)
+        while True:
+            self._check_time(operation, attempt, started, limit)
+            attempt += 1
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._after_failure(e, operation, attempt, started, limit, delay)
+                with span("retry.sleep", operation=operation, attempt=attempt, seconds=delay, **fields):
+                    time.sleep(delay)
+                continue
+            metrics.finished(operation, attempt, "ok")
+            return result
+
+    async def call_async(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        operation: str,
+        deadline: Optional[float] = None,
+        **fields: Any
+    ) -> Any:
+        """Asyncio version of ``call``; ``fn`` returns a new awaitable on every call."""
+        started, delay, attempt = time.monotonic(), self.base_delay, 0
+        limit = self._limit(deadline)
+        while True:
+            self._check_time(operation, attempt, started, limit)
+            attempt += 1
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._after_failure(e, operation, attempt, started, limit, delay)
+                with span("retry.sleep", operation=operation, attempt=attempt, seconds=delay, **fields):
+                    await asyncio.sleep(delay)
+                continue
+            metrics.finished(operation, attempt, "ok")
+            return result
+
+    def _limit(self, deadline: Optional[float]) -> float:
+        return self.deadline if deadline is None else min(self.deadline, deadline)
+
+    def _check_time(self, operation: str, attempts: int, started: float, limit: float) -> None:
+        """Refuse to start another attempt once the deadline has passed."""
+        if time.monotonic() - started >= limit:
+            metrics.finished(operation, attempts, "gave_up")
+            raise RetryError(
+                operation, attempts, TimeoutError("deadline passed before the call could start"), out_of_time=True
+            )
+
+    def _after_failure(
+        self,
+        exc: Exception,
+        operation: str,
+        attempt: int,
+        started: float,
+        limit: float,
+        previous: float
+    ) -> float:
+        """Decide what follows a failed attempt: re-raise, give up, or return the wait."""
+        if not self.retryable(exc):
+            metrics.finished(operation, attempt, "failed")
+            raise exc
+        delay = self._plan(exc, attempt, started, limit, previous)
+        if delay is None:
+            metrics.finished(operation, attempt, "gave_up")
+            raise RetryError(operation, attempt, exc, out_of_time=attempt < self.max_attempts) from exc
+        logging.info(f"Retrying '{operation}' in {delay:.1f}s after: {exc}")
+        metrics.waited(operation, delay)
+        return delay
+
+
+# Policy used by drafting, evaluation and release notes
+DEFAULT_RETRY = RetryPolicy()
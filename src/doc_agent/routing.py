@@ -0,0 +1,212 @@
+"""
+Model routing per call type and failure class.
+
+Drafting calls ask the router which model to use instead of hardcoding one:
+
+- first drafts ("draft"), section drafts ("section") and release notes
+  ("release_notes") each have their own route
+- adapting a draft written in another style ("adapt", see
+  run_doc_agent_styles) is a cheap rewrite on a small model
+- fixes are routed by failure class: mechanical failures (trailing period,
+  weasel words, forbidden words, ...) go to "fix:mechanical", which starts on
+  a small model; anything else goes to "fix"
+
+Each route is a ladder of models, smallest first. A run climbs the ladder
+after every ``escalate_after`` fixes in a row, so a text that keeps failing
+is eventually handed to the larger model. Runs are told apart by the id
+``run_scope`` sets for the agent loop, and their escalation state is
+dropped when the run ends; calls made outside a run never escalate. The
+"draft" and "fix" routes already start on the largest model, so their
+ladders have a single rung: only routes that start small, like
+"fix:mechanical", have anywhere to climb. Routes passed to ModelRouter can
+add rungs. A call counts as failed when it raised or when its output came
+back for another fix. Calls, failures and seconds are kept per (route, model) and
+can be saved next to the evaluator statistics to tune the routes from real
+traffic.
+"""
+
+import contextlib
+import contextvars
+import itertools
+import re
+import threading
+import time
+from typing import Any, Dict, Hashable, Iterator, List, NamedTuple, Optional
+
+from doc_agent.store import JsonStore
+
+DEFAULT_ROUTES = {
+    "draft": ["gpt-4"],
+    "fix": ["gpt-4"],
+    "fix:mechanical": ["gpt-4o-mini", "gpt-4"],
+    "adapt": ["gpt-4o-mini"],
+    "section": ["gpt-4o-mini"],
+    "release_notes": ["gpt-4"],
+}  # type: Dict[str, List[str]]
+
+# Fixes in a row on one run before moving one model up the ladder
+ESCALATE_AFTER = 2
+
+# Failure messages a small model fixes as well as a large one
+MECHANICAL_FAILURE = re.compile(
+    r"missing trailing period|weasel word:|acronym detected:|forbidden word:"
+    r"|imperative-mood verb|sentence exceeds \d+ words"
+)
+
+_STATS_KEY = "routes"
+
+_run = contextvars.ContextVar("doc_agent_run", default=None)  # type: contextvars.ContextVar[Optional[int]]
+_run_ids = itertools.count(1)
+
+
+class Route(NamedTuple):
+    """The route a call was sent down and the model chosen for it."""
+    name: str
+    model: str
+
+
+def failure_class(fix: str) -> str:
+    """Return "mechanical" if every line of the fix instructions is a mechanical failure, else "general"."""
+    lines = [line for line in fix.splitlines() if line.strip()]
+    if lines and all(MECHANICAL_FAILURE.search(line) for line in lines):
+        return "mechanical"
+    return "general"
+
+
+class ModelRouter:
+    """Picks models per route and keeps per-route latency and success statistics.
+
+    Args:
+        routes: Route name to model ladder, merged over DEFAULT_ROUTES
+        escalate_after: Consecutive fixes of one run before escalating
+        root: Directory to load the statistics from and save them to
+    """
+
+    def __init__(
+        self,
+        routes: Optional[Dict[str, List[str]]] = None,
+        escalate_after: int = ESCALATE_AFTER,
+        root: Optional[str] = None
+    ):
+        self.routes = dict(DEFAULT_ROUTES, **(routes or {}))
+        self.escalate_after = escalate_after
+        self.store = JsonStore(root) if root else None
+        self.entries = {}  # type: Dict[str, Dict[str, Any]]
+        if self.store is not None:
+            self.entries = self.store.get(_STATS_KEY) or {}
+        self._lock = threading.Lock()
+        self._streaks = {}  # type: Dict[Hashable, int]
+        self._last = {}  # type: Dict[Hashable, Route]
+
+    def route(self, call_type: str, key: Optional[Hashable] = None, fix: Optional[str] = None) -> Route:
+        """Choose the model for one call.
+
+        Args:
+            call_type: "draft", "fix", "adapt", "section" or "release_notes"
+            key: Identifies the run the call belongs to, for escalation
+            fix: The fix instructions, for fixes
+
+        A fix for ``key`` also marks the previous call for ``key`` as failed,
+        since its output did not pass.
+        """
+        name = f"{call_type}:{failure_class(fix)}" if fix else call_type
+        if name not in self.routes:
+            name = call_type
+        ladder = self.routes[name]
+        with self._lock:
+            streak = 0
+            if key is not None:
+                last = self._last.pop(key, None)
+                if fix and last is not None:
+                    self._entry(last)["failures"] += 1
+                streak = self._streaks.get(key, 0) + 1 if fix else 0
+                self._streaks[key] = streak
+        return Route(name, ladder[min(streak // self.escalate_after, len(ladder) - 1)])
+
+    def forget(self, key: Hashable) -> None:
+        """Drop the escalation state of a finished run."""
+        with self._lock:
+            self._streaks.pop(key, None)
+            self._last.pop(key, None)
+
+    @contextlib.contextmanager
+    def call(self, call_type: str, key: Optional[Hashable] = None, fix: Optional[str] = None) -> Iterator[Route]:
+        """Route one call and record its latency, and a failure if it raises."""
+        route = self.route(call_type, key, fix)
+        started = time.perf_counter()
+        try:
+            yield route
+        except BaseException:
+            self._record(route, time.perf_counter() - started, failed=True)
+            raise
+        self._record(route, time.perf_counter() - started, failed=False)
+        if key is not None:
+            with self._lock:
+                self._last[key] = route
+
+    def _entry(self, route: Route) -> Dict[str, Any]:
+        return self.entries.setdefault(f"{route.name}|{route.model}", {"calls": 0, "failures": 0, "seconds": 0.0})
+
+    def _record(self, route: Route, seconds: float, failed: bool) -> None:
+        with self._lock:
+            entry = self._entry(route)
+            entry["calls"] += 1
+            entry["failures"] += 1 if failed else 0
+            entry["seconds"] += seconds
+
+    def success_rate(self, name: str, model: str) -> Optional[float]:
+        """Share of calls on this route and model that did not fail, or None if unseen."""
+        entry = self.entries.get(f"{name}|{model}")
+        if not entry or not entry["calls"]:
+            return None
+        return 1 - min(entry["failures"], entry["calls"]) / entry["calls"]
+
+    def mean_latency(self, name: str, model: str) -> Optional[float]:
+        """Mean seconds per call on this route and model, or None if unseen."""
+        entry = self.entries.get(f"{name}|{model}")
+        if not entry or not entry["calls"]:
+            return None
+        return entry["seconds"] / entry["calls"]
+
+    def save(self) -> None:
+        """Persist the statistics, if a directory was given."""
+        if self.store is not None:
+            with self._lock:
+                snapshot = {name: dict(entry) for name, entry in self.entries.items()}
+            self.store.put(_STATS_KEY, snapshot)
+
+
+_router = ModelRouter()
+
+
+def get_router() -> ModelRouter:
+    """Return the router used by the drafting functions."""
+    return _router
+
+
+def current_run() -> Optional[int]:
+    """Return the id of the run this context belongs to, if any."""
+    return _run.get()
+
+
+@contextlib.contextmanager
+def run_scope() -> Iterator[int]:
+    """Give the calls made in this context their own run id for escalation.
+
+    The router forgets the run's streak when the scope exits.
+    """
+    router = _router
+    run_id = next(_run_ids)
+    token = _run.set(run_id)
+    try:
+        yield run_id
+    finally:
+        _run.reset(token)
+        router.forget(run_id)
+
+
+def set_router(router: ModelRouter) -> ModelRouter:
+    """Install ``router`` for the drafting functions and return the previous one."""
+    global _router
+    previous, _router = _router, router
+    return previous
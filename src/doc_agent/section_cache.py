@@ -0,0 +1,74 @@
+"""
+Cache of drafted documentation sections.
+
+``fill_sections`` looks each section up before drafting it. The key is a
+hash of the source sent to the model (the cleaned function source, or its
+digest for large ones; whitespace collapsed), the section name,
+``SECTION_PROMPT_VERSION``, ``digest.DIGEST_VERSION`` and the model, so
+re-running ``process`` on an unchanged function makes no LLM calls.
+Identical functions in several files (vendored copies) share their drafts,
+and concurrent lookups of the same key are coalesced so such a function is
+drafted once.
+
+Changing a prompt means bumping ``SECTION_PROMPT_VERSION``, and changing
+the digest means bumping ``DIGEST_VERSION``; older drafts are then no
+longer found.
+"""
+
+import threading
+from typing import Dict, Optional
+
+from doc_agent.digest import DIGEST_VERSION
+from doc_agent.store import JsonStore, hash_key
+
+# Default location used by the CLI's process command
+DEFAULT_SECTION_CACHE_DIR = ".doc_agent/sections"
+
+# Bump whenever the section prompts or draft.SECTION_FIELDS change
+SECTION_PROMPT_VERSION = 1
+
+
+def section_key(source: str, section: str, model: str) -> str:
+    """Build the cache key for one section of one function."""
+    return hash_key(
+        "section", SECTION_PROMPT_VERSION, DIGEST_VERSION, " ".join(source.split()), section, model
+    )
+
+
+class SectionCache:
+    """Drafted sections in memory, and on disk if given a directory.
+
+    Args:
+        root: Directory to keep drafts in across runs. Without one, drafts
+            are shared only for as long as the object lives.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.store = JsonStore(root) if root else None
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}  # type: Dict[str, str]
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached draft for ``key``, or None."""
+        with self._lock:
+            text = self._memory.get(key)
+        if text is None and self.store is not None:
+            text = self.store.get(key)
+            if text is not None:
+                with self._lock:
+                    self._memory[key] = text
+        with self._lock:
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Cache a finished draft."""
+        with self._lock:
+            self._memory[key] = text
+        if self.store is not None:
+            self.store.put(key, text)
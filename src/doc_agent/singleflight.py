@@ -0,0 +1,204 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+
+When several workers ask for the same deterministic completion at the same
+time, only the first one (the leader) calls the provider; the others wait
+for its result. Within a process this uses a table of pending calls.
+Across processes it uses a flight table under ``lock_dir``: one small state
+file per request key, guarded by a short-held lock, records that a call is
+running and how many processes wait on it. The leader holds a run lock for
+the key while calling; waiters block on a shared lock of it, read the result
+and check out. The last one out deletes the state, so a result is never
+handed to a call that starts after the flight has ended.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+from collections import Counter
+from typing import IO, Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from doc_agent.store import JsonStore, hash_key
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+def request_key(**request: Any) -> str:
+    """Build a coalescing key from the request parameters."""
+    return hash_key(request)
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None  # type: Any
+        self.error = None  # type: Optional[BaseException]
+
+
+class _AsyncCall:
+    def __init__(self, task: "asyncio.Future[Any]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key.
+
+    Args:
+        lock_dir: Optional directory for the cross-process flight table
+
+    Attributes:
+        stats: Counter with ``calls`` (provider calls made), ``coalesced``
+            (calls saved within this process) and ``shared`` (calls saved
+            by reading another process's result)
+    """
+
+    def __init__(self, lock_dir: Optional[str] = None):
+        self.lock_dir = lock_dir
+        self.stats = Counter()  # type: Counter[str]
+        self._lock = threading.Lock()
+        self._calls = {}  # type: Dict[str, _Call]
+        self._async_calls = {}  # type: Dict[Any, _AsyncCall]
+
+    @property
+    def saved(self) -> int:
+        """Number of provider calls avoided so far."""
+        return self.stats["coalesced"] + self.stats["shared"]
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` once per concurrent ``key`` and return its result to every caller.
+
+        Results must be JSON-serializable when a ``lock_dir`` is configured.
+        Errors raised by the leader are re-raised in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            logging.debug(f"Coalesced request {key[:12]}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, fn)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Asyncio version of ``do``, coalescing within the running event loop.
+
+        The shared call runs as its own task. It is cancelled, together with
+        its in-flight provider request, only once every caller waiting on it
+        has been cancelled. The cross-process flight table is not used here,
+        since waiting on a file lock would block the event loop.
+        """
+        loop_key = (id(asyncio.get_running_loop()), key)
+        call = self._async_calls.get(loop_key)
+        if call is None:
+            self.stats["calls"] += 1
+            call = self._async_calls[loop_key] = _AsyncCall(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _: self._async_calls.pop(loop_key, None))
+        else:
+            self.stats["coalesced"] += 1
+            logging.debug(f"Coalesced request {key[:12]}")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _run(self, key: str, fn: Callable[[], Any]) -> Any:
+        if not self.lock_dir or fcntl is None:
+            self.stats["calls"] += 1
+            return fn()
+
+        store = JsonStore(self.lock_dir)
+        store.root.mkdir(parents=True, exist_ok=True)
+        with store.path_for(key, ".lock").open("a") as table, store.path_for(key, ".run").open("a") as run:
+            with _flock(table, fcntl.LOCK_EX):
+                state = store.get(key)
+                if state is None:
+                    # No flight for this key: lead one, taking the run lock before
+                    # anyone can register as a waiter
+                    store.put(key, {"done": False, "waiters": 0})
+                    fcntl.flock(run.fileno(), fcntl.LOCK_EX)
+                elif not state["done"]:
+                    state["waiters"] += 1
+                    store.put(key, state)
+            if state is None:
+                return self._lead(store, key, fn, table, run)
+            if state["done"]:
+                # A flight just ended and its waiters are still reading; its
+                # result is not for calls that arrive afterwards
+                self.stats["calls"] += 1
+                return fn()
+            return self._wait(store, key, fn, table, run)
+
+    def _lead(self, store: JsonStore, key: str, fn: Callable[[], Any], table: IO[str], run: IO[str]) -> Any:
+        self.stats["calls"] += 1
+        outcome = {"done": True}  # type: Dict[str, Any]
+        try:
+            outcome["result"] = fn()
+            return outcome["result"]
+        finally:
+            with _flock(table, fcntl.LOCK_EX):
+                state = store.get(key) or {"waiters": 0}
+                if state["waiters"]:
+                    store.put(key, dict(state, **outcome))
+                else:
+                    store.delete(key)
+                fcntl.flock(run.fileno(), fcntl.LOCK_UN)
+
+    def _wait(self, store: JsonStore, key: str, fn: Callable[[], Any], table: IO[str], run: IO[str]) -> Any:
+        logging.debug(f"Waiting on another process for {key[:12]}")
+        with _flock(run, fcntl.LOCK_SH):
+            pass
+        with _flock(table, fcntl.LOCK_EX):
+            state = store.get(key) or {"waiters": 1}
+            state["waiters"] -= 1
+            if state["waiters"] > 0:
+                store.put(key, state)
+            else:
+                store.delete(key)
+        if "result" in state:
+            self.stats["shared"] += 1
+            return state["result"]
+        # The leader failed or died; errors do not cross processes, so call here
+        self.stats["calls"] += 1
+        return fn()
+
+
+@contextlib.contextmanager
+def _flock(f: IO[str], operation: int) -> Iterator[None]:
+    fcntl.flock(f.fileno(), operation)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# Process-wide instance used in front of the provider calls.
+# Set DOC_AGENT_SINGLEFLIGHT_DIR to coalesce across processes as well.
+flight = SingleFlight(lock_dir=os.getenv("DOC_AGENT_SINGLEFLIGHT_DIR"))
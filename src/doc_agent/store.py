@@ -0,0 +1,73 @@
+"""
+Small file-backed key/value store shared by the caching layers.
+
+Each key is stored as one JSON file under ``root``. Writes go through a
+temporary file and ``os.replace`` so concurrent readers never see a
+half-written value.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+
+def hash_key(*parts: Any) -> str:
+    """Return a stable hex digest for the given JSON-serializable parts."""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class JsonStore:
+    """A directory of ``<key>.json`` files.
+
+    Args:
+        root: Directory holding the entries (created on first write)
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path_for(self, key: str, suffix: str = ".json") -> Path:
+        """Return the on-disk path for ``key``."""
+        return self.root / f"{key}{suffix}"
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """Return the stored value, or None if missing, unreadable or older than max_age seconds."""
+        path = self.path_for(key)
+        try:
+            if max_age is not None and time.time() - path.stat().st_mtime > max_age:
+                return None
+            with path.open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Atomically write ``value`` under ``key``."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.root), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp, self.path_for(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def delete(self, key: str) -> None:
+        """Remove ``key`` if present."""
+        try:
+            self.path_for(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def keys(self) -> Iterator[str]:
+        """Iterate over stored keys."""
+        if not self.root.exists():
+            return iter(())
+        return (p.stem for p in sorted(self.root.glob("*.json")))
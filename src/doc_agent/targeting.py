@@ -0,0 +1,147 @@
+"""
+Targeted fix prompts.
+
+For long texts a fix request does not need the whole previous version:
+evaluators that can locate their failures report (start, end) offsets
+(``EvalResult.spans``). ``fix_windows`` turns those into the failing
+sentences plus a few sentences of context on either side; only the failing
+sentences are rewritten and ``splice`` puts them back into the text.
+
+When the failing sentences make up most of the text there is nothing to
+save, and ``fix_windows`` returns None so the caller rewrites it all.
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+# Sentences of unchanged context sent on either side of the failing ones
+CONTEXT_SENTENCES = 1
+
+# Rewrite the whole text once the failing sentences exceed this fraction of it
+MAX_TARGET_FRACTION = 0.5
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+Span = Tuple[int, int]
+
+
+class Window(NamedTuple):
+    """Failing text ``start:end``, with context ``context_start:start`` and ``end:context_end``."""
+    start: int
+    end: int
+    context_start: int
+    context_end: int
+
+
+def sentence_bounds(text: str) -> List[Span]:
+    """Return (start, end) offsets of every sentence; line breaks also end a sentence."""
+    bounds, start = [], 0
+    for m in SENTENCE_BOUNDARY.finditer(text):
+        if m.start() > start:
+            bounds.append((start, m.start()))
+        start = m.end()
+    if start < len(text):
+        bounds.append((start, len(text)))
+    return bounds
+
+
+def fix_windows(
+    text: str,
+    spans: Sequence[Span],
+    context: int = CONTEXT_SENTENCES,
+    max_fraction: float = MAX_TARGET_FRACTION
+) -> Optional[List[Window]]:
+    """Group the sentences touched by ``spans`` into windows to rewrite.
+
+    Failing sentences close enough for their context to overlap share a
+    window, along with the sentences between them.
+
+    Returns:
+        The windows in text order, or None if there is nothing to target
+        or targeting would not save much over a full rewrite
+    """
+    bounds = sentence_bounds(text)
+    if not spans or not bounds or any(not 0 <= start <= end <= len(text) for start, end in spans):
+        return None
+    failing = sorted({
+        i for start, end in spans
+        for i, (s, e) in enumerate(bounds)
+        if start < e and max(end, start + 1) > s
+    })
+    if not failing:
+        return None
+
+    groups = [[failing[0], failing[0]]]
+    for i in failing[1:]:
+        if i - groups[-1][1] <= 2 * context + 1:
+            groups[-1][1] = i
+        else:
+            groups.append([i, i])
+
+    windows = [
+        Window(
+            start=bounds[first][0],
+            end=bounds[last][1],
+            context_start=bounds[max(first - context, 0)][0],
+            context_end=bounds[min(last + context, len(bounds) - 1)][1]
+        )
+        for first, last in groups
+    ]
+    if sum(w.end - w.start for w in windows) > max_fraction * len(text):
+        return None
+    return windows
+
+
+def targeted_prompt(style: str, fix: str, text: str, window: Window) -> str:
+    """Build the prompt asking for a rewrite of one window's failing sentences only."""
+    before = text[window.context_start:window.start].strip()
+    after = text[window.end:window.context_end].strip()
+    return (
+        f"You are a technical writer using {style} style.\n"
+        f"Rewrite the passage below by applying these fixes: {fix}\n"
+        "It is an excerpt of a longer text; the context around it stays as it is.\n"
+        "Respond with the rewritten passage only.\n\n"
+        f"Context before:\n{before or '(start of text)'}\n\n"
+        f"Passage:\n{text[window.start:window.end]}\n\n"
+        f"Context after:\n{after or '(end of text)'}\n\n"
+        "Rewritten passage:"
+    )
+
+
+def splice(text: str, windows: Sequence[Window], replacements: Sequence[str]) -> str:
+    """Replace each window's failing text with its rewrite."""
+    out, last = [], 0
+    for window, replacement in zip(windows, replacements):
+        out.append(text[last:window.start])
+        out.append(replacement.strip())
+        last = window.end
+    out.append(text[last:])
+    return "".join(out)
+
+
+def remap_spans(old: str, new: str, spans: Sequence[Span]) -> List[Span]:
+    """Move spans located in ``old`` to the matching offsets in the edited ``new``.
+
+    Used after local fixes, which change the text between evaluation and
+    the fix request.
+    """
+    if old == new:
+        return list(spans)
+    opcodes = SequenceMatcher(None, old, new, autojunk=False).get_opcodes()
+
+    def move(offset: int, is_end: bool) -> int:
+        # An exclusive end moves with the last character it covers
+        point = offset - 1 if is_end else offset
+        for tag, i1, i2, j1, j2 in opcodes:
+            if point < i2:
+                if tag == "equal":
+                    return j1 + point - i1 + is_end
+                return j2 if is_end else j1
+        return len(new)
+
+    moved = []
+    for start, end in spans:
+        new_start = move(start, False)
+        moved.append((new_start, max(new_start, move(end, True))))
+    return moved
@@ -0,0 +1,160 @@
+"""
+Structured span tracing for agent runs.
+
+Tracing is off by default and costs one global lookup per span when off.
+Call ``enable()`` (or pass ``--trace`` on the CLI) to collect spans for the
+run, each iteration, each LLM call, each evaluator and each retry sleep.
+Spans record their duration, parent span and attributes such as token
+counts and cache hits. Collected spans can be exported as JSON lines or in
+Chrome trace-event format (load the file in chrome://tracing or Perfetto).
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Type
+
+_current = contextvars.ContextVar("doc_agent_span", default=None)  # type: contextvars.ContextVar[Optional[Span]]
+_tracer = None  # type: Optional[Tracer]
+
+
+class Span:
+    """One timed operation. Use as a context manager via ``span()``."""
+
+    __slots__ = ("tracer", "name", "span_id", "parent_id", "parent", "start_ns", "end_ns", "thread_id", "attrs")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.span_id = next(tracer._ids)
+        self.parent = _current.get()
+        self.parent_id = self.parent.span_id if self.parent is not None else None
+        self.start_ns = 0
+        self.end_ns = 0
+        self.thread_id = threading.get_ident()
+        self.attrs = attrs
+
+    def set(self, **attrs: Any) -> None:
+        """Add attributes to the span."""
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.perf_counter_ns()
+        _current.set(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType]
+    ) -> None:
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        # Restore the parent explicitly rather than with a context token, so a
+        # span may be closed from a different context than it was opened in
+        _current.set(self.parent)
+        self.tracer._record(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_us": (self.start_ns - self.tracer.origin_ns) / 1000,
+            "duration_us": (self.end_ns - self.start_ns) / 1000,
+            "thread_id": self.thread_id,
+            "attrs": self.attrs,
+        }
+
+
+class _NullSpan:
+    """Shared no-op span returned while tracing is off."""
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType]
+    ) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Collects finished spans in memory."""
+
+    def __init__(self) -> None:
+        self.spans = []  # type: List[Span]
+        self.origin_ns = time.perf_counter_ns()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _record(self, finished: Span) -> None:
+        with self._lock:
+            self.spans.append(finished)
+
+    def to_jsonl(self, path: str) -> None:
+        """Write one JSON object per span."""
+        with open(path, "w", encoding="utf-8") as f:
+            for s in self.spans:
+                f.write(json.dumps(s.to_dict(), default=str) + "\n")
+
+    def to_chrome_trace(self, path: str) -> None:
+        """Write spans as Chrome trace-event "complete" (ph=X) events."""
+        events = []
+        for s in self.spans:
+            d = s.to_dict()
+            events.append({
+                "name": s.name,
+                "ph": "X",
+                "ts": d["start_us"],
+                "dur": d["duration_us"],
+                "pid": os.getpid(),
+                "tid": s.thread_id,
+                "args": dict(s.attrs, span_id=s.span_id, parent_id=s.parent_id),
+            })
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events}, f, default=str)
+
+
+def enable() -> Tracer:
+    """Start collecting spans and return the tracer holding them."""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """Stop collecting spans and return the tracer that was active."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def span(name: str, **attrs: Any) -> Any:
+    """Return a context manager timing ``name``; a shared no-op while tracing is off."""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return Span(tracer, name, attrs)
+
+
+def current_span() -> Any:
+    """Return the innermost open span (a no-op span if none or tracing is off)."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _current.get() or _NULL_SPAN
@@ -1,4 +1,4 @@
-from doc_agent.linters.short_description import lint
+from doc_agent.linters.short_description import check, lint
 
 def test_happy_path():
     txt = "Returns an OAuth token for the current user."
@@ -9,3 +9,7 @@ def test_multi_line_fails():
     rep = lint(txt)
     assert rep["status"] == "FAIL"
     assert "one physical line" in rep["errors"]
+
+def test_quotes_are_reported_only_when_present():
+    assert "wrapped in quotation marks" in check('"Save the file."')
+    assert "wrapped in quotation marks" not in check("")
@@ -1,5 +1,5 @@
 import pytest
-from doc_agent.agent import run_agent
+from doc_agent.agent import BASE_STYLE, run_agent, run_doc_agent_many, run_doc_agent_styles
 
 def test_agent_pass_path():
     """Test the agent loop with all evaluators passing."""
@@ -53,10 +53,10 @@ def test_agent_fail_path():
         print(f"stub_evaluator2 returning: {result}")
         return result
     
-    # Stub LLM that just returns the scenario with a suffix
+    # Stub LLM that returns the scenario, with a suffix once a fix is requested
     def stub_llm(scenario: str, **kwargs) -> str:
         print("\nstub_llm called")
-        result = f"{scenario} (fixed)"
+        result = f"{scenario} (fixed)" if kwargs.get("fix") else scenario
         print(f"stub_llm returning: {result}")
         return result
     
@@ -109,4 +109,116 @@ def test_agent_max_iterations():
     assert result["final_status"] == "failure"
     assert result["iterations"] == 2
     assert len(result["reports"]) == 1
-    assert result["reports"][0][1] == "Always fails"  # Check error message 
\ No newline at end of file
+    assert result["reports"][0][1] == "Always fails"  # Check error message
+
+
+def test_agent_does_not_reevaluate_unchanged_text():
+    """When the LLM returns the same text, evaluators are not called again."""
+    calls = {"n": 0}
+
+    def stub_evaluator(text: str) -> dict:
+        calls["n"] += 1
+        return {"status": "FAIL", "error": "Still wrong"}
+
+    def stub_llm(scenario: str, **kwargs) -> str:
+        return scenario
+
+    result = run_agent(
+        scenario="Test scenario",
+        style="Test style",
+        evaluators=[stub_evaluator],
+        llm=stub_llm,
+        max_iters=2
+    )
+
+    assert result["iterations"] == 2
+    assert calls["n"] == 1
+
+def test_run_doc_agent_many_reports_each_item():
+    """The batch API yields every item with its index, and a failure does not abort the batch."""
+    def stub_llm(scenario: str, **kwargs) -> str:
+        if scenario == "boom":
+            raise RuntimeError("provider error")
+        return scenario
+
+    items = [
+        ("first", "Brief"),
+        ("boom", "Brief"),
+        ("third", "Brief", {"max_iters": 1}),
+    ]
+    results = sorted(
+        run_doc_agent_many(items, max_concurrency=2, no_eval=True, llm=stub_llm),
+        key=lambda r: r["index"]
+    )
+
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert results[0]["result"]["text"] == "first"
+    assert results[1]["result"] is None
+    assert results[1]["error"] == "provider error"
+    assert results[2]["result"]["final_status"] == "success"
+    assert all(r["elapsed_s"] >= 0 for r in results)
+
+def test_agent_best_of_n_screens_candidates():
+    """Only the candidate with the fewest static failures reaches the other evaluators."""
+    seen = []
+
+    def static_eval(text: str) -> dict:
+        return {"status": "FAIL", "error": "too long"} if "long" in text else {"status": "PASS"}
+    static_eval.evaluator_id = "static-length"
+    static_eval.deterministic = True
+
+    def ai_eval(text: str) -> dict:
+        seen.append(text)
+        return {"status": "PASS"}
+
+    def stub_llm(scenario: str, n: int = 1, **kwargs):
+        assert n == 3
+        return ["a long draft", "short draft", "another long draft"]
+
+    result = run_agent(
+        scenario="Test scenario",
+        style="Test style",
+        evaluators=[static_eval, ai_eval],
+        llm=stub_llm,
+        candidates=3
+    )
+
+    assert result["final_status"] == "success"
+    assert result["text"] == "short draft"
+    assert seen == ["short draft"]
+
+def test_styles_fan_out_in_order():
+    """Every style gets its own run, reported in the order the styles were given."""
+    def stub_llm(scenario: str, style: str, **kwargs) -> str:
+        return f"{scenario} as {style}"
+
+    results = run_doc_agent_styles("Card declined", ["toast", "inline error", "email"], no_eval=True, llm=stub_llm)
+
+    assert list(results) == ["toast", "inline error", "email"]
+    assert results["email"]["result"]["text"] == "Card declined as email"
+
+def test_styles_adapt_one_shared_base_draft():
+    """With shared_base, one cold draft is made and each style adapts it."""
+    calls = []
+
+    def stub_llm(scenario: str, style: str, previous: str = None, fix: str = None, adapt: bool = False) -> str:
+        calls.append((style, previous, adapt))
+        return f"{previous} -> {style}" if previous else "base"
+
+    results = run_doc_agent_styles("Card declined", ["toast", "email"], shared_base=True, no_eval=True, llm=stub_llm)
+
+    assert calls[0] == (BASE_STYLE, None, False)
+    assert sorted(calls[1:]) == [("email", "base", True), ("toast", "base", True)]
+    assert results["toast"]["result"]["text"] == "base -> toast"
+
+def test_failed_shared_base_falls_back_to_cold_drafts():
+    """If the base draft raises, every style is still drafted instead of the batch aborting."""
+    def stub_llm(scenario: str, style: str, previous: str = None, **kwargs) -> str:
+        if style == BASE_STYLE:
+            raise RuntimeError("provider down")
+        return f"{scenario} as {style}"
+
+    results = run_doc_agent_styles("Card declined", ["toast", "email"], shared_base=True, no_eval=True, llm=stub_llm)
+
+    assert results["email"]["error"] is None
+    assert results["email"]["result"]["text"] == "Card declined as email"
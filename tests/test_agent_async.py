@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from doc_agent.agent import run_agent, run_agent_async
+from doc_agent.evaluators.types import EvalResult
+
+
+def test_async_agent_matches_sync_result():
+    """The async loop returns the same result dict as run_agent."""
+    def sync_eval(text: str) -> dict:
+        return {"status": "PASS"} if "(fixed)" in text else {"status": "FAIL", "error": "Needs fix"}
+
+    async def async_eval_impl(text: str) -> EvalResult:
+        return EvalResult(name="async_eval", status="PASS")
+
+    def async_eval(text: str) -> EvalResult:
+        return EvalResult(name="async_eval", status="PASS")
+    async_eval.run_async = async_eval_impl
+
+    def stub_llm(scenario: str, **kwargs) -> str:
+        return f"{scenario} (fixed)" if kwargs.get("fix") else scenario
+
+    async def stub_llm_async(scenario: str, **kwargs) -> str:
+        return stub_llm(scenario, **kwargs)
+
+    expected = run_agent("Test scenario", "Test style", [sync_eval, async_eval], stub_llm)
+    result = asyncio.run(
+        run_agent_async("Test scenario", "Test style", [sync_eval, async_eval], stub_llm_async)
+    )
+
+    assert result == expected
+    assert result["final_status"] == "success"
+    assert result["iterations"] == 2
+
+
+def test_async_agent_cancellation_reaches_llm_call():
+    """Cancelling the agent task cancels the in-flight LLM request."""
+    seen = {"cancelled": False}
+
+    async def hanging_llm(scenario: str, **kwargs) -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            seen["cancelled"] = True
+            raise
+        return scenario
+
+    async def main():
+        task = asyncio.ensure_future(run_agent_async("s", "style", [], hanging_llm))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert seen["cancelled"]
+
+
+def test_many_async_runs_share_one_loop():
+    """Many agent runs can run concurrently on a single event loop."""
+    async def slow_llm(scenario: str, **kwargs) -> str:
+        await asyncio.sleep(0.05)
+        return scenario
+
+    async def main():
+        return await asyncio.gather(*(
+            run_agent_async(f"scenario {i}", "style", [], slow_llm) for i in range(200)
+        ))
+
+    results = asyncio.run(main())
+    assert len(results) == 200
+    assert all(r["final_status"] == "success" for r in results)
@@ -0,0 +1,88 @@
+from doc_agent.agent import run_agent
+from doc_agent.autofix import apply_fixes, fix_failures
+
+
+def test_mechanical_messages_are_fixed_locally():
+    """Quotes, forbidden words, weasel words and the trailing period are fixed without the LLM."""
+    fixed, remaining = apply_fixes(
+        '"Please enter a very valid email"',
+        ["wrapped in quotation marks", "forbidden word: please", "weasel word: very", "missing trailing period"]
+    )
+    assert fixed == "Enter a valid email."
+    assert remaining == []
+
+
+def test_quotes_are_kept_unless_a_message_is_about_them():
+    """Other messages leave quotes alone, and a missing imperative verb goes to the LLM."""
+    fixed, remaining = apply_fixes('"Enter a valid email"', ["missing trailing period"])
+    assert fixed == '"Enter a valid email".'
+
+    fixed, remaining = apply_fixes('"Entering an email"', ["should start with an imperative-mood verb"])
+    assert fixed == '"Entering an email"'
+    assert remaining == ["should start with an imperative-mood verb"]
+
+
+def test_quotes_are_stripped_before_the_period_is_checked():
+    """Unquoting runs first, whatever order the linter reported the messages in."""
+    messages = ["missing trailing period", "wrapped in quotation marks"]
+    assert apply_fixes('"Save the file"', messages) == ("Save the file.", [])
+    assert apply_fixes('"Save the file."', messages) == ("Save the file.", [])
+
+
+def test_text_ending_a_sentence_gets_no_extra_period():
+    for text in ("Save it now!", "Save it now?", 'He said "save it."', "Save it (now)."):
+        assert apply_fixes(text, ["missing trailing period"]) == (text, ["missing trailing period"])
+
+
+def test_forbidden_words_are_swapped_only_standing_alone():
+    """Hyphenated compounds are left alone; listed variants use their own synonym."""
+    fixed, remaining = apply_fixes("Please-Wait while we save.", ["forbidden word: please"])
+    assert fixed == "Please-Wait while we save."
+    assert remaining == ["forbidden word: please"]
+
+    fixed, remaining = apply_fixes("Streamlining the setup.", ["forbidden word: streamlining"])
+    assert fixed == "Simplifying the setup."
+    assert remaining == []
+
+def test_acronyms_expand_and_unknown_ones_remain():
+    """Known acronyms are expanded everywhere; unknown ones are left for the LLM."""
+    fixed, remaining = apply_fixes(
+        "Call the API, then the XYZ.",
+        ["acronym detected: API", "acronym detected: XYZ"]
+    )
+    assert fixed == "Call the Application Programming Interface, then the XYZ."
+    assert remaining == ["acronym detected: XYZ"]
+
+
+def test_fix_failures_keeps_only_unfixed_lines():
+    """Multi-line evaluator errors are reduced to the lines that still need a rewrite."""
+    fixed, left = fix_failures(
+        "Enter a really valid email.",
+        [("heuristics", "weasel word: really\nsentence exceeds 20 words"), ("clarity", "Too vague.")]
+    )
+    assert fixed == "Enter a valid email."
+    assert left == [("heuristics", "sentence exceeds 20 words"), ("clarity", "Too vague.")]
+
+
+def test_agent_skips_llm_when_everything_was_fixed_locally():
+    """A run whose only failures are mechanical makes no fix calls and reports the saving."""
+    calls = []
+
+    def stub_llm(scenario: str, **kwargs) -> str:
+        calls.append(kwargs)
+        return "Enter a very valid email"
+
+    def heuristics(text: str) -> dict:
+        errors = []
+        if "very" in text:
+            errors.append("weasel word: very")
+        if not text.endswith("."):
+            errors.append("missing trailing period")
+        return {"status": "FAIL", "error": "\n".join(errors)} if errors else {"status": "PASS"}
+
+    result = run_agent(scenario="s", style="style", evaluators=[heuristics], llm=stub_llm)
+
+    assert result["final_status"] == "success"
+    assert result["text"] == "Enter a valid email."
+    assert len(calls) == 1
+    assert result["llm_calls_saved"] == 1
@@ -0,0 +1,132 @@
+from doc_agent import budget as budget_module
+from doc_agent.agent import _final_reports, run_agent
+from doc_agent.budget import Budget, metering, record_tokens, request_timeout
+from doc_agent.retry import RetryError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_budget_reports_why_it_is_spent():
+    """Deadline and token limits are reported separately; no limits never expire."""
+    clock = FakeClock()
+    budget = Budget(deadline_s=10, token_budget=100, clock=clock)
+    assert budget.exhausted() is None
+    assert not budget.short_on_time()
+
+    clock.now = 8
+    assert budget.short_on_time()
+    budget.add_tokens(150)
+    assert budget.exhausted().startswith("token budget")
+
+    clock.now = 11
+    assert budget.exhausted().startswith("deadline")
+    assert Budget().exhausted() is None
+
+
+def test_token_budget_stops_before_next_llm_call():
+    """Once the budget is spent the loop returns the best text with final_status 'deadline'."""
+    calls = []
+
+    def stub_llm(scenario: str, **kwargs) -> str:
+        calls.append(kwargs)
+        record_tokens(60)
+        return f"draft {len(calls)}"
+
+    def always_fails(text: str) -> dict:
+        return {"status": "FAIL", "error": f"Clarity: unclear '{text}'"}
+    always_fails.deterministic, always_fails.evaluator_id = True, "test_budget:always_fails"
+
+    result = run_agent(
+        scenario="s",
+        style="style",
+        evaluators=[always_fails],
+        llm=stub_llm,
+        max_iters=10,
+        token_budget=100
+    )
+
+    assert result["final_status"] == "deadline"
+    assert result["reason"].startswith("token budget")
+    assert result["tokens_used"] == 120
+    assert len(calls) == 2
+    assert result["text"] == "draft 1"
+    assert result["last_text"] == "draft 2"
+
+
+def test_deadline_skips_optional_evaluators(monkeypatch):
+    """When time is short only deterministic evaluators run."""
+    monkeypatch.setattr(budget_module, "LOW_TIME_FRACTION", 1.0)
+    ai_calls = []
+
+    def ai_eval(text: str) -> dict:
+        ai_calls.append(text)
+        return {"status": "PASS"}
+
+    def static_eval(text: str) -> dict:
+        return {"status": "PASS"}
+    static_eval.deterministic, static_eval.evaluator_id = True, "test_budget:static_eval"
+
+    result = run_agent(
+        scenario="s",
+        style="style",
+        evaluators=[static_eval, ai_eval],
+        llm=lambda scenario, **kwargs: scenario,
+        deadline_s=60
+    )
+
+    assert result["final_status"] == "deadline"
+    assert result["text"] == "s"
+    assert [r["evaluator"] for r in result["final_reports"]] == ["static_eval"]
+    assert ai_calls == []
+
+
+def test_request_timeout_is_cut_to_the_time_left():
+    clock = FakeClock()
+    with metering(Budget(deadline_s=2, clock=clock)):
+        assert request_timeout(15) == 2
+        assert request_timeout(None) == 2
+        clock.now = 5
+        assert request_timeout(15) == budget_module.MIN_REQUEST_TIMEOUT
+    assert request_timeout(15) == 15
+
+
+def test_provider_giving_up_at_the_deadline_ends_the_run():
+    """A retry cut short by the deadline returns the best text instead of raising."""
+    calls = []
+
+    def stub_llm(scenario: str, **kwargs) -> str:
+        calls.append(kwargs)
+        if len(calls) > 1:
+            raise RetryError("draft", 1, TimeoutError("timed out"), out_of_time=True)
+        return "draft 1"
+
+    def always_fails(text: str) -> dict:
+        return {"status": "FAIL", "error": f"Clarity: unclear '{text}'"}
+    always_fails.deterministic, always_fails.evaluator_id = True, "test_budget:always_fails"
+
+    result = run_agent(
+        scenario="s",
+        style="style",
+        evaluators=[always_fails],
+        llm=stub_llm,
+        max_iters=5,
+        deadline_s=60
+    )
+
+    assert result["final_status"] == "deadline"
+    assert result["text"] == "draft 1"
+
+
+def test_final_report_skips_ai_evaluators_once_the_budget_is_spent():
+    """Stop paths still report, but only with the deterministic evaluators once the budget is gone."""
+    budget = Budget(token_budget=100)
+    assert not next(_final_reports("text", budget)).required_only
+
+    budget.add_tokens(150)
+    assert next(_final_reports("text", budget)).required_only
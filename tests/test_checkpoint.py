@@ -0,0 +1,106 @@
+import pytest
+
+from doc_agent import agent
+from doc_agent.agent import run_agent, run_doc_agent
+from doc_agent.checkpoint import CheckpointStore, item_key
+from doc_agent import pipeline
+
+
+def test_store_tracks_running_and_done_items(tmp_path):
+    """A record moves from running (with state) to done (with result)."""
+    store = CheckpointStore(str(tmp_path))
+    key = item_key("agent", scenario="s", style="x")
+
+    assert store.state(key) is None
+    store.save_state(key, {"text": "draft", "iterations": 1})
+    assert store.state(key) == {"text": "draft", "iterations": 1}
+    assert store.completed(key) is None
+
+    store.save_result(key, {"final_status": "success"})
+    assert store.completed(key) == {"final_status": "success"}
+    assert store.state(key) is None
+
+
+def test_agent_resumes_from_last_checkpoint():
+    """A crashed run continues from its saved state without redrafting."""
+    saved = []
+
+    def crashing_llm(scenario: str, **kwargs) -> str:
+        if kwargs.get("fix"):
+            raise RuntimeError("worker died")
+        return "first draft"
+
+    def needs_fix(text: str) -> dict:
+        return {"status": "PASS"} if text == "fixed draft" else {"status": "FAIL", "error": "fix me"}
+
+    with pytest.raises(RuntimeError):
+        run_agent("s", "style", [needs_fix], crashing_llm, on_checkpoint=saved.append)
+    assert saved[-1] == {"text": "first draft", "iterations": 0, "failures": []}
+
+    calls = []
+
+    def resumed_llm(scenario: str, **kwargs) -> str:
+        calls.append(kwargs)
+        return "fixed draft"
+
+    result = run_agent("s", "style", [needs_fix], resumed_llm, resume_state=saved[-1])
+    assert result["final_status"] == "success"
+    assert result["iterations"] == 2
+    assert all(call.get("fix") for call in calls)
+
+
+def test_resume_only_reuses_runs_with_the_same_options(tmp_path, monkeypatch):
+    """A completed run is not returned for a resume that asked for different fix options."""
+    calls = []
+
+    def stub_llm(scenario: str, **kwargs) -> str:
+        calls.append(scenario)
+        return "draft"
+
+    monkeypatch.setattr(agent, "draft_copy_tool", stub_llm)
+    store = CheckpointStore(str(tmp_path))
+
+    run_doc_agent("s", no_eval=True, checkpoint_store=store)
+    run_doc_agent("s", no_eval=True, checkpoint_store=store, resume=True)
+    assert len(calls) == 1
+
+    run_doc_agent("s", no_eval=True, checkpoint_store=store, resume=True, fix_mode="edits")
+    run_doc_agent("s", no_eval=True, checkpoint_store=store, resume=True, fail_fast=1)
+    assert len(calls) == 3
+
+def test_process_document_skips_completed_items(tmp_path, monkeypatch):
+    """With resume, a processed document is returned from the store without rerunning."""
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "add.js"
+    source.write_text("function add(a, b) { return a + b; }")
+    monkeypatch.setattr(pipeline, "fill_sections", lambda outline, src, **kwargs: dict(outline))
+    monkeypatch.setattr(pipeline, "self_lint", lambda drafted: drafted)
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+
+    first = pipeline.process_document(str(source), checkpoint_store=store)
+    assert first["status"] == "success"
+
+    def fail_ingest(path):
+        raise AssertionError("should not re-ingest")
+    monkeypatch.setattr(pipeline, "ingest", fail_ingest)
+
+    second = pipeline.process_document(str(source), checkpoint_store=store, resume=True)
+    assert second == first
+
+
+def test_process_document_retries_fallback_on_resume(tmp_path, monkeypatch):
+    """A document published as its outline after a drafting error is drafted again on resume."""
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "add.js"
+    source.write_text("function add(a, b) { return a + b; }")
+    monkeypatch.setattr(pipeline, "self_lint", lambda drafted: drafted)
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+
+    def flaky(outline, src, **kwargs):
+        raise ConnectionError("temporarily unavailable")
+    monkeypatch.setattr(pipeline, "fill_sections", flaky)
+    assert pipeline.process_document(str(source), checkpoint_store=store)["status"] == "success"
+
+    monkeypatch.setattr(pipeline, "fill_sections", lambda outline, src, **kwargs: dict(outline, purpose="Adds."))
+    resumed = pipeline.process_document(str(source), checkpoint_store=store, resume=True)
+    assert resumed["text"]["purpose"] == "Adds."
@@ -72,6 +72,15 @@ def test_cli_invalid_command():
     )
     assert res.returncode != 0
 
+def test_cli_styles_rejects_single_run_flags():
+    """--styles cannot stream events or use the result store; saying so beats ignoring the flags."""
+    res = run(
+        ["python", "-m", "doc_agent", "generate", "--scenario", "s", "--styles", "toast,email", "--stream", "--reuse-results"],
+        text=True, stdout=PIPE, stderr=PIPE
+    )
+    assert res.returncode == 2
+    assert "--stream, --reuse-results cannot be combined with --styles" in res.stderr
+
 def test_cli_generate_json_output(forbidden_file):
     """Test JSON output format."""
     res = run(
@@ -0,0 +1,103 @@
+from doc_agent.agent import run_agent
+from doc_agent.convergence import ConvergenceTracker, failure_rule, failure_signature
+
+
+def test_failure_rule_normalizes_messages():
+    """Structured messages keep their rule; free text collapses to the evaluator."""
+    assert failure_rule("weasel word: very") == "weasel word"
+    assert failure_rule("sentence exceeds 20 words") == "sentence exceeds # words"
+    assert failure_rule(
+        "The message explains the problem but never tells the user what to do next."
+    ) == "*"
+
+
+def test_signature_ignores_rewording():
+    """Differently worded AI explanations share one signature."""
+    first = failure_signature([("tone", "The tone is a little cold and could be warmer overall, honestly.")])
+    second = failure_signature([("tone", "Language feels distant; a friendlier phrasing would help readers.")])
+    assert first == second
+
+
+def test_tracker_detects_oscillation():
+    """Returning to an earlier text is reported as oscillation."""
+    tracker = ConvergenceTracker(patience=5)
+    sig_a = failure_signature([("heuristics", "weasel word: very")])
+    sig_b = failure_signature([("heuristics", "forbidden word: please")])
+    assert tracker.observe("Enter a very valid email.", sig_a, 0.5) is None
+    assert tracker.observe("Please enter a valid email.", sig_b, 0.5) is None
+    assert tracker.observe("Enter a very valid email.", sig_a, 0.5).startswith("oscillating")
+
+
+def test_tracker_detects_near_identical_oscillation():
+    """A rewrite back to an almost unchanged earlier version also counts."""
+    tracker = ConvergenceTracker(patience=5)
+    sig = failure_signature([("clarity", "Too vague.")])
+    assert tracker.observe("Enter a valid email address so we can send your receipt.", sig, 0.5) is None
+    assert tracker.observe("Add your email and we will send the receipt there.", sig, 0.5) is None
+    assert tracker.observe("Enter a valid email address so we can send your receipt!", sig, 0.5).startswith("oscillating")
+
+def test_tracker_allows_small_progressing_edits():
+    """A long text fixed one word per iteration stays similar to its past versions but is not oscillating."""
+    tracker = ConvergenceTracker(patience=5)
+    sig = failure_signature([("heuristics", "weasel word: very")])
+    sentences = [f"Sentence number {i} explains one more detail of the form." for i in range(40)]
+    for fixed in range(4):
+        text = " ".join(s.replace("one more", "another") if i < fixed else s for i, s in enumerate(sentences))
+        assert tracker.observe(text, sig, 0.5) is None
+
+
+def test_agent_stops_when_stalled_and_returns_best_text():
+    """A stuck loop stops before max_iters and returns the best-scoring text."""
+    drafts = iter(["draft one", "draft two better", "draft three", "draft four", "draft five"])
+
+    def stub_llm(scenario: str, **kwargs) -> str:
+        return next(drafts)
+
+    def always_fails(text: str) -> dict:
+        return {"status": "FAIL", "error": f"Clarity: vague wording in '{text}'"}
+
+    def passes_on_better(text: str) -> dict:
+        if "better" in text:
+            return {"status": "PASS"}
+        return {"status": "FAIL", "error": f"Empathy: add reassurance to '{text}'"}
+
+    result = run_agent(
+        scenario="s",
+        style="style",
+        evaluators=[always_fails, passes_on_better],
+        llm=stub_llm,
+        max_iters=10
+    )
+
+    assert result["final_status"] == "failure"
+    assert result["iterations"] < 10
+    assert result["reason"].startswith("stalled")
+    assert result["text"] == "draft two better"
+    assert result["last_text"] != result["text"]
+
+
+def test_repeated_error_returns_best_text_and_its_report():
+    """Giving up on a repeated error returns the best draft, reported on that draft."""
+    drafts = iter(["draft one better", "draft two", "draft three"])
+
+    def stub_llm(scenario: str, **kwargs) -> str:
+        return next(drafts)
+
+    def always_fails(text: str) -> dict:
+        return {"status": "FAIL", "error": "Clarity: too vague"}
+
+    def passes_on_better(text: str) -> dict:
+        return {"status": "PASS"} if "better" in text else {"status": "FAIL", "error": f"Empathy: cold '{text}'"}
+
+    result = run_agent(
+        scenario="s",
+        style="style",
+        evaluators=[always_fails, passes_on_better],
+        llm=stub_llm,
+        max_iters=10
+    )
+
+    assert result["reason"].startswith("Max retries")
+    assert result["text"] == "draft one better"
+    assert result["last_text"] == "draft three"
+    assert [r["status"] for r in result["final_reports"]] == ["FAIL", "PASS"]
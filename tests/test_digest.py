@@ -0,0 +1,75 @@
+from doc_agent import digest, draft
+from doc_agent.digest import estimate_tokens, source_digest
+from doc_agent.draft import fill_sections
+
+METADATA = {
+    "params": [{"name": "items", "type": "number[]", "description": "Numbers to sort"}],
+    "returns": {"type": "number[]", "description": "The sorted numbers"},
+}
+
+
+def large_source(lines=200):
+    body = "\n".join(f"  const step{i} = normalize(step{i - 1});" for i in range(1, lines))
+    return (
+        "function sortList(items, order) {\n"
+        "  let step0 = items.slice();\n"
+        f"{body}\n"
+        "  if (order === 'desc') {\n"
+        "    return step0.reverse();\n"
+        "  }\n"
+        "  return step0;\n"
+        "}"
+    )
+
+
+def test_small_source_is_sent_whole():
+    source = "function sortList(items) {\n  return items.sort();\n}"
+    assert source_digest(source, METADATA, max_tokens=100) == source
+
+
+def test_large_source_digest_fits_budget():
+    """The digest keeps the signature, JSDoc and the returns, and fits the budget."""
+    source = large_source()
+    text = source_digest(source, METADATA, max_tokens=200)
+
+    assert estimate_tokens(source) > 200
+    assert estimate_tokens(text) <= 200
+    assert "Signature: function sortList(items, order)" in text
+    assert "- items (number[]): Numbers to sort" in text
+    assert "Returns: number[] – The sorted numbers" in text
+    assert "    return step0.reverse();" in text
+    assert "  return step0;" in text
+    assert "..." in text
+
+
+def test_sections_share_one_digest(monkeypatch):
+    """Every section prompt carries the same digest, which is built once."""
+    prompts = []
+
+    def fake_complete(client, messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        return "drafted"
+
+    monkeypatch.setattr(draft, "complete", fake_complete)
+    monkeypatch.setattr(draft, "get_client", lambda: None)
+    digest._digest.cache_clear()
+    source = large_source(lines=300)
+    sections = {"summary": "", "purpose": "", "returns": "", "examples": ""}
+    fill_sections(sections, source, metadata=METADATA, digest_tokens=300)
+
+    expected = source_digest(source, METADATA, max_tokens=300)
+    assert len(prompts) == 4
+    assert all(expected in prompt and source not in prompt for prompt in prompts)
+    assert digest._digest.cache_info().misses == 1
+
+
+def test_digest_header_is_cut_to_fit_the_budget():
+    """With more parameters than the budget holds, the digest still fits and says what was left out."""
+    params = [{"name": f"option{i}", "type": "string", "description": f"Option number {i}"} for i in range(200)]
+    metadata = {"params": params, "returns": METADATA["returns"]}
+    text = source_digest(large_source(), metadata, max_tokens=100)
+
+    assert estimate_tokens(text) <= 100
+    assert text.startswith("Signature: function sortList(items, order)")
+    assert "Returns: number[] – The sorted numbers" in text
+    assert "more)" in text
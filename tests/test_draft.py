@@ -0,0 +1,222 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from doc_agent import draft
+from doc_agent.draft import SectionDraftError, fill_sections
+from doc_agent.routing import ModelRouter, set_router
+from doc_agent.section_cache import SectionCache
+
+SECTIONS = {"title": "sortList", "summary": "", "purpose": "", "returns": "", "examples": ""}
+
+
+@pytest.fixture(autouse=True)
+def no_client(monkeypatch):
+    """Tests fake ``complete``; never build a real provider client."""
+    monkeypatch.setattr(draft, "get_client", lambda: None)
+
+
+def test_sections_are_drafted_concurrently(monkeypatch):
+    """All four drafted sections are in flight at once; static sections pass through."""
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    def fake_complete(client, messages, **kwargs):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return "# Heading\n" + messages[0]["content"].splitlines()[-1]
+
+    monkeypatch.setattr(draft, "complete", fake_complete)
+    filled = fill_sections(SECTIONS, "function sortList() {}")
+
+    assert peak[0] == 4
+    assert filled["title"] == "sortList"
+    assert filled["summary"] == "Summary:"
+
+
+def test_failed_sections_are_each_reported(monkeypatch):
+    """A failing section raises with its name instead of returning partial output."""
+    def fake_complete(client, messages, **kwargs):
+        if "Examples:" in messages[0]["content"] or "Purpose:" in messages[0]["content"]:
+            raise ValueError("bad request")
+        return "ok"
+
+    monkeypatch.setattr(draft, "complete", fake_complete)
+    with pytest.raises(SectionDraftError) as excinfo:
+        fill_sections(SECTIONS, "function sortList() {}")
+
+    assert sorted(excinfo.value.failures) == ["examples", "purpose"]
+
+
+def test_sections_passing_their_rules_are_kept(monkeypatch):
+    """A JSDoc-built returns section is kept; a malformed one is drafted."""
+    prompts = []
+
+    def fake_complete(client, messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        return "number[] – The sorted numbers"
+
+    monkeypatch.setattr(draft, "complete", fake_complete)
+    kept = fill_sections(dict(SECTIONS, returns="number[] – The list, sorted"), "function sortList() {}")
+    assert kept["returns"] == "number[] – The list, sorted"
+    assert len(prompts) == 3 and not any("Return value" in prompt for prompt in prompts)
+
+    redrafted = fill_sections(dict(SECTIONS, returns="Returns the sorted list."), "function sortList() {}")
+    assert redrafted["returns"] == "number[] – The sorted numbers"
+    assert len(prompts) == 7
+
+
+def test_unchanged_source_is_not_drafted_again(monkeypatch, tmp_path):
+    """A second run on the same cleaned source reads every section from the cache."""
+    calls = []
+
+    def fake_complete(client, messages, **kwargs):
+        calls.append(kwargs["model"])
+        return "drafted"
+
+    monkeypatch.setattr(draft, "complete", fake_complete)
+    first = fill_sections(SECTIONS, "function sortList() {}", cache=SectionCache(str(tmp_path)))
+    assert len(calls) == 4
+
+    second = fill_sections(SECTIONS, "function  sortList()\n{}", cache=SectionCache(str(tmp_path)))
+    assert second == first
+    assert len(calls) == 4
+
+    fill_sections(SECTIONS, "function sortList(a) {}", cache=SectionCache(str(tmp_path)))
+    assert len(calls) == 8
+
+    previous = set_router(ModelRouter(routes={"section": ["gpt-4"]}))
+    try:
+        fill_sections(SECTIONS, "function sortList() {}", cache=SectionCache(str(tmp_path)))
+    finally:
+        set_router(previous)
+    assert calls[8:] == ["gpt-4"] * 4
+
+
+def test_identical_sources_share_one_draft(monkeypatch):
+    """Concurrent runs over the same function make one call per section."""
+    calls = []
+
+    def fake_complete(client, messages, **kwargs):
+        calls.append(messages[0]["content"])
+        time.sleep(0.05)
+        return "drafted"
+
+    monkeypatch.setattr(draft, "complete", fake_complete)
+    cache = SectionCache()
+    threads = [
+        threading.Thread(target=fill_sections, args=(SECTIONS, "function sortList() {}"), kwargs={"cache": cache})
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 4
+
+
+def test_single_request_redrafts_only_rule_breakers(monkeypatch):
+    """One JSON-mode call drafts every section; a summary breaking its rule is re-drafted alone."""
+    prompts, formats = [], []
+
+    def fake_complete(client, messages, **kwargs):
+        prompt = messages[0]["content"]
+        prompts.append(prompt)
+        formats.append(kwargs.get("response_format"))
+        if "JSON object" in prompt:
+            return json.dumps({
+                "summary": "This function sorts a list of numbers in place and returns it to the caller.",
+                "purpose": "Use it to order values before display.",
+                "returns": "Array – the sorted list",
+                "examples": "Sort numbers:\n```js\nsortList([2, 1]);\n```",
+            })
+        return "Sort a list."
+
+    monkeypatch.setattr(draft, "complete", fake_complete)
+    filled = fill_sections(SECTIONS, "function sortList() {}", single_request=True)
+
+    assert len(prompts) == 2 and prompts[1].endswith("Summary:")
+    assert formats == [{"type": "json_object"}, None]
+    assert filled["summary"] == "Sort a list."
+    assert filled["returns"] == "Array – the sorted list"
+
+
+class FakeStream:
+    """Streams each reply word by word and remembers whether it was closed early."""
+
+    def __init__(self, text):
+        self.words = [word + " " for word in text.split(" ")]
+        self.sent = 0
+        self.closed = False
+
+    def __iter__(self):
+        for word in self.words:
+            self.sent += 1
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=word))])
+
+    def close(self):
+        self.closed = True
+
+
+def fake_openai(replies, streams):
+    def create(**kwargs):
+        assert kwargs["stream"]
+        streams.append(FakeStream(replies.pop(0)))
+        return streams[-1]
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_streamed_summary_is_stopped_and_reprompted(monkeypatch):
+    """A summary that runs past 72 characters is cut off mid-stream and drafted again."""
+    streams = []
+    long_summary = "Sort the given list of numbers in place " + "and keep going " * 10
+    client = fake_openai([long_summary, "Sort a list."], streams)
+    monkeypatch.setattr(draft, "get_client", lambda: client)
+
+    filled = fill_sections({"summary": ""}, "function sortList() {}", stream=True)
+
+    assert filled["summary"] == "Sort a list."
+    assert streams[0].closed and streams[0].sent < len(streams[0].words)
+
+
+def test_streamed_copy_stops_at_forbidden_word(monkeypatch):
+    """Any streamed draft is re-prompted with the forbidden word that stopped it."""
+    streams = []
+    prompts = []
+    client = fake_openai(["Please enter a valid email and try again.", "Enter a valid email."], streams)
+    create = client.chat.completions.create
+
+    def recording_create(**kwargs):
+        prompts.append(kwargs["messages"][0]["content"])
+        return create(**kwargs)
+
+    client.chat.completions.create = recording_create
+    monkeypatch.setattr(draft, "get_client", lambda: client)
+
+    text = draft.draft_copy_tool("Empty email field", "inline error", stream=True)
+
+    assert text == "Enter a valid email."
+    assert streams[0].sent == 1 and streams[0].closed
+    assert "forbidden word: please" in prompts[1]
+
+
+def test_streamed_sections_use_the_given_forbidden_file(monkeypatch, tmp_path):
+    """A word from a custom forbidden list stops a streamed section, not just the built-in list."""
+    forbidden = tmp_path / "forbidden.txt"
+    forbidden.write_text("shuffle\n")
+    streams = []
+    client = fake_openai(["Shuffle a list into order.", "Sort a list."], streams)
+    monkeypatch.setattr(draft, "get_client", lambda: client)
+
+    filled = fill_sections({"summary": ""}, "function sortList() {}", stream=True, forbidden_file=str(forbidden))
+
+    assert filled["summary"] == "Sort a list."
+    assert streams[0].closed
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from doc_agent import draft
+from doc_agent.edits import EditError, apply_edits, parse_edits
+
+
+def test_edits_are_applied_in_order():
+    """Replace and insert_after edits patch the text without a rewrite."""
+    edits = parse_edits(json.dumps({"edits": [
+        {"op": "replace", "target": "very valid", "text": "valid"},
+        {"op": "insert_after", "target": "email", "text": " address"},
+    ]}))
+    assert apply_edits("Enter a very valid email.", edits) == "Enter a valid email address."
+
+
+def test_ambiguous_or_malformed_edits_are_rejected():
+    """A target that occurs twice, or a response that is not JSON, raises EditError."""
+    with pytest.raises(EditError):
+        apply_edits("Try again. Try again.", [{"op": "replace", "target": "Try", "text": "Retry"}])
+    with pytest.raises(EditError):
+        parse_edits("Enter a valid email.")
+    with pytest.raises(EditError):
+        parse_edits('{"edits": [{"op": "delete", "target": "x", "text": ""}]}')
+
+
+def test_draft_falls_back_to_rewrite(monkeypatch):
+    """An edit response that does not apply is followed by a full-rewrite request."""
+    responses = iter(["not json", "Enter a valid email."])
+    prompts = []
+
+    def fake_complete(client, messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        return next(responses)
+
+    monkeypatch.setattr(draft, "complete", fake_complete)
+    monkeypatch.setattr(draft, "get_client", lambda: None)
+    text = draft.draft_copy_tool("s", "style", previous="Enter a very valid email", fix="weasel word", edits=True)
+
+    assert text == "Enter a valid email."
+    assert '"edits"' in prompts[0] and '"edits"' not in prompts[1]
@@ -0,0 +1,163 @@
+import time
+
+from doc_agent.agent import run_agent
+from doc_agent.evaluators.runner import ResultCache, run_evaluators
+from doc_agent.evaluators.stats import EvaluatorStats
+from doc_agent.evaluators.types import EvalResult
+
+
+def make_evaluator(name, delay, status="PASS"):
+    def _run(text):
+        time.sleep(delay)
+        return EvalResult(name=name, status=status, error="" if status == "PASS" else f"{name} failed")
+    _run.__name__ = name
+    return _run
+
+
+def test_results_keep_evaluator_order():
+    """Reports come back in list order even when later evaluators finish first."""
+    evaluators = [make_evaluator("slow", 0.1), make_evaluator("fast", 0.0)]
+    results = run_evaluators(evaluators, "text", max_workers=2)
+    assert [name for name, _ in results] == ["slow", "fast"]
+
+
+def test_evaluators_run_concurrently():
+    """Latency is close to the slowest evaluator, not the sum."""
+    evaluators = [make_evaluator(f"ev{i}", 0.1) for i in range(4)]
+    start = time.perf_counter()
+    results = run_evaluators(evaluators, "text", max_workers=4)
+    elapsed = time.perf_counter() - start
+    assert len(results) == 4
+    assert elapsed < 0.3
+
+
+def test_fail_fast_cancels_pending_evaluators():
+    """Once enough failures are in, evaluators that have not started are dropped."""
+    calls = []
+
+    def failing(text):
+        calls.append("failing")
+        return {"status": "FAIL", "error": "bad"}
+
+    def later(text):
+        calls.append("later")
+        return {"status": "PASS"}
+
+    results = run_evaluators([failing, later], "text", max_workers=1, fail_fast=1)
+    assert [name for name, _ in results] == ["failing"]
+    assert calls == ["failing"]
+
+
+def test_memo_skips_whitespace_equivalent_text():
+    """A memoized result is reused when only whitespace changed."""
+    calls = {"n": 0}
+
+    def counting(text):
+        calls["n"] += 1
+        return {"status": "PASS"}
+
+    memo = ResultCache()
+    run_evaluators([counting], "Enter your email.", memo=memo)
+    run_evaluators([counting], "Enter  your\nemail. ", memo=memo)
+    assert calls["n"] == 1
+    assert memo.hits == 1
+
+
+def test_deterministic_results_are_shared_across_runs():
+    """Evaluators that declare themselves deterministic hit the process-wide cache."""
+    calls = {"n": 0}
+
+    def static_check(text):
+        calls["n"] += 1
+        return {"status": "PASS"}
+    static_check.evaluator_id = "static-check-test"
+    static_check.deterministic = True
+
+    run_evaluators([static_check], "Shared text for caching.", memo=ResultCache())
+    run_evaluators([static_check], "Shared text for caching.", memo=ResultCache())
+    assert calls["n"] == 1
+
+
+def test_learned_order_runs_likely_failures_first(tmp_path):
+    """Stats persist across runs and put cheap, often-failing evaluators first."""
+    stats = EvaluatorStats(str(tmp_path))
+    for _ in range(5):
+        stats.record("slow_pass", 2.0, passed=True)
+        stats.record("cheap_fail", 0.01, passed=False)
+    stats.save()
+
+    calls = []
+
+    def slow_pass(text):
+        calls.append("slow_pass")
+        return {"status": "PASS"}
+
+    def cheap_fail(text):
+        calls.append("cheap_fail")
+        return {"status": "FAIL", "error": "bad"}
+
+    loaded = EvaluatorStats(str(tmp_path))
+    results = run_evaluators([slow_pass, cheap_fail], "text", max_workers=1, fail_fast=1, stats=loaded)
+
+    assert calls == ["cheap_fail"]
+    assert [name for name, _ in results] == ["cheap_fail"]
+    assert loaded.entries["cheap_fail"]["runs"] == 6
+
+
+
+def test_stats_saves_merge_instead_of_overwriting(tmp_path):
+    """Two runs sharing a stats directory both keep their counts."""
+    first, second = EvaluatorStats(str(tmp_path)), EvaluatorStats(str(tmp_path))
+    first.record("lint", 1.0, passed=False)
+    second.record("lint", 3.0, passed=True)
+    first.save()
+    second.save()
+    second.save()
+
+    entry = EvaluatorStats(str(tmp_path)).entries["lint"]
+    assert entry == {"runs": 2, "failures": 1, "seconds": 4.0}
+    assert second.entries["lint"] == entry
+
+def test_final_report_covers_every_evaluator():
+    """Fail-fast skips evaluators mid-run, but the final report runs them all in list order."""
+    stats = EvaluatorStats()
+    stats.record("cheap_fail", 0.01, passed=False)
+
+    def slow_pass(text):
+        return {"status": "PASS"}
+
+    def cheap_fail(text):
+        return {"status": "FAIL", "error": f"bad {text}"}
+
+    result = run_agent(
+        scenario="s",
+        style="style",
+        evaluators=[slow_pass, cheap_fail],
+        llm=lambda scenario, **kwargs: scenario + "!" if kwargs.get("fix") else scenario,
+        max_iters=2,
+        max_workers=1,
+        fail_fast=1,
+        stats=stats
+    )
+
+    assert [r["evaluator"] for r in result["final_reports"]] == ["slow_pass", "cheap_fail"]
+
+
+def test_located_results_are_not_reused_for_whitespace_variants():
+    """Spans are offsets into the exact text, so only span-free results serve a whitespace variant."""
+    calls = []
+
+    def located(text):
+        calls.append(text)
+        return EvalResult(name="located", status="FAIL", error="bad", spans=[(text.index("b"), len(text))])
+
+    def plain(text):
+        calls.append(text)
+        return EvalResult(name="plain", status="FAIL", error="bad")
+
+    memo = ResultCache()
+    run_evaluators([located, plain], "a  bad", memo=memo)
+    [(_, result), _] = run_evaluators([located, plain], "a bad", memo=memo)
+
+    assert calls == ["a  bad", "a  bad", "a bad"]
+    assert result.spans == [(2, 5)]
@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+from doc_agent.agent import aiter_agent_events, iter_agent_events
+from doc_agent.budget import current_budget, record_tokens
+from doc_agent.events import DraftFinished, Final
+
+
+def stub_llm(scenario: str, **kwargs) -> str:
+    return f"{scenario} (fixed)" if kwargs.get("fix") else scenario
+
+
+def needs_fix(text: str) -> dict:
+    return {"status": "PASS"} if "fixed" in text else {"status": "FAIL", "error": "rewrite"}
+
+
+def test_events_follow_the_loop():
+    """Drafts, evaluator results and fixes are streamed in order, ending with Final."""
+    events = list(iter_agent_events("s", "style", [needs_fix], stub_llm))
+
+    assert [e.event for e in events] == [
+        "draft_started", "draft_finished",
+        "evaluator_result", "fix_requested", "draft_started", "draft_finished",
+        "evaluator_result", "final",
+    ]
+    assert events[3].failures == [("needs_fix", "rewrite")]
+    assert events[5].text == "s (fixed)"
+    assert events[-1].result["final_status"] == "success"
+    assert json.loads(json.dumps(events[2].to_dict()))["event"] == "evaluator_result"
+
+
+def test_abandoning_the_stream_stops_the_run():
+    """Closing the generator after the first draft makes no evaluator calls."""
+    calls = []
+
+    def counting(text: str) -> dict:
+        calls.append(text)
+        return {"status": "PASS"}
+
+    stream = iter_agent_events("s", "style", [counting], stub_llm)
+    for event in stream:
+        if isinstance(event, DraftFinished):
+            break
+    stream.close()
+
+    assert event.text == "s"
+    assert calls == []
+
+
+def test_async_iterator_yields_the_same_events():
+    """aiter_agent_events streams the same events from a coroutine llm."""
+    async def stub_llm_async(scenario: str, **kwargs) -> str:
+        return stub_llm(scenario, **kwargs)
+
+    async def collect():
+        return [e async for e in aiter_agent_events("s", "style", [needs_fix], stub_llm_async)]
+
+    events = asyncio.run(collect())
+    assert isinstance(events[-1], Final)
+    assert [e.event for e in events] == [e.event for e in iter_agent_events("s", "style", [needs_fix], stub_llm)]
+
+
+def test_interleaved_streams_keep_their_own_budgets():
+    """Tokens charged while one stream runs never count against another, nor leak to the caller."""
+    def charging(tokens):
+        def llm(scenario: str, **kwargs) -> str:
+            record_tokens(tokens)
+            return stub_llm(scenario, **kwargs)
+        return llm
+
+    a = iter_agent_events("a", "style", [needs_fix], charging(100))
+    b = iter_agent_events("b", "style", [needs_fix], charging(1), token_budget=50)
+    events = {"a": [], "b": []}
+    pending = {"a": a, "b": b}
+    while pending:
+        for name, stream in list(pending.items()):
+            event = next(stream, None)
+            if event is None:
+                del pending[name]
+            else:
+                events[name].append(event)
+                assert current_budget() is None
+
+    assert events["a"][-1].result["final_status"] == "success"
+    assert events["b"][-1].result["final_status"] == "success"
+    assert events["b"][-1].result["iterations"] == 2
+
+
+def test_interleaved_async_streams_keep_their_own_budgets():
+    async def charging(scenario: str, **kwargs) -> str:
+        record_tokens(100 if scenario == "a" else 1)
+        return stub_llm(scenario, **kwargs)
+
+    async def collect():
+        a = aiter_agent_events("a", "style", [needs_fix], charging)
+        b = aiter_agent_events("b", "style", [needs_fix], charging, token_budget=50)
+        finals = {}
+        while len(finals) < 2:
+            for name, stream in (("a", a), ("b", b)):
+                if name not in finals:
+                    event = await stream.__anext__()
+                    assert current_budget() is None
+                    if isinstance(event, Final):
+                        finals[name] = event.result
+        return finals
+
+    finals = asyncio.run(collect())
+    assert finals["b"]["final_status"] == "success"
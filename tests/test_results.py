@@ -0,0 +1,49 @@
+from doc_agent import agent
+from doc_agent.results import ResultStore
+
+
+def run(store, forbidden_file, scenario="Empty  email field", **kwargs):
+    return agent.run_doc_agent(
+        scenario, no_eval=True, forbidden_file=str(forbidden_file), result_store=store, **kwargs
+    )
+
+
+def test_successful_results_are_reused(tmp_path, monkeypatch):
+    """A repeat run with the same normalized inputs returns the stored result without drafting."""
+    calls = []
+
+    def stub_llm(scenario: str, **kwargs) -> str:
+        calls.append(scenario)
+        return f"Draft {len(calls)}."
+
+    monkeypatch.setattr(agent, "draft_copy_tool", stub_llm)
+    forbidden = tmp_path / "forbidden.txt"
+    forbidden.write_text("please\n")
+    store = ResultStore(str(tmp_path / "results"))
+
+    first = run(store, forbidden)
+    again = run(store, forbidden, scenario=" Empty email   field ")
+    assert again["text"] == first["text"] == "Draft 1."
+    assert again["cached"] and "cached" not in first
+    assert len(calls) == 1
+
+
+def test_changed_forbidden_list_or_refresh_runs_again(tmp_path, monkeypatch):
+    """A new forbidden-list version misses the store, and refresh replaces the entry."""
+    calls = []
+
+    def stub_llm(scenario: str, **kwargs) -> str:
+        calls.append(scenario)
+        return f"Draft {len(calls)}."
+
+    monkeypatch.setattr(agent, "draft_copy_tool", stub_llm)
+    forbidden = tmp_path / "forbidden.txt"
+    forbidden.write_text("please\n")
+    store = ResultStore(str(tmp_path / "results"))
+
+    run(store, forbidden)
+    forbidden.write_text("please\nseamless\n")
+    assert run(store, forbidden)["text"] == "Draft 2."
+    assert run(store, forbidden, refresh=True)["text"] == "Draft 3."
+    assert run(store, forbidden)["text"] == "Draft 3."
+    assert store.clear() == 2
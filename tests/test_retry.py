@@ -0,0 +1,99 @@
+import httpx
+import openai
+import pytest
+
+from doc_agent import retry
+from doc_agent.retry import RetryError, RetryPolicy, is_retryable, retry_after
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def status_error(cls, status, headers=None):
+    return cls("failed", response=httpx.Response(status, headers=headers or {}, request=REQUEST), body=None)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record waits instead of sleeping; the clock moves on by each wait."""
+    waited, clock = [], [0.0]
+
+    def sleep(seconds):
+        waited.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(retry.time, "sleep", sleep)
+    monkeypatch.setattr(retry.time, "monotonic", lambda: clock[0])
+    retry.metrics.reset()
+    return waited
+
+
+def test_only_transient_errors_are_retryable():
+    """Timeouts, rate limits and server errors are retried; client errors and our own bugs are not."""
+    assert is_retryable(openai.APITimeoutError(request=REQUEST))
+    assert is_retryable(openai.APIConnectionError(request=REQUEST))
+    assert is_retryable(status_error(openai.RateLimitError, 429))
+    assert is_retryable(status_error(openai.InternalServerError, 503))
+    assert is_retryable(httpx.ReadTimeout("slow"))
+    assert not is_retryable(status_error(openai.BadRequestError, 400))
+    assert not is_retryable(status_error(openai.AuthenticationError, 401))
+    assert not is_retryable(status_error(openai.RateLimitError, 429, {"x-should-retry": "false"}))
+    assert not is_retryable(ValueError("bad JSON"))
+
+
+def test_retry_after_header_is_read():
+    assert retry_after(status_error(openai.RateLimitError, 429, {"retry-after": "7"})) == 7
+    assert retry_after(status_error(openai.RateLimitError, 429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after(status_error(openai.RateLimitError, 429)) is None
+
+
+def test_rate_limit_waits_as_asked_then_succeeds(sleeps):
+    """A Retry-After header replaces the jittered delay, and the call is counted."""
+    replies = [status_error(openai.RateLimitError, 429, {"retry-after": "3"}), "ok"]
+
+    def call():
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    assert RetryPolicy().call(call, "draft") == "ok"
+    assert sleeps == [3.0]
+    assert retry.metrics.snapshot()["draft"] == {
+        "calls": 1, "attempts": 2, "retries": 1, "gave_up": 0, "failed": 0, "waited": 3.0
+    }
+
+
+def test_non_retryable_error_is_raised_at_once(sleeps):
+    def call():
+        raise status_error(openai.BadRequestError, 400)
+
+    with pytest.raises(openai.BadRequestError):
+        RetryPolicy().call(call, "evaluate")
+    assert sleeps == []
+    assert retry.metrics.snapshot()["evaluate"]["failed"] == 1
+
+
+def test_jitter_and_deadline_bound_the_retries(sleeps):
+    """Delays stay within [base, cap]; a wait that would pass the deadline gives up instead."""
+    policy = RetryPolicy(max_attempts=10, base_delay=1, max_delay=4, deadline=6)
+    assert all(1 <= policy.next_delay(previous) <= 4 for previous in (1, 2, 4) for _ in range(50))
+
+    def call():
+        raise openai.APITimeoutError(request=REQUEST)
+
+    with pytest.raises(RetryError) as excinfo:
+        RetryPolicy(max_attempts=10, base_delay=5, max_delay=5, deadline=12).call(call, "section")
+    assert excinfo.value.attempts == 3
+    assert isinstance(excinfo.value.__cause__, openai.APITimeoutError)
+    assert sleeps == [5, 5]
+    assert retry.metrics.snapshot()["section"]["gave_up"] == 1
+
+
+def test_passed_deadline_stops_before_the_first_attempt(sleeps):
+    """A caller deadline that has already passed gives up without calling."""
+    calls = []
+
+    with pytest.raises(RetryError) as excinfo:
+        RetryPolicy().call(lambda: calls.append(1), "draft", deadline=0)
+    assert calls == []
+    assert excinfo.value.out_of_time
@@ -0,0 +1,100 @@
+import pytest
+
+from doc_agent import draft
+from doc_agent.routing import ModelRouter, failure_class, run_scope, set_router
+
+
+def test_fixes_are_routed_by_failure_class():
+    """Mechanical fixes start on the small model; other fixes and drafts use the large one."""
+    router = ModelRouter()
+    assert failure_class("heuristics: weasel word: very\nmissing trailing period") == "mechanical"
+    assert router.route("fix", fix="clarity: Too vague.") == ("fix", "gpt-4")
+    assert router.route("fix", fix="heuristics: forbidden word: please") == ("fix:mechanical", "gpt-4o-mini")
+    assert router.route("draft").model == "gpt-4"
+
+
+def test_repeated_fixes_escalate():
+    """After escalate_after fixes in a row for one run, the next model up is used."""
+    router = ModelRouter(escalate_after=2)
+    models = [router.route("draft", key="run").model]
+    models += [router.route("fix", key="run", fix="missing trailing period").model for _ in range(3)]
+    assert models == ["gpt-4", "gpt-4o-mini", "gpt-4", "gpt-4"]
+    assert router.route("draft", key="run").model == "gpt-4"
+    assert router.route("fix", key="run", fix="missing trailing period").model == "gpt-4o-mini"
+
+
+
+def test_adaptation_is_cheap_and_outside_escalation(monkeypatch):
+    """An adapted first draft uses the adapt route; the run's first fix neither blames nor escalates past it."""
+    monkeypatch.setattr(draft, "complete", lambda client, messages, model, **kwargs: model)
+    monkeypatch.setattr(draft, "get_client", lambda: None)
+    router = ModelRouter(escalate_after=1)
+    previous = set_router(router)
+    try:
+        adapted = draft.draft_copy_tool("s", "toast", previous="base", fix="Rewrite in toast style", adapt=True)
+        fixed = draft.draft_copy_tool("s", "toast", previous=adapted, fix="clarity: Too vague.")
+    finally:
+        set_router(previous)
+    assert adapted == "gpt-4o-mini"
+    assert fixed == "gpt-4"
+    assert router.success_rate("adapt", "gpt-4o-mini") == 1.0
+
+def test_stats_record_latency_and_failures(tmp_path):
+    """A call whose output comes back for a fix, or that raises, counts as failed."""
+    router = ModelRouter(root=str(tmp_path))
+    with router.call("draft", key="run"):
+        pass
+    with router.call("fix", key="run", fix="clarity: vague"):
+        pass
+    with pytest.raises(RuntimeError):
+        with router.call("fix", key="other", fix="clarity: vague"):
+            raise RuntimeError("provider down")
+    router.save()
+
+    reloaded = ModelRouter(root=str(tmp_path))
+    assert reloaded.success_rate("draft", "gpt-4") == 0.0
+    assert reloaded.success_rate("fix", "gpt-4") == 0.5
+    assert reloaded.mean_latency("fix", "gpt-4") >= 0
+
+
+def test_draft_uses_routed_model(monkeypatch):
+    """draft_copy_tool asks the router instead of hardcoding a model."""
+    models = []
+
+    def fake_complete(client, messages, model, **kwargs):
+        models.append(model)
+        return "Enter a valid email."
+
+    monkeypatch.setattr(draft, "complete", fake_complete)
+    monkeypatch.setattr(draft, "get_client", lambda: None)
+    previous = set_router(ModelRouter(routes={"fix:mechanical": ["small"]}))
+    try:
+        draft.draft_copy_tool("s", "style", previous="Enter a valid email", fix="heuristics: missing trailing period")
+    finally:
+        set_router(previous)
+    assert models == ["small"]
+
+
+def test_runs_escalate_separately_and_are_forgotten(monkeypatch):
+    """Runs of the same scenario keep their own streaks, which are dropped when each run ends."""
+    monkeypatch.setattr(draft, "complete", lambda client, messages, model, **kwargs: model)
+    monkeypatch.setattr(draft, "get_client", lambda: None)
+    router = ModelRouter(routes={"fix": ["small", "large"]}, escalate_after=2)
+    previous = set_router(router)
+
+    def fix() -> str:
+        return draft.draft_copy_tool("s", "style", previous="text", fix="clarity: Too vague.")
+
+    try:
+        with run_scope():
+            models = [fix()]
+            with run_scope():
+                other = fix()
+            models.append(fix())
+        outside = [fix(), fix()]
+    finally:
+        set_router(previous)
+    assert models == ["small", "large"]
+    assert other == "small"
+    assert outside == ["small", "small"]
+    assert router._streaks == {} and router._last == {}
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+
+from doc_agent.singleflight import SingleFlight, request_key
+
+
+def test_concurrent_identical_calls_share_one_result():
+    """Concurrent callers with the same key trigger a single call."""
+    flight = SingleFlight()
+    calls = {"n": 0}
+    started = threading.Event()
+
+    def slow_call():
+        calls["n"] += 1
+        started.set()
+        time.sleep(0.1)
+        return "drafted"
+
+    results = []
+
+    def worker():
+        results.append(flight.do("same", slow_call))
+
+    leader = threading.Thread(target=worker)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=worker) for _ in range(4)]
+    for t in followers:
+        t.start()
+    for t in [leader] + followers:
+        t.join()
+
+    assert calls["n"] == 1
+    assert results == ["drafted"] * 5
+    assert flight.stats["calls"] == 1
+    assert flight.saved == 4
+
+
+def test_leader_error_reaches_waiters():
+    """An error in the leader is raised in every waiting caller."""
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing_call():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("provider down")
+
+    errors = []
+
+    def worker():
+        try:
+            flight.do("k", failing_call)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=worker)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=worker)
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert errors == ["provider down", "provider down"]
+
+
+def test_flight_table_shares_result_across_instances(tmp_path):
+    """A second process (simulated by a second instance) waits for the leader's in-flight call."""
+    first = SingleFlight(lock_dir=str(tmp_path))
+    second = SingleFlight(lock_dir=str(tmp_path))
+    key = request_key(model="m", messages=[{"role": "user", "content": "hi"}], temperature=0)
+    started = threading.Event()
+
+    def slow_call():
+        started.set()
+        time.sleep(0.1)
+        return "hello"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(first.do(key, slow_call)))
+    leader.start()
+    started.wait()
+    assert second.do(key, lambda: "other") == "hello"
+    leader.join()
+
+    assert results == ["hello"]
+    assert second.stats["shared"] == 1
+    assert second.stats["calls"] == 0
+    assert not list(tmp_path.glob("*.json"))
+
+
+def test_finished_flight_is_not_reused(tmp_path):
+    """A call that starts after the leader has finished makes its own request."""
+    first = SingleFlight(lock_dir=str(tmp_path))
+    second = SingleFlight(lock_dir=str(tmp_path))
+
+    assert first.do("k", lambda: "hello") == "hello"
+    assert second.do("k", lambda: "other") == "other"
+    assert second.stats["shared"] == 0
+
+
+def test_async_calls_are_coalesced():
+    """Concurrent coroutines with the same key await a single call."""
+    flight = SingleFlight()
+    calls = {"n": 0}
+
+    async def slow_call():
+        calls["n"] += 1
+        await asyncio.sleep(0.05)
+        return "drafted"
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("k", slow_call) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["drafted"] * 5
+    assert calls["n"] == 1
+    assert flight.stats["coalesced"] == 4
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# The CLI runs from pre-commit hooks, so --help must stay cheap. Wall-clock
+# time depends on the machine, so the budget is only checked on request.
+IMPORT_BUDGET_SECONDS = 2.0
+CHECK_IMPORT_TIME = bool(os.getenv("DOC_AGENT_CHECK_IMPORT_TIME"))
+
+HEAVY_MODULES = ("openai", "httpx", "dotenv", "textstat", "nltk", "git")
+
+SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from doc_agent.__main__ import main
+try:
+    main(["--help"])
+except SystemExit:
+    pass
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _help_run() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def test_help_loads_no_heavy_dependencies():
+    """--help imports none of the provider, git or readability libraries."""
+    assert _help_run()["loaded"] == []
+
+
+@pytest.mark.skipif(not CHECK_IMPORT_TIME, reason="set DOC_AGENT_CHECK_IMPORT_TIME to check")
+def test_help_stays_within_import_budget():
+    """--help finishes within a generous wall-clock budget."""
+    assert _help_run()["seconds"] < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,96 @@
+from doc_agent import draft
+from doc_agent.agent import run_agent
+from doc_agent.evaluators.heuristics import sentence_length_issues
+from doc_agent.evaluators.types import EvalResult
+from doc_agent.targeting import fix_windows, remap_spans, splice
+
+TEXT = "Open settings. Pick a plan. " + "Then click the very long button. " + "Save. Done. Close it. Log out. Rest."
+
+
+def test_windows_cover_failing_sentence_and_context():
+    """A span selects its sentence as the passage and one sentence either side as context."""
+    start = TEXT.index("Then")
+    [window] = fix_windows(TEXT, [(start + 14, start + 18)])
+
+    assert TEXT[window.start:window.end] == "Then click the very long button."
+    assert TEXT[window.context_start:window.context_end] == "Pick a plan. Then click the very long button. Save."
+    assert splice(TEXT, [window], ["Click the button."]) == TEXT.replace("Then click the very long button.", "Click the button.")
+
+
+def test_no_windows_when_most_of_the_text_fails():
+    """Targeting gives way to a full rewrite when it would not save much."""
+    assert fix_windows("A long first sentence. Two.", [(0, 1)]) is None
+
+
+def test_spans_follow_local_edits():
+    """Spans located before a local fix are moved to the same text after it."""
+    old, new = "Go. A very long one. End.", "Go. A long one. End."
+    [(start, end)] = remap_spans(old, new, [(4, 20)])
+    assert new[start:end] == "A long one."
+
+
+def test_heuristics_report_offsets():
+    """Sentence issues carry the offsets of the sentence they flag."""
+    text = "Short one. " + " ".join(["word"] * 25) + "."
+    [issue] = sentence_length_issues(text)
+    start, end = issue["spans"][0]
+    assert text[start:end] == issue["sentence"]
+
+
+def test_draft_sends_only_the_failing_passage(monkeypatch):
+    """Targeted fixes send the passage and context, then splice the rewrite back in."""
+    prompts = []
+
+    def fake_complete(client, messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        return "Click the button."
+
+    monkeypatch.setattr(draft, "complete", fake_complete)
+    monkeypatch.setattr(draft, "get_client", lambda: None)
+    start = TEXT.index("Then")
+    text = draft.draft_copy_tool("s", "style", previous=TEXT, fix="weasel word: very", spans=[(start, start + 4)])
+
+    assert text == TEXT.replace("Then click the very long button.", "Click the button.")
+    assert "Log out" not in prompts[0]
+
+
+def test_agent_passes_located_spans_to_llm():
+    """With targeted, the fix request carries the spans of the located failures."""
+    calls = []
+
+    def stub_llm(scenario: str, **kwargs) -> str:
+        calls.append(kwargs)
+        return "fixed" if kwargs.get("fix") else "draft text"
+
+    def located(text: str) -> EvalResult:
+        if text == "fixed":
+            return EvalResult(name="located", status="PASS")
+        return EvalResult(name="located", status="FAIL", error="bad", spans=[(0, 5)])
+
+    result = run_agent("s", "style", [located], stub_llm, autofix=False, targeted=True)
+
+    assert result["final_status"] == "success"
+    assert calls[1]["spans"] == [(0, 5)]
+
+
+def test_spans_of_locally_fixed_lines_are_not_sent():
+    """Only the lines left for the LLM contribute spans to the fix request."""
+    calls = []
+    text = "Enter a very long name. Then wait."
+
+    def stub_llm(scenario: str, **kwargs) -> str:
+        calls.append(kwargs)
+        return "fixed" if kwargs.get("fix") else text
+
+    def heuristics(text: str) -> EvalResult:
+        if text == "fixed":
+            return EvalResult(name="heuristics", status="PASS")
+        return EvalResult(
+            name="heuristics", status="FAIL", error="weasel word: very\nvague: wait",
+            spans=[(8, 12), (29, 33)], line_spans=[[(8, 12)], [(29, 33)]]
+        )
+
+    run_agent("s", "style", [heuristics], stub_llm, targeted=True)
+
+    assert calls[1]["fix"] == "heuristics: vague: wait"
+    assert calls[1]["spans"] == [(24, 28)]
@@ -0,0 +1,82 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from doc_agent import tracing
+from doc_agent.agent import run_agent
+from doc_agent.llm import complete
+
+
+@pytest.fixture
+def tracer():
+    tracer = tracing.enable()
+    yield tracer
+    tracing.disable()
+
+
+def test_spans_are_noops_when_disabled():
+    """With tracing off, span() returns the shared no-op span and records nothing."""
+    tracing.disable()
+    with tracing.span("anything", a=1) as s:
+        s.set(b=2)
+    assert s is tracing.span("other")
+    assert tracing.current_span() is s
+
+
+def test_agent_run_records_nested_spans(tracer):
+    """Run, iteration and evaluator spans nest under each other."""
+    def stub_llm(scenario: str, **kwargs) -> str:
+        return f"{scenario} (fixed)" if kwargs.get("fix") else scenario
+
+    def needs_fix(text: str) -> dict:
+        return {"status": "PASS"} if "fixed" in text else {"status": "FAIL", "error": "rewrite"}
+
+    run_agent(scenario="s", style="style", evaluators=[needs_fix], llm=stub_llm, max_iters=3)
+
+    by_name = {}
+    for s in tracer.spans:
+        by_name.setdefault(s.name, []).append(s)
+    run = by_name["agent.run"][0]
+    assert run.attrs["final_status"] == "success"
+    assert [s.attrs["iteration"] for s in by_name["agent.iteration"]] == [1, 2]
+    assert all(s.parent_id == run.span_id for s in by_name["agent.iteration"])
+    iteration_ids = {s.span_id for s in by_name["agent.iteration"]}
+    assert all(s.parent_id in iteration_ids for s in by_name["evaluator"])
+    assert [s.attrs["passed"] for s in by_name["evaluator"]] == [False, True]
+
+
+def test_llm_call_records_tokens(tracer):
+    """LLM call spans carry the model and token usage from the response."""
+    resp = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=" hi "))],
+        usage=SimpleNamespace(prompt_tokens=12, completion_tokens=3)
+    )
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: resp)))
+
+    assert complete(client, messages=[{"role": "user", "content": "x"}], model="m", temperature=0.5) == "hi"
+
+    (call,) = tracer.spans
+    assert call.name == "llm.call"
+    assert call.attrs["model"] == "m"
+    assert call.attrs["prompt_tokens"] == 12
+    assert call.attrs["completion_tokens"] == 3
+
+
+def test_exports(tracer, tmp_path):
+    """Spans export as JSON lines and as Chrome trace events."""
+    with tracing.span("outer"):
+        with tracing.span("inner", cache_hit=True):
+            pass
+
+    jsonl = tmp_path / "trace.jsonl"
+    tracer.to_jsonl(str(jsonl))
+    rows = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    assert [r["name"] for r in rows] == ["inner", "outer"]
+    assert rows[0]["parent_id"] == rows[1]["span_id"]
+
+    chrome = tmp_path / "trace.json"
+    tracer.to_chrome_trace(str(chrome))
+    events = json.loads(chrome.read_text())["traceEvents"]
+    assert {e["ph"] for e in events} == {"X"}
+    assert events[0]["args"]["cache_hit"] is True